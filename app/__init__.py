@@ -1,27 +1,44 @@
 from flask import Flask
-from .config import Config
+from .config import get_config
 from .extensions import db, login_manager
+from .cache import init_app as init_page_cache
+from .user_cache import init_app as init_user_cache, current_user_cache
+from .passwords import init_app as init_password_hasher
+from .slot_hub import init_app as init_slot_hub
 
-def create_app():
+def create_app(config_class=None):
     app = Flask(__name__, instance_relative_config=True)
-    app.config.from_object(Config)
+    app.config.from_object(config_class or get_config())
 
     db.init_app(app)
     login_manager.init_app(app)
+    init_page_cache(app)
+    init_user_cache(app)
+    init_password_hasher(app)
+    init_slot_hub(app)
+
+    from .sqlite import install_pragmas
+    with app.app_context():
+        install_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])
 
     from app.models.user import User
 
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return current_user_cache().get(int(user_id), lambda pk: db.session.get(User, pk))
 
     from .routes.auth import auth_bp
     from .routes.activities import activities_bp
     from .routes.admin import admin_bp
+    from .routes.api import api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(activities_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(api_bp)
+
+    from .commands import register_commands
+    register_commands(app)
 
     # Alias /login y /logout globales
     from flask import request
@@ -41,7 +58,9 @@ def create_app():
         return redirect(url_for('activities.index'))
 
     with app.app_context():
-        db.create_all()
+        # Versioned migrations: only pending ones run, so this is cheap on every boot
+        from .migrations import upgrade
+        upgrade()
         
         # Create default admin user if it doesn't exist
         from app.models.user import User
@@ -51,4 +70,7 @@ def create_app():
             db.session.add(admin)
             db.session.commit()
 
+    from .scheduler import start_scheduler
+    start_scheduler(app)
+
     return app
@@ -0,0 +1,172 @@
+"""
+In-process cache of rendered pages for the public catalogue.
+
+Entries are whole response bodies, evicted in LRU order once the cache
+holds ``PAGE_CACHE_SIZE`` pages, and tagged so writes can drop exactly the
+pages they affect (``catalog`` for the listings, ``activity:<id>`` for a
+detail page). The cache is per process: each worker keeps its own.
+
+Writes made in another process (``flask update-statuses`` run from cron,
+another worker) cannot invalidate this cache, so pages also expire after
+``PAGE_CACHE_TTL`` seconds: that bounds how long a page can show an
+activity as open after the scheduler has closed it.
+
+A page rendered while a write was being committed may already be stale
+when it finishes, so ``cached_page`` takes the cache's generation before
+rendering and ``set`` refuses the page if any of its tags has been
+invalidated since then.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from flask import request, session, make_response, current_app
+from flask_login import current_user
+
+
+class PageCache:
+
+    def __init__(self, max_entries=256, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (body, tags, expires_at)
+        self._invalidated = {}  # tag -> generation of its last invalidation
+        self._generation = 0
+        self._floor = 0  # pages rendered before this generation are refused
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self):
+        """Take before rendering a page and pass to ``set`` as ``since``."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, body, tags=(), since=None):
+        """Store a page, unless one of its tags was invalidated after generation ``since``."""
+        with self._lock:
+            if since is not None and (since < self._floor or any(
+                    self._invalidated.get(tag, 0) > since for tag in tags)):
+                return False
+            self._entries[key] = (body, frozenset(tags), time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def invalidate(self, *tags):
+        """Drop every page carrying any of ``tags``."""
+        tags = set(tags)
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated[tag] = self._generation
+            # Keep one generation per tag only for the recently invalidated
+            # ones: forgetting the rest refuses every page rendered before now.
+            if len(self._invalidated) > max(self.max_entries, 64):
+                self._invalidated.clear()
+                self._floor = self._generation
+            stale = [key for key, (_, entry_tags, _) in self._entries.items() if entry_tags & tags]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def init_app(app):
+    app.extensions["page_cache"] = PageCache(app.config.get("PAGE_CACHE_SIZE", 256),
+                                             app.config.get("PAGE_CACHE_TTL", 60))
+
+
+def current_page_cache():
+    return current_app.extensions["page_cache"]
+
+
+def invalidate_activity(activity_id=None):
+    """Drop the catalogue pages and, if given, the detail page of one activity."""
+    tags = ["catalog"]
+    if activity_id is not None:
+        tags.append(f"activity:{activity_id}")
+    current_page_cache().invalidate(*tags)
+
+
+def _cacheable(page_cache):
+    if not page_cache.enabled or request.method != "GET":
+        return False
+    if current_user.is_authenticated and current_user.role == "admin":
+        return False
+    # Pending flash messages are rendered into the page: never cache them
+    return not session.get("_flashes")
+
+
+def cached_page(tags):
+    """
+    Serve a view from the page cache for anonymous and non-admin users.
+
+    ``tags`` receives the view arguments and returns the invalidation tags
+    of the page. The key includes the user (pages show "Ya inscrito"), the
+    query string and today's date (the default listing starts today).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            page_cache = current_page_cache()
+            if not _cacheable(page_cache):
+                return view(*args, **kwargs)
+
+            user_id = current_user.id if current_user.is_authenticated else None
+            key = (request.endpoint, request.full_path, user_id, date.today())
+            body = page_cache.get(key)
+            if body is not None:
+                response = make_response(body)
+                response.headers["X-Page-Cache"] = "hit"
+                return response
+
+            since = page_cache.generation()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                page_cache.set(key, response.get_data(), tags(**kwargs), since=since)
+            response.headers["X-Page-Cache"] = "miss"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,138 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+from app.extensions import db
+
+
+@click.command("recount-activities")
+@with_appcontext
+def recount_activities_command():
+    """Recalcula los contadores de inscritos y asistentes de todas las actividades."""
+    from app.services.enrollment_service import recount_activities
+
+    updated = recount_activities()
+    db.session.commit()
+    click.echo(f"✓ Contadores recalculados para {updated} actividades")
+
+
+@click.command("rebuild-reports")
+@with_appcontext
+def rebuild_reports_command():
+    """Reconstruye las tablas de resumen de los informes a partir de los contadores."""
+    from app.services.report_service import rebuild_rollups
+
+    written = rebuild_rollups()
+    db.session.commit()
+    click.echo(f"✓ Resúmenes de informes reconstruidos ({written} filas)")
+
+
+@click.command("clear-trends")
+@with_appcontext
+def clear_trends_command():
+    """Borra los periodos cerrados guardados de las tendencias (se recalculan al verlas)."""
+    from app.services.trends_service import clear_trend_cache
+
+    deleted = clear_trend_cache()
+    click.echo(f"✓ {deleted} periodos de tendencias borrados")
+
+
+@click.command("prune-tombstones")
+@with_appcontext
+def prune_tombstones_command():
+    """Borra las marcas de borrado más antiguas que SYNC_TOMBSTONE_DAYS."""
+    from flask import current_app
+    from app.services.sync_service import prune_tombstones
+
+    deleted = prune_tombstones(current_app.config["SYNC_TOMBSTONE_DAYS"])
+    db.session.commit()
+    click.echo(f"✓ {deleted} marcas de borrado eliminadas")
+
+
+@click.command("update-statuses")
+@with_appcontext
+def update_statuses_command():
+    """Cierra y finaliza las actividades según su fecha (para ejecutar cada minuto)."""
+    from app.scheduler import run_status_update
+
+    changed = run_status_update()
+    click.echo(f"✓ {len(changed['cerrada'])} actividades cerradas, "
+               f"{len(changed['finalizada'])} finalizadas")
+
+
+@click.command("rebuild-search")
+@with_appcontext
+def rebuild_search_command():
+    """Reconstruye el índice de búsqueda de texto de las actividades."""
+    from app.services.search_service import rebuild_search_index
+
+    indexed = rebuild_search_index()
+    db.session.commit()
+    click.echo(f"✓ Índice de búsqueda reconstruido ({indexed} actividades)")
+
+
+@click.command("db-upgrade")
+@with_appcontext
+def db_upgrade_command():
+    """Aplica las migraciones de esquema pendientes."""
+    from app.migrations import upgrade
+
+    applied = upgrade()
+    for name in applied:
+        click.echo(f"✓ Migración aplicada: {name}")
+    if not applied:
+        click.echo("✓ El esquema ya está actualizado")
+
+
+def hot_queries():
+    """The queries behind the most visited pages, as (name, statement)."""
+    from datetime import date
+    from app.models.enrollment import Enrollment
+    from app.models.activity import Activity
+    from app.services.activity_service import catalog_query
+    from app.services.participant_service import participant_search_query
+    from app.services.schedule_service import overlapping, activity_slot
+
+    today = date.today()
+    return [
+        ("Catálogo (anónimo)",
+         catalog_query(date_from=today).order_by(Activity.date, Activity.id).limit(25)),
+        ("Catálogo (usuario)",
+         catalog_query(user_id=1, date_from=today).order_by(Activity.date, Activity.id).limit(25)),
+        ("Panel por estado",
+         db.session.query(Activity.id).filter(Activity.status == 'abierta', Activity.date >= today)
+         .order_by(Activity.date.desc(), Activity.id.desc()).limit(51)),
+        ("Inscripción del usuario",
+         Enrollment.query.filter_by(activity_id=1, user_id=1)),
+        ("Inscritos de una actividad",
+         Enrollment.query.filter_by(activity_id=1).order_by(Enrollment.enrollment_date)),
+        ("Mis inscripciones",
+         db.session.query(Enrollment.id, Activity.date).join(Activity, Activity.id == Enrollment.activity_id)
+         .filter(Enrollment.user_id == 1, Activity.date >= today)
+         .order_by(Activity.date, Enrollment.id).limit(25)),
+        ("Solapamientos de horario",
+         overlapping(*activity_slot(today, "18:00", 90))),
+        ("Búsqueda de participantes",
+         participant_search_query("ana").limit(10)),
+    ]
+
+
+@click.command("explain-queries")
+@with_appcontext
+def explain_queries_command():
+    """Muestra el EXPLAIN QUERY PLAN de las consultas más frecuentes."""
+    for name, query in hot_queries():
+        sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+        click.echo(f"\n== {name}")
+        for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")):
+            click.echo(f"   {row[-1]}")
+
+
+def register_commands(app):
+    app.cli.add_command(recount_activities_command)
+    app.cli.add_command(rebuild_reports_command)
+    app.cli.add_command(clear_trends_command)
+    app.cli.add_command(prune_tombstones_command)
+    app.cli.add_command(update_statuses_command)
+    app.cli.add_command(rebuild_search_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(explain_queries_command)
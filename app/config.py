@@ -2,5 +2,90 @@ import os
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-key-change-in-production")
-    SQLALCHEMY_DATABASE_URI = "sqlite:///../instance/app.db"
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///../instance/app.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    ACTIVITIES_PER_PAGE = 24
+    DASHBOARD_PER_PAGE = 50
+    # Rendered catalogue/detail pages kept per process (0 disables the cache)
+    PAGE_CACHE_SIZE = 256
+    # Seconds a cached page lives: bounds staleness from writes in other processes
+    # (e.g. `flask update-statuses` from cron closing activities)
+    PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", "60"))
+    # Seconds a logged-in user is served from memory by the user loader (0 disables)
+    USER_CACHE_TTL = 300
+    # Report trends: periods shown, and days after its end a period is final
+    # (attendance is usually marked a few days later) and served from cache
+    TREND_BUCKETS = 12
+    TREND_CLOSE_AFTER_DAYS = 7
+    # Open activities close this many minutes before they start (app/services/status_service.py)
+    STATUS_CLOSE_LEAD_MINUTES = int(os.getenv("STATUS_CLOSE_LEAD_MINUTES", "60"))
+    # Seconds between status updates in a background thread (0: use `flask update-statuses`)
+    STATUS_SCHEDULER_INTERVAL = int(os.getenv("STATUS_SCHEDULER_INTERVAL", "0"))
+    # Seconds between keep-alive comments on idle slot streams (app/slot_hub.py)
+    SSE_HEARTBEAT_SECONDS = 15
+    # Delta sync of the admin dashboard: seconds re-sent on every poll (covers
+    # transactions still committing), days tombstones are kept, and the most
+    # changes sent before asking the client to reload instead
+    SYNC_OVERLAP_SECONDS = 5
+    SYNC_TOMBSTONE_DAYS = 7
+    SYNC_MAX_CHANGES = 500
+    # werkzeug hash method for passwords; older hashes are upgraded on login
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    # Password checks computed at once, and how many more may wait for a slot
+    PASSWORD_HASH_WORKERS = os.cpu_count() or 2
+    PASSWORD_HASH_QUEUE = 32
+    # PRAGMAs applied to every new SQLite connection (see app/sqlite.py)
+    SQLITE_PRAGMAS = {}
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    WTF_CSRF_ENABLED = False
+    PAGE_CACHE_SIZE = 0
+    USER_CACHE_TTL = 0
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    STATUS_SCHEDULER_INTERVAL = 0
+    SECRET_KEY = "test-secret-key"
+
+
+class ProductionConfig(Config):
+    # WAL lets the catalogue keep reading while enrollments are written;
+    # busy_timeout makes writers wait for the lock instead of failing.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "busy_timeout": 5000,          # ms
+        "synchronous": "NORMAL",       # safe with WAL, one fsync per checkpoint
+        "cache_size": -64000,          # 64 MB of page cache
+        "mmap_size": 268435456,        # 256 MB memory-mapped I/O
+        "foreign_keys": "ON",
+        "temp_store": "MEMORY",
+    }
+    # One connection per serving thread; SQLite connections are cheap.
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": 10,
+        "max_overflow": 10,
+        "pool_timeout": 30,
+        "pool_pre_ping": False,
+        "connect_args": {"check_same_thread": False, "timeout": 5},
+    }
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Config class for ``name`` or the ``APP_ENV`` environment variable (default: development)."""
+    name = name or os.getenv("APP_ENV", "development")
+    try:
+        return config_by_name[name]
+    except KeyError:
+        raise ValueError(f"Unknown APP_ENV '{name}'. Use one of: {', '.join(config_by_name)}")
@@ -0,0 +1,242 @@
+"""
+Versioned, idempotent schema migrations for the SQLite database.
+
+Each migration runs once, in order, inside its own transaction, and is
+recorded in the ``schema_migrations`` table. Migrations also check the
+current schema before changing it, so they are safe on databases created
+by older versions of the app (``db.create_all()`` or ``migrate_db.py``).
+"""
+from datetime import datetime
+from sqlalchemy import text, inspect
+from app.extensions import db
+
+
+def _columns(connection, table):
+    return {column["name"] for column in inspect(connection).get_columns(table)}
+
+
+def _add_column(connection, table, column, ddl):
+    if column not in _columns(connection, table):
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_tables(connection):
+    """Tables of the models that do not exist yet."""
+    # Import the models so they are registered in the metadata
+    from app.models import user, activity, enrollment, search, participant, series  # noqa: F401
+    db.metadata.create_all(bind=connection)
+
+
+def enrollment_phone(connection):
+    _add_column(connection, "enrollment", "phone", "VARCHAR(20)")
+
+
+def activity_counters(connection):
+    """Denormalized enrollment counters on activity, backfilled from the rows."""
+    _add_column(connection, "activity", "enrolled_count", "INTEGER NOT NULL DEFAULT 0")
+    _add_column(connection, "activity", "attended_count", "INTEGER NOT NULL DEFAULT 0")
+    connection.execute(text("""
+        UPDATE activity SET
+            enrolled_count = (SELECT COUNT(*) FROM enrollment
+                              WHERE enrollment.activity_id = activity.id),
+            attended_count = (SELECT COUNT(*) FROM enrollment
+                              WHERE enrollment.activity_id = activity.id AND enrollment.attended = 1)
+    """))
+
+
+def hot_path_indexes(connection):
+    """Indexes for the access patterns of the catalogue, dashboard and enrollments."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_activity_user ON enrollment (activity_id, user_id)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_activity_date ON enrollment (activity_id, enrollment_date)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_status_date ON activity (status, date)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_date ON activity (date)"
+    ))
+
+
+def report_rollups(connection):
+    """Rollup table of the admin reports, backfilled from the activity counters."""
+    from app.models.report import ReportRollup
+    from app.services.report_service import rebuild_rollups
+
+    ReportRollup.__table__.create(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_enrolled_count ON activity (enrolled_count)"
+    ))
+    rebuild_rollups(connection)
+
+
+def trend_buckets(connection):
+    """Cache table of closed trend periods and the enrollment date index."""
+    from app.models.trend import TrendBucket
+
+    TrendBucket.__table__.create(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_date ON enrollment (enrollment_date)"
+    ))
+
+
+def change_tracking(connection):
+    """Enrollment ``updated_at``, tombstones and indexes for the delta sync."""
+    from app.models.tombstone import Tombstone
+
+    _add_column(connection, "enrollment", "updated_at", "DATETIME")
+    connection.execute(text(
+        "UPDATE enrollment SET updated_at = COALESCE(created_at, enrollment_date) WHERE updated_at IS NULL"
+    ))
+    Tombstone.__table__.create(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_updated_at ON enrollment (updated_at)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_updated_at ON activity (updated_at)"
+    ))
+
+
+def activity_search(connection):
+    """FTS5 index of activity title, description and type, with its sync triggers."""
+    from app.models.search import create_activity_fts, rebuild_activity_fts
+
+    create_activity_fts(connection)
+    rebuild_activity_fts(connection)
+
+
+def participant_directory(connection):
+    """Normalized enrollment emails and the participant directory built from them."""
+    from app.models.participant import Participant
+    from app.services.participant_service import normalize_email, rebuild_participants
+
+    Participant.__table__.create(bind=connection, checkfirst=True)
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_participant_name_key ON participant (name_key)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_participant_last_enrolled_at ON participant (last_enrolled_at)"
+    ))
+
+    # Emails differing only in case or spaces within one activity were
+    # already duplicates: the first keeps the normalized email, the rest
+    # are left as they are rather than breaking ``unique_enrollment``.
+    rows = connection.execute(text("SELECT id, activity_id, email FROM enrollment ORDER BY id")).all()
+    taken = {(activity_id, email) for _, activity_id, email in rows}
+    changes = []
+    for enrollment_id, activity_id, email in rows:
+        key = normalize_email(email)
+        if key != email and (activity_id, key) not in taken:
+            taken.add((activity_id, key))
+            changes.append({"id": enrollment_id, "email": key})
+    if changes:
+        connection.execute(text("UPDATE enrollment SET email = :email WHERE id = :id"), changes)
+
+    rebuild_participants(connection)
+
+
+def enrollment_user_index(connection):
+    """Index for the enrollments of one user ("Mis inscripciones")."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_user_activity ON enrollment (user_id, activity_id)"
+    ))
+
+
+def activity_schedule(connection):
+    """Sortable start/end columns of activities, backfilled, and their indexes."""
+    from sqlalchemy import select, update, bindparam
+    from app.models.activity import Activity
+    from app.services.schedule_service import activity_slot
+
+    _add_column(connection, "activity", "starts_at", "DATETIME")
+    _add_column(connection, "activity", "ends_at", "DATETIME")
+    # Through the table so the datetimes get the same format as the ORM writes
+    table = Activity.__table__
+    slots = []
+    for activity_id, day, time, duration in connection.execute(
+            select(table.c.id, table.c.date, table.c.time, table.c.duration).where(table.c.time.isnot(None))):
+        starts_at, ends_at = activity_slot(day, time, duration)
+        if starts_at is not None:
+            slots.append({"activity_id": activity_id, "starts_at": starts_at, "ends_at": ends_at})
+    if slots:
+        connection.execute(
+            update(table).where(table.c.id == bindparam("activity_id"))
+            .values(starts_at=bindparam("starts_at"), ends_at=bindparam("ends_at")),
+            slots
+        )
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_starts_at ON activity (starts_at, ends_at)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_duration ON activity (duration)"
+    ))
+
+
+def activity_series(connection):
+    """Recurring series table and the link of activities to their series."""
+    from app.models.series import ActivitySeries
+
+    ActivitySeries.__table__.create(bind=connection, checkfirst=True)
+    _add_column(connection, "activity", "series_id", "INTEGER REFERENCES activity_series (id)")
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activity_series_date ON activity (series_id, date)"
+    ))
+
+
+def enrollment_user_index_only(connection):
+    """Replace the (user_id, activity_id) index of migration 10 by one on user_id."""
+    # With (user_id, activity_id) the planner could pick it instead of
+    # ix_enrollment_activity_user for the catalogue lookups.
+    connection.execute(text("DROP INDEX IF EXISTS ix_enrollment_user_activity"))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_enrollment_user ON enrollment (user_id)"
+    ))
+
+
+# (version, name, function) - append only, never renumber
+MIGRATIONS = [
+    (1, "create_tables", create_tables),
+    (2, "enrollment_phone", enrollment_phone),
+    (3, "activity_counters", activity_counters),
+    (4, "hot_path_indexes", hot_path_indexes),
+    (5, "report_rollups", report_rollups),
+    (6, "trend_buckets", trend_buckets),
+    (7, "change_tracking", change_tracking),
+    (8, "activity_search", activity_search),
+    (9, "participant_directory", participant_directory),
+    (10, "enrollment_user_index", enrollment_user_index),
+    (11, "activity_schedule", activity_schedule),
+    (12, "activity_series", activity_series),
+    (13, "enrollment_user_index_only", enrollment_user_index_only),
+]
+
+
+def applied_versions(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, applied_at DATETIME NOT NULL)"
+        ))
+        return {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def upgrade(engine=None):
+    """Apply pending migrations. Returns the names of the migrations applied."""
+    engine = engine or db.engine
+    done = applied_versions(engine)
+    applied = []
+
+    for version, name, migration in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
+                {"version": version, "name": name, "applied_at": datetime.utcnow()}
+            )
+        applied.append(name)
+
+    return applied
@@ -1,10 +1,26 @@
 from app.extensions import db
+from app.models.series import ActivitySeries  # noqa: F401 (table of the series_id foreign key)
 from datetime import datetime
 
 class Activity(db.Model):
     def __repr__(self):
         return f"<Activity {self.title}>"
 
+    # Índices creados también por app/migrations.py (hot_path_indexes)
+    __table_args__ = (
+        db.Index('ix_activity_status_date', 'status', 'date'),
+        db.Index('ix_activity_date', 'date'),
+        # Creado por app/migrations.py (report_rollups): "más populares"
+        db.Index('ix_activity_enrolled_count', 'enrolled_count'),
+        # Creado por app/migrations.py (change_tracking): sincronización del panel
+        db.Index('ix_activity_updated_at', 'updated_at'),
+        # Creados por app/migrations.py (activity_schedule): detección de solapamientos
+        db.Index('ix_activity_starts_at', 'starts_at', 'ends_at'),
+        db.Index('ix_activity_duration', 'duration'),
+        # Creado por app/migrations.py (activity_series): sesiones de una serie por fecha
+        db.Index('ix_activity_series_date', 'series_id', 'date'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -12,10 +28,22 @@ class Activity(db.Model):
     date = db.Column(db.Date, nullable=False)
     time = db.Column(db.String(10))  # Hora (formato HH:MM)
     duration = db.Column(db.Integer)  # Duración en minutos
+    # Franja horaria derivada de date/time/duration, mantenida por app/services/schedule_service.py
+    starts_at = db.Column(db.DateTime)
+    ends_at = db.Column(db.DateTime)
+    # Serie recurrente a la que pertenece la sesión (app/models/series.py)
+    series_id = db.Column(db.Integer, db.ForeignKey("activity_series.id"), nullable=True)
     max_slots = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(50), default="borrador")
+    # Contadores desnormalizados, mantenidos por app/services/enrollment_service.py
+    enrolled_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    attended_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship to enrollments
     enrollments = db.relationship('Enrollment', backref='activity', lazy=True, cascade='all, delete-orphan')
+
+    @property
+    def available_slots(self):
+        return self.max_slots - (self.enrolled_count or 0)
@@ -7,6 +7,15 @@ class Enrollment(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('email', 'activity_id', name='unique_enrollment'),
+        # Índices creados también por app/migrations.py (hot_path_indexes)
+        db.Index('ix_enrollment_activity_user', 'activity_id', 'user_id'),
+        db.Index('ix_enrollment_activity_date', 'activity_id', 'enrollment_date'),
+        # Creado por app/migrations.py (trend_buckets): series por fecha de inscripción
+        db.Index('ix_enrollment_date', 'enrollment_date'),
+        # Creado por app/migrations.py (change_tracking)
+        db.Index('ix_enrollment_updated_at', 'updated_at'),
+        # Creado por app/migrations.py (enrollment_user_index): "Mis inscripciones"
+        db.Index('ix_enrollment_user', 'user_id'),
     )
     
     id = db.Column(db.Integer, primary_key=True)
@@ -19,3 +28,5 @@ class Enrollment(db.Model):
     status = db.Column(db.String(50), default="confirmada")  # confirmada, cancelada
     attended = db.Column(db.Boolean, default=None, nullable=True)  # None=pendiente, True=asistió, False=no asistió
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Also bumped by bulk UPDATEs; read by the delta sync (app/services/sync_service.py)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,29 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class Participant(db.Model):
+    """
+    Directory of people who have enrolled, one row per normalized email.
+
+    Upserted from every new enrollment by app/services/participant_service.py
+    so staff can find returning participants. ``email`` is stored
+    normalized and ``name_key`` is the name folded for prefix search.
+    """
+    __tablename__ = "participant"
+
+    __table_args__ = (
+        # Creados también por app/migrations.py (participant_directory)
+        db.Index('ix_participant_name_key', 'name_key'),
+        db.Index('ix_participant_last_enrolled_at', 'last_enrolled_at'),
+    )
+
+    def __repr__(self):
+        return f"<Participant {self.email}>"
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(200), unique=True, nullable=False)
+    name = db.Column(db.String(200), nullable=False)
+    name_key = db.Column(db.String(200), nullable=False)
+    phone = db.Column(db.String(20))
+    last_enrolled_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from app.extensions import db
+
+
+class ReportRollup(db.Model):
+    """
+    Precomputed report totals for one bucket of a dimension.
+
+    ``dimension`` is ``status``, ``type`` or ``month`` (``YYYY-MM`` of the
+    activity date). Maintained by app/services/report_service.py.
+    """
+    __tablename__ = "report_rollup"
+
+    def __repr__(self):
+        return f"<ReportRollup {self.dimension}={self.bucket}>"
+
+    dimension = db.Column(db.String(20), primary_key=True)
+    bucket = db.Column(db.String(100), primary_key=True)
+    activities = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    enrolled = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    attended = db.Column(db.Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,54 @@
+"""
+FTS5 full-text index over activity title, description and type.
+
+``activity_fts`` is an external-content table: it stores only the index,
+reading the text from ``activity``. Triggers keep it in sync with every
+insert, delete and title/description/type update (also bulk statements;
+counter updates do not touch it). ``remove_diacritics 2`` folds accents,
+so "exposicion" finds "Exposición".
+
+The DDL runs with ``create_all``/``drop_all`` of the activity table and
+from app/migrations.py (activity_search) on existing databases.
+"""
+from sqlalchemy import event, text
+from app.models.activity import Activity
+
+ACTIVITY_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS activity_fts USING fts5("
+    "title, description, type, content='activity', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+
+    "CREATE TRIGGER IF NOT EXISTS activity_fts_insert AFTER INSERT ON activity BEGIN "
+    "INSERT INTO activity_fts(rowid, title, description, type) "
+    "VALUES (new.id, new.title, new.description, new.type); END",
+
+    "CREATE TRIGGER IF NOT EXISTS activity_fts_delete AFTER DELETE ON activity BEGIN "
+    "INSERT INTO activity_fts(activity_fts, rowid, title, description, type) "
+    "VALUES ('delete', old.id, old.title, old.description, old.type); END",
+
+    "CREATE TRIGGER IF NOT EXISTS activity_fts_update AFTER UPDATE OF title, description, type ON activity BEGIN "
+    "INSERT INTO activity_fts(activity_fts, rowid, title, description, type) "
+    "VALUES ('delete', old.id, old.title, old.description, old.type); "
+    "INSERT INTO activity_fts(rowid, title, description, type) "
+    "VALUES (new.id, new.title, new.description, new.type); END",
+]
+
+
+def create_activity_fts(connection):
+    for statement in ACTIVITY_FTS_DDL:
+        connection.execute(text(statement))
+
+
+def rebuild_activity_fts(connection):
+    """Reindex every activity (after creating the index on existing data)."""
+    connection.execute(text("INSERT INTO activity_fts(activity_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(Activity.__table__, "after_create")
+def _create_fts(target, connection, **kw):
+    create_activity_fts(connection)
+
+
+@event.listens_for(Activity.__table__, "before_drop")
+def _drop_fts(target, connection, **kw):
+    connection.execute(text("DROP TABLE IF EXISTS activity_fts"))
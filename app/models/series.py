@@ -0,0 +1,35 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class ActivitySeries(db.Model):
+    """
+    Template and recurrence rule of a recurring activity (weekly club, monthly workshop).
+
+    Its sessions are ordinary ``Activity`` rows pointing back through
+    ``series_id``; app/services/series_service.py generates them and
+    propagates template changes to the future ones.
+    """
+    __tablename__ = "activity_series"
+
+    def __repr__(self):
+        return f"<ActivitySeries {self.title}>"
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Plantilla de las sesiones
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    type = db.Column(db.String(100))
+    time = db.Column(db.String(10))  # Hora (formato HH:MM)
+    duration = db.Column(db.Integer)  # Duración en minutos
+    max_slots = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(50), default="borrador")
+    # Regla de repetición: cada `interval` semanas o meses desde `starts_on` hasta `until`
+    frequency = db.Column(db.String(20), nullable=False, default="weekly")  # weekly, monthly
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    starts_on = db.Column(db.Date, nullable=False)
+    until = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    activities = db.relationship('Activity', backref='series', lazy='dynamic')
@@ -0,0 +1,22 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class Tombstone(db.Model):
+    """
+    Record of a deleted activity or enrollment, for delta sync clients.
+
+    Written by app/services/sync_service.py when rows are deleted and pruned
+    after ``SYNC_TOMBSTONE_DAYS``. Deleting an activity also deletes its
+    enrollments; only the activity gets a tombstone.
+    """
+    __tablename__ = "tombstone"
+
+    def __repr__(self):
+        return f"<Tombstone {self.entity} {self.entity_id}>"
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)  # activity, enrollment
+    entity_id = db.Column(db.Integer, nullable=False)
+    activity_id = db.Column(db.Integer, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,24 @@
+from app.extensions import db
+
+
+class TrendBucket(db.Model):
+    """
+    Cached aggregates of one closed period (month or week) and activity type.
+
+    ``activity_type`` is ``*`` for the total over all types; that row is
+    always stored, so its presence marks the period as computed. Written by
+    app/services/trends_service.py.
+    """
+    __tablename__ = "trend_bucket"
+
+    def __repr__(self):
+        return f"<TrendBucket {self.period} {self.bucket_start} {self.activity_type}>"
+
+    period = db.Column(db.String(10), primary_key=True)
+    bucket_start = db.Column(db.Date, primary_key=True)
+    activity_type = db.Column(db.String(100), primary_key=True)
+    enrollments = db.Column(db.Integer, nullable=False, default=0)  # by enrollment_date
+    enrolled = db.Column(db.Integer, nullable=False, default=0)     # by activity date
+    attended = db.Column(db.Integer, nullable=False, default=0)
+    no_show = db.Column(db.Integer, nullable=False, default=0)
+    max_slots = db.Column(db.Integer, nullable=False, default=0)
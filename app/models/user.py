@@ -1,6 +1,7 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from app.extensions import db
+from app.passwords import hash_password
 
 class User(db.Model, UserMixin):
     def __repr__(self):
@@ -15,7 +16,7 @@ class User(db.Model, UserMixin):
     phone = db.Column(db.String(20), nullable=True)  # Phone for normal users
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
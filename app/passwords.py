@@ -0,0 +1,79 @@
+"""
+Password hashing with a configurable algorithm and work factor.
+
+``PASSWORD_HASH_METHOD`` takes any werkzeug method string, e.g.
+``scrypt:32768:8:1`` or ``pbkdf2:sha256:600000``. Hashes stored with other
+parameters keep verifying and are upgraded on the next successful login
+(see ``app.services.auth_service.authenticate``).
+
+Verification and the rehash on login run in a bounded thread pool: at most
+``PASSWORD_HASH_WORKERS`` hashes are computed at once (hashlib releases the
+GIL, so the other request threads keep running) and at most
+``PASSWORD_HASH_QUEUE`` more may wait. Beyond that ``HasherBusy`` is raised
+instead of piling up CPU-bound work.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class HasherBusy(Exception):
+    """Every verification slot is taken."""
+
+
+def _method_prefix(method):
+    """Fully expanded method of ``method`` ("scrypt" -> "scrypt:32768:8:1")."""
+    return generate_password_hash("", method).split("$", 1)[0]
+
+
+class PasswordHasher:
+
+    def __init__(self, method="scrypt:32768:8:1", workers=2, queue=32, wait=5.0):
+        self.method = method
+        self.prefix = _method_prefix(method)
+        self.wait = wait
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def hash(self, password):
+        return generate_password_hash(password, self.method)
+
+    def needs_rehash(self, pwhash):
+        """Whether ``pwhash`` was made with another algorithm or work factor."""
+        return pwhash.split("$", 1)[0] != self.prefix
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            raise HasherBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def verify(self, pwhash, password):
+        """Check ``password`` in the pool. Raises ``HasherBusy`` if saturated."""
+        return self._run(check_password_hash, pwhash, password)
+
+    def rehash(self, password):
+        """Hash ``password`` in the pool, as ``verify``. Raises ``HasherBusy`` if saturated."""
+        return self._run(generate_password_hash, password, self.method)
+
+
+def init_app(app):
+    app.extensions["password_hasher"] = PasswordHasher(
+        app.config.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"),
+        workers=app.config.get("PASSWORD_HASH_WORKERS", 2),
+        queue=app.config.get("PASSWORD_HASH_QUEUE", 32),
+    )
+
+
+def current_hasher():
+    return current_app.extensions["password_hasher"]
+
+
+def hash_password(password):
+    """Hash with the app's configured method (werkzeug's default outside an app)."""
+    if has_app_context() and "password_hasher" in current_app.extensions:
+        return current_hasher().hash(password)
+    return generate_password_hash(password)
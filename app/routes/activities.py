@@ -1,10 +1,16 @@
-from flask import Blueprint, request, redirect, url_for, render_template, flash
+from flask import Blueprint, request, redirect, url_for, render_template, flash, current_app, Response, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
+from app.cache import cached_page, invalidate_activity
+from app.slot_hub import publish_activity, current_slot_hub
 from app.models.activity import Activity
 from app.models.enrollment import Enrollment
-from datetime import datetime
+from app.services.activity_service import list_catalog, parse_filters, filter_args
+from app.services.enrollment_service import create_enrollment, delete_enrollment, user_enrollments
+from app.services.search_service import search_catalog
+from app.services.schedule_service import schedule_conflicts, enrollment_conflicts, describe_conflicts
+from datetime import datetime, date
 
 
 activities_bp = Blueprint("activities", __name__, url_prefix="/activities")
@@ -14,39 +20,108 @@ activities_bp = Blueprint("activities", __name__, url_prefix="/activities")
 # LISTAR ACTIVIDADES
 # ==============================
 @activities_bp.route("/")
+@cached_page(lambda: ["catalog"])
 def index():
     # Only show published activities to regular users, admins can see all
-    if current_user.is_authenticated and current_user.role == 'admin':
-        activities = Activity.query.all()
-    else:
-        activities = Activity.query.filter(Activity.status != 'borrador').all()
-
-    result = []
-    for activity in activities:
-        enrolled_count = db.session.query(func.count(Enrollment.id)) \
-            .filter_by(activity_id=activity.id) \
-            .scalar()
-
-        available_slots = activity.max_slots - enrolled_count
-
-        # Check if current user is enrolled
-        user_enrolled = False
-        if current_user.is_authenticated:
-            user_enrolled = Enrollment.query.filter_by(
-                activity_id=activity.id,
-                user_id=current_user.id
-            ).first() is not None
-
-        result.append({
-            "id": activity.id,
-            "title": activity.title,
-            "date": activity.date,
-            "status": activity.status,
-            "available_slots": available_slots,
-            "user_enrolled": user_enrolled
+    is_admin = current_user.is_authenticated and current_user.role == 'admin'
+    user_id = current_user.id if current_user.is_authenticated else None
+
+    # By default list upcoming activities only; ?from= (empty) shows history.
+    # With ?q= the same filters apply to a full-text search ranked by relevance.
+    # A recurring series shows only its next session unless ?series=<id> lists it.
+    query_text = request.args.get("q", "").strip()
+    try:
+        filters = parse_filters(request.args, default_from=date.today())
+        series_id = request.args.get("series", type=int)
+        listing = dict(
+            user_id=user_id,
+            include_drafts=is_admin,
+            series_id=series_id,
+            collapse_series=series_id is None,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=current_app.config["ACTIVITIES_PER_PAGE"],
+            **filters
+        )
+        if query_text:
+            page = search_catalog(query_text, **listing)
+        else:
+            page = list_catalog(**listing)
+    except ValueError:
+        return "Parámetros inválidos", 400
+
+    return render_template(
+        "activities.html",
+        activities=page.items,
+        page=page,
+        filters=dict(filter_args(filters), q=query_text, **({"series": series_id} if series_id else {}))
+    )
+
+
+# ==============================
+# MIS INSCRIPCIONES
+# ==============================
+@activities_bp.route("/mine")
+@login_required
+def my_enrollments():
+    """Inscripciones del usuario: ?when=upcoming|past, ?format=json para la variante JSON"""
+    when = request.args.get("when", "upcoming")
+    try:
+        page = user_enrollments(
+            current_user.id,
+            when=when,
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=current_app.config["ACTIVITIES_PER_PAGE"]
+        )
+    except ValueError:
+        return "Parámetros inválidos", 400
+
+    if request.args.get("format") == "json":
+        def link(**cursor):
+            return url_for("activities.my_enrollments", when=when, format="json", **cursor)
+
+        return jsonify({
+            "enrollments": [
+                dict(
+                    item,
+                    date=item["date"].isoformat(),
+                    enrollment_date=item["enrollment_date"].isoformat() if item["enrollment_date"] else None,
+                    url=url_for("activities.detail", activity_id=item["activity_id"])
+                )
+                for item in page.items
+            ],
+            "next": link(after=page.next_cursor) if page.next_cursor else None,
+            "prev": link(before=page.prev_cursor) if page.prev_cursor else None,
         })
 
-    return render_template("activities.html", activities=result)
+    return render_template("my_enrollments.html", enrollments=page.items, page=page,
+                           when=when, filters={"when": when})
+
+
+# ==============================
+# PLAZAS EN DIRECTO (SSE)
+# ==============================
+@activities_bp.route("/stream")
+def slot_stream():
+    """Plazas disponibles y estado en directo; ?ids=1,2 limita a esas actividades"""
+    hub = current_slot_hub()
+    try:
+        ids = request.args.get("ids")
+        activity_ids = {int(value) for value in ids.split(",") if value} if ids else None
+    except ValueError:
+        return "Parámetros inválidos", 400
+
+    # Al reconectar, el navegador envía el último id recibido
+    seq = request.headers.get("Last-Event-ID", type=int)
+    if seq is None or seq > hub.seq:
+        seq = hub.seq
+
+    return Response(
+        hub.stream(seq, current_app.config["SSE_HEARTBEAT_SECONDS"], activity_ids),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # ==============================
@@ -68,6 +143,11 @@ def create_activity():
 
     # Convert date string to date object
     date_obj = datetime.strptime(date, '%Y-%m-%d').date() if date else None
+    duration = int(duration) if duration else None
+
+    conflicts = schedule_conflicts(date_obj, time, duration)
+    if conflicts and not request.form.get("allow_conflicts"):
+        return f"Coincide en horario con: {describe_conflicts(conflicts)}", 409
 
     activity = Activity(
         title=title,
@@ -75,13 +155,14 @@ def create_activity():
         type=activity_type,
         date=date_obj,
         time=time,
-        duration=int(duration) if duration else None,
+        duration=duration,
         max_slots=int(max_slots),
         status="borrador"
     )
 
     db.session.add(activity)
     db.session.commit()
+    invalidate_activity(activity.id)
 
     return redirect(url_for("activities.index"))
 
@@ -102,6 +183,8 @@ def change_status(activity_id):
 
     activity.status = new_status
     db.session.commit()
+    invalidate_activity(activity_id)
+    publish_activity(activity_id)
 
     return redirect(url_for("activities.index"))
 
@@ -130,26 +213,36 @@ def enroll(activity_id):
         flash("Ya estás inscrito en esta actividad", "warning")
         return redirect(url_for("activities.index"))
 
-    # ✅ Control automático de plazas
-    enrolled_count = db.session.query(func.count(Enrollment.id)) \
-        .filter_by(activity_id=activity_id) \
-        .scalar()
-
-    if enrolled_count >= activity.max_slots:
-        flash("No hay plazas disponibles", "error")
+    if activity.status != "abierta":
+        flash("La inscripción en esta actividad está cerrada", "error")
         return redirect(url_for("activities.index"))
 
-    # Create enrollment linked to user account
-    enrollment = Enrollment(
-        user_name=name,
-        email=email,
-        phone=phone,
-        activity_id=activity_id,
-        user_id=current_user.id
-    )
+    conflicts = enrollment_conflicts(current_user.id, activity)
+    if conflicts:
+        flash(f"Coincide en horario con otra actividad en la que estás inscrito: {describe_conflicts(conflicts)}", "error")
+        return redirect(url_for("activities.index"))
 
-    db.session.add(enrollment)
-    db.session.commit()
+    # ✅ Control automático de plazas: la reserva es atómica en base de datos
+    try:
+        enrollment = create_enrollment(
+            activity,
+            user_name=name,
+            email=email,
+            phone=phone,
+            user_id=current_user.id
+        )
+        if enrollment is None:
+            db.session.rollback()
+            flash("No hay plazas disponibles", "error")
+            return redirect(url_for("activities.index"))
+        db.session.commit()
+        invalidate_activity()
+        publish_activity(activity_id)
+    except IntegrityError:
+        # Inscripción simultánea del mismo usuario
+        db.session.rollback()
+        flash("Ya estás inscrito en esta actividad", "warning")
+        return redirect(url_for("activities.index"))
 
     flash(f"Te has inscrito correctamente en: {activity.title}", "success")
     return redirect(url_for("activities.index"))
@@ -172,8 +265,10 @@ def unenroll(activity_id):
         return redirect(url_for("activities.index"))
     
     activity_title = enrollment.activity.title
-    db.session.delete(enrollment)
+    delete_enrollment(enrollment)
     db.session.commit()
+    invalidate_activity()
+    publish_activity(activity_id)
     
     flash(f"Te has desapuntado correctamente de: {activity_title}", "success")
     return redirect(url_for("activities.index"))
@@ -186,30 +281,44 @@ def new_activity():
         title = request.form.get("title")
         description = request.form.get("description")
         date = request.form.get("date")
+        time = request.form.get("time") or None
+        duration = request.form.get("duration")
         max_slots = request.form.get("max_slots")
 
         # Convert date string to date object
         date_obj = datetime.strptime(date, '%Y-%m-%d').date() if date else None
+        duration = int(duration) if duration else None
+
+        # Otra actividad en la misma franja: se avisa y se pide confirmación
+        conflicts = schedule_conflicts(date_obj, time, duration)
+        if conflicts and not request.form.get("allow_conflicts"):
+            flash(f"Coincide en horario con: {describe_conflicts(conflicts)}", "warning")
+            return render_template("create_activity.html", form=request.form, conflicts=conflicts)
 
         activity = Activity(
             title=title,
             description=description,
+            type=request.form.get("type") or None,
             date=date_obj,
+            time=time,
+            duration=duration,
             max_slots=int(max_slots),
             status="borrador"
         )
 
         db.session.add(activity)
         db.session.commit()
+        invalidate_activity(activity.id)
 
         return redirect(url_for("activities.index"))
 
-    return render_template("create_activity.html")
+    return render_template("create_activity.html", form={}, conflicts=[])
 
 # ==============================
 # DETALLE ACTIVIDAD
 # ==============================
 @activities_bp.route("/<int:activity_id>", methods=["GET"])
+@cached_page(lambda activity_id: [f"activity:{activity_id}"])
 def detail(activity_id):
     activity = Activity.query.get_or_404(activity_id)
     return render_template("activity_detail.html", activity=activity)
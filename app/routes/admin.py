@@ -1,13 +1,33 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, Response
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, current_app, stream_with_context, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
+from app.cache import current_page_cache, invalidate_activity
+from app.slot_hub import publish_activity
+from app.user_cache import current_user_cache
 from app.models.activity import Activity
 from app.models.enrollment import Enrollment
+from app.models.series import ActivitySeries
+from app.services.activity_service import dashboard_rows, parse_filters, filter_args, ACTIVITY_STATUSES
+from app.services.enrollment_service import (
+    create_enrollment, set_attendance, set_attendance_bulk, parse_import_csv, bulk_create_enrollments
+)
+from app.services.schedule_service import (
+    schedule_conflicts, slots_conflicts, activity_slot, describe_conflicts
+)
+from app.services.series_service import (
+    FREQUENCIES, create_series, update_series, cancel_series, series_slots, future_sessions
+)
+from app.services.participant_service import normalize_email, search_participants, recent_participants
+from app.services.report_service import report_summary
+from app.services.trends_service import trend_series
+from app.services.sync_service import changes_since, encode_sync_cursor, decode_sync_cursor
+from app.services.export_service import (
+    EXPORT_HEADER, enrollment_export_query, bulk_export_query, export_row,
+    iter_csv, iter_combined_csv, iter_zip, content_disposition
+)
 from functools import wraps
-from datetime import datetime
-import csv
-from io import StringIO
+from datetime import datetime, date
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -33,21 +53,56 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Dashboard principal con resumen de actividades"""
-    activities = Activity.query.order_by(Activity.date.desc()).all()
+    # Tomado antes de leer: el script del panel pide los cambios desde aquí
+    sync_cursor = encode_sync_cursor(datetime.utcnow())
+    try:
+        filters = parse_filters(request.args)
+        page = dashboard_rows(
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=current_app.config["DASHBOARD_PER_PAGE"],
+            **filters
+        )
+    except ValueError:
+        return "Parámetros inválidos", 400
     
-    activities_data = []
-    for activity in activities:
-        enrolled_count = len(activity.enrollments)
-        attended_count = sum(1 for e in activity.enrollments if e.attended == True)
-        
-        activities_data.append({
-            'activity': activity,
-            'enrolled_count': enrolled_count,
-            'attended_count': attended_count,
-            'available_slots': activity.max_slots - enrolled_count
-        })
+    activities_data = [
+        {
+            'activity': row,
+            'enrolled_count': row.enrolled_count,
+            'attended_count': row.attended_count,
+            'available_slots': row.max_slots - row.enrolled_count
+        }
+        for row in page.items
+    ]
     
-    return render_template("admin/dashboard.html", activities_data=activities_data)
+    return render_template("admin/dashboard.html", activities_data=activities_data,
+                           page=page, filters=filter_args(filters), sync_cursor=sync_cursor)
+
+
+# ==============================
+# CAMBIOS PARA EL PANEL (SINCRONIZACIÓN INCREMENTAL)
+# ==============================
+@admin_bp.route("/changes")
+@login_required
+@admin_required
+def changes():
+    """Actividades e inscripciones cambiadas o borradas desde ?since= (cursor de la respuesta anterior)"""
+    try:
+        since = request.args.get("since")
+        since = decode_sync_cursor(since) if since else None
+        activity_id = request.args.get("activity_id", type=int)
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+    config = current_app.config
+    return jsonify(changes_since(
+        since,
+        activity_id=activity_id,
+        overlap_seconds=config["SYNC_OVERLAP_SECONDS"],
+        retention_days=config["SYNC_TOMBSTONE_DAYS"],
+        max_changes=config["SYNC_MAX_CHANGES"]
+    ))
 
 
 # ==============================
@@ -76,11 +131,11 @@ def mark_attendance(enrollment_id):
     attended = request.form.get("attended")
     
     if attended == "true":
-        enrollment.attended = True
+        set_attendance(enrollment, True)
     elif attended == "false":
-        enrollment.attended = False
+        set_attendance(enrollment, False)
     else:
-        enrollment.attended = None
+        set_attendance(enrollment, None)
     
     db.session.commit()
     flash("Asistencia actualizada correctamente", "success")
@@ -88,6 +143,33 @@ def mark_attendance(enrollment_id):
     return redirect(url_for("admin.view_enrollments", activity_id=enrollment.activity_id))
 
 
+# ==============================
+# PASAR LISTA (ASISTENCIA EN BLOQUE)
+# ==============================
+@admin_bp.route("/activity/<int:activity_id>/attendance", methods=["POST"])
+@login_required
+@admin_required
+def mark_attendance_batch(activity_id):
+    """Guardar la asistencia de todos los inscritos de una actividad a la vez"""
+    Activity.query.get_or_404(activity_id)
+    
+    values = {"true": True, "false": False, "": None}
+    states = {}
+    for key, value in request.form.items():
+        if not key.startswith("attended-"):
+            continue
+        try:
+            states[int(key[len("attended-"):])] = values[value]
+        except (ValueError, KeyError):
+            return "Datos de asistencia inválidos", 400
+    
+    set_attendance_bulk(activity_id, states)
+    db.session.commit()
+    flash("Asistencia actualizada correctamente", "success")
+    
+    return redirect(url_for("admin.view_enrollments", activity_id=activity_id))
+
+
 # ==============================
 # EDITAR ACTIVIDAD
 # ==============================
@@ -99,26 +181,182 @@ def edit_activity(activity_id):
     activity = Activity.query.get_or_404(activity_id)
     
     if request.method == "POST":
-        activity.title = request.form.get("title")
-        activity.description = request.form.get("description")
-        activity.type = request.form.get("type")
-        
         # Convert date string to date object
         date_str = request.form.get("date")
-        if date_str:
-            activity.date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        
-        activity.time = request.form.get("time")
+        day = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else activity.date
+        time = request.form.get("time")
         duration = request.form.get("duration")
-        activity.duration = int(duration) if duration else None
+        duration = int(duration) if duration else None
+        
+        # Checked before touching the activity so the query does not flush it
+        conflicts = schedule_conflicts(day, time, duration, exclude_id=activity_id)
+        
+        activity.title = request.form.get("title")
+        activity.description = request.form.get("description")
+        activity.type = request.form.get("type")
+        activity.date = day
+        activity.time = time
+        activity.duration = duration
         activity.max_slots = int(request.form.get("max_slots"))
         activity.status = request.form.get("status")
         
+        if conflicts and not request.form.get("allow_conflicts"):
+            # Show the submitted values again and discard them
+            flash(f"Coincide en horario con: {describe_conflicts(conflicts)}", "warning")
+            page = render_template("admin/edit_activity.html", activity=activity, conflicts=conflicts)
+            db.session.rollback()
+            return page
+        
         db.session.commit()
+        invalidate_activity(activity_id)
+        publish_activity(activity_id)
         flash("Actividad actualizada correctamente", "success")
         return redirect(url_for("admin.dashboard"))
     
-    return render_template("admin/edit_activity.html", activity=activity)
+    return render_template("admin/edit_activity.html", activity=activity, conflicts=[])
+
+
+# ==============================
+# SERIES RECURRENTES
+# ==============================
+def _series_template(form):
+    """Campos de plantilla de una serie leídos del formulario (ValueError si no son válidos)"""
+    duration = form.get("duration")
+    fields = {
+        "title": (form.get("title") or "").strip(),
+        "description": form.get("description") or None,
+        "type": form.get("type") or None,
+        "time": form.get("time") or None,
+        "duration": int(duration) if duration else None,
+        "max_slots": int(form.get("max_slots") or 0),
+        "status": form.get("status") or "borrador",
+    }
+    if not fields["title"] or fields["max_slots"] < 1 or fields["status"] not in ACTIVITY_STATUSES:
+        raise ValueError("Datos de la serie no válidos")
+    return fields
+
+
+def _describe_many(conflicts, shown=5):
+    text = describe_conflicts(conflicts[:shown])
+    return f"{text} y {len(conflicts) - shown} más" if len(conflicts) > shown else text
+
+
+@admin_bp.route("/series")
+@login_required
+@admin_required
+def series_index():
+    """Series recurrentes con su número de sesiones"""
+    sessions = dict(
+        db.session.query(Activity.series_id, db.func.count(Activity.id))
+        .filter(Activity.series_id.isnot(None)).group_by(Activity.series_id).all()
+    )
+    series = ActivitySeries.query.order_by(ActivitySeries.starts_on.desc(), ActivitySeries.id.desc()).all()
+    return render_template("admin/series.html", series=series, sessions=sessions, frequencies=FREQUENCIES)
+
+
+@admin_bp.route("/series/new", methods=["GET", "POST"])
+@login_required
+@admin_required
+def series_new():
+    """Crear una serie y todas sus sesiones de una vez"""
+    if request.method == "POST":
+        try:
+            fields = _series_template(request.form)
+            fields.update(
+                frequency=request.form.get("frequency", "weekly"),
+                interval=int(request.form.get("interval") or 1),
+                starts_on=date.fromisoformat(request.form.get("starts_on", "")),
+                until=date.fromisoformat(request.form.get("until", ""))
+            )
+        except ValueError:
+            error = "Revisa los datos de la serie: título, plazas y fechas son obligatorios"
+        else:
+            try:
+                conflicts = slots_conflicts(series_slots(ActivitySeries(**fields)))
+                error = None
+            except ValueError as e:
+                error = str(e)
+        if error:
+            flash(error, "error")
+            return render_template("admin/series_form.html", series=None, form=request.form,
+                                   conflicts=[], frequencies=FREQUENCIES)
+
+        if conflicts and not request.form.get("allow_conflicts"):
+            flash(f"Coincide en horario con: {_describe_many(conflicts)}", "warning")
+            return render_template("admin/series_form.html", series=None, form=request.form,
+                                   conflicts=conflicts, frequencies=FREQUENCIES)
+
+        series = create_series(**fields)
+        db.session.commit()
+        created = [row.id for row in series.activities.with_entities(Activity.id)]
+        invalidate_activity()
+        for activity_id in created:
+            invalidate_activity(activity_id)
+        flash(f"Serie '{series.title}' creada con {len(created)} sesiones", "success")
+        return redirect(url_for("admin.series_index"))
+
+    return render_template("admin/series_form.html", series=None, form={}, conflicts=[],
+                           frequencies=FREQUENCIES)
+
+
+@admin_bp.route("/series/<int:series_id>/edit", methods=["GET", "POST"])
+@login_required
+@admin_required
+def series_edit(series_id):
+    """Cambiar la plantilla de una serie: se aplica a todas sus sesiones futuras"""
+    series = ActivitySeries.query.get_or_404(series_id)
+
+    if request.method == "POST":
+        try:
+            fields = _series_template(request.form)
+        except ValueError:
+            flash("Revisa los datos de la serie: título y plazas son obligatorios", "error")
+            return redirect(url_for("admin.series_edit", series_id=series_id))
+
+        # The sessions keep their dates: check the new time slot on each of them
+        conflicts = [
+            activity for activity in slots_conflicts(
+                [activity_slot(day, fields["time"], fields["duration"]) for _, day in future_sessions(series)]
+            )
+            if activity.series_id != series.id
+        ]
+        if conflicts and not request.form.get("allow_conflicts"):
+            flash(f"Coincide en horario con: {_describe_many(conflicts)}", "warning")
+            return render_template("admin/series_form.html", series=series, form=request.form,
+                                   conflicts=conflicts, frequencies=FREQUENCIES,
+                                   upcoming=future_sessions(series))
+
+        changed = update_series(series, **fields)
+        db.session.commit()
+        invalidate_activity()
+        for activity_id in changed:
+            invalidate_activity(activity_id)
+            publish_activity(activity_id)
+        flash(f"Serie actualizada: {len(changed)} sesiones futuras modificadas", "success")
+        return redirect(url_for("admin.series_index"))
+
+    form = {field: getattr(series, field) or "" for field in ("title", "description", "type", "time",
+                                                             "duration", "max_slots", "status")}
+    return render_template("admin/series_form.html", series=series, form=form, conflicts=[],
+                           frequencies=FREQUENCIES, upcoming=future_sessions(series))
+
+
+@admin_bp.route("/series/<int:series_id>/cancel", methods=["POST"])
+@login_required
+@admin_required
+def series_cancel(series_id):
+    """Cancelar una serie: borra sus sesiones futuras con sus inscripciones"""
+    series = ActivitySeries.query.get_or_404(series_id)
+
+    deleted = cancel_series(series)
+    db.session.commit()
+    invalidate_activity()
+    for activity_id in deleted:
+        invalidate_activity(activity_id)
+        publish_activity(activity_id)
+
+    flash(f"Serie '{series.title}' cancelada: {len(deleted)} sesiones futuras eliminadas", "success")
+    return redirect(url_for("admin.series_index"))
 
 
 # ==============================
@@ -140,39 +378,89 @@ def internal_enrollment(activity_id):
             flash("Nombre y email son obligatorios", "error")
             return redirect(url_for("admin.internal_enrollment", activity_id=activity_id))
         
-        # Check for duplicates
-        existing = Enrollment.query.filter_by(activity_id=activity_id, email=email).first()
+        # Check for duplicates (same normalized email as stored)
+        existing = Enrollment.query.filter_by(activity_id=activity_id, email=normalize_email(email)).first()
         if existing:
             flash("Esta persona ya está inscrita en la actividad", "error")
             return redirect(url_for("admin.internal_enrollment", activity_id=activity_id))
         
-        # Check available slots
-        enrolled_count = len(activity.enrollments)
-        if enrolled_count >= activity.max_slots:
-            flash("No hay plazas disponibles", "error")
+        # Reserve a slot atomically and create the enrollment
+        try:
+            enrollment = create_enrollment(activity, user_name=name, email=email, phone=phone)
+            if enrollment is None:
+                db.session.rollback()
+                flash("No hay plazas disponibles", "error")
+                return redirect(url_for("admin.internal_enrollment", activity_id=activity_id))
+            db.session.commit()
+            invalidate_activity()
+            publish_activity(activity_id)
+        except IntegrityError:
+            db.session.rollback()
+            flash("Esta persona ya está inscrita en la actividad", "error")
             return redirect(url_for("admin.internal_enrollment", activity_id=activity_id))
         
-        enrollment = Enrollment(
-            user_name=name,
-            email=email,
-            phone=phone,
-            activity_id=activity_id
-        )
-        
-        db.session.add(enrollment)
-        db.session.commit()
-        
         flash("Inscripción realizada correctamente", "success")
         return redirect(url_for("admin.view_enrollments", activity_id=activity_id))
     
-    # Get recent participants for quick selection
-    recent_emails = db.session.query(Enrollment.email, Enrollment.user_name, Enrollment.phone)\
-        .distinct(Enrollment.email)\
-        .order_by(Enrollment.email, Enrollment.created_at.desc())\
-        .limit(20)\
-        .all()
+    # Recent participants for quick selection (directory ordered by last enrollment)
+    return render_template("admin/internal_enrollment.html", activity=activity,
+                           recent_participants=recent_participants(10))
+
+
+# ==============================
+# DIRECTORIO DE PARTICIPANTES (AUTOCOMPLETADO)
+# ==============================
+@admin_bp.route("/participants")
+@login_required
+@admin_required
+def participants():
+    """Participantes cuyo nombre o email empieza por ?q= (mínimo 2 caracteres)"""
+    query_text = request.args.get("q", "").strip()
+    found = search_participants(query_text) if len(query_text) >= 2 else []
+    return jsonify({"participants": [
+        {"name": participant.name, "email": participant.email, "phone": participant.phone}
+        for participant in found
+    ]})
+
+
+# ==============================
+# IMPORTACIÓN MASIVA DE INSCRITOS (CSV)
+# ==============================
+@admin_bp.route("/activity/<int:activity_id>/import", methods=["GET", "POST"])
+@login_required
+@admin_required
+def import_enrollments(activity_id):
+    """Importar inscripciones presenciales desde un CSV (hojas de inscripción en papel)"""
+    activity = Activity.query.get_or_404(activity_id)
+    report = None
+    
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Selecciona un fichero CSV", "error")
+            return redirect(url_for("admin.import_enrollments", activity_id=activity_id))
+        
+        try:
+            rows = parse_import_csv(upload.read())
+        except ValueError as e:
+            flash(str(e), "error")
+            return redirect(url_for("admin.import_enrollments", activity_id=activity_id))
+        
+        try:
+            report = bulk_create_enrollments(activity, rows)
+            db.session.commit()
+            invalidate_activity()
+            publish_activity(activity_id)
+        except IntegrityError:
+            # Another enrollment with one of these emails was committed meanwhile
+            db.session.rollback()
+            flash("Alguna de las personas se ha inscrito mientras tanto. Vuelve a importar el fichero.", "error")
+            return redirect(url_for("admin.import_enrollments", activity_id=activity_id))
+        
+        accepted = sum(1 for entry in report if entry['accepted'])
+        flash(f"{accepted} de {len(report)} inscripciones importadas", "success" if accepted == len(report) else "warning")
     
-    return render_template("admin/internal_enrollment.html", activity=activity, recent_participants=recent_emails)
+    return render_template("admin/import_enrollments.html", activity=activity, report=report)
 
 
 # ==============================
@@ -184,35 +472,49 @@ def internal_enrollment(activity_id):
 def export_enrollments(activity_id):
     """Exportar lista de inscritos a CSV"""
     activity = Activity.query.get_or_404(activity_id)
-    enrollments = Enrollment.query.filter_by(activity_id=activity_id).all()
+    filename = f"inscritos_{activity.title.replace(' ', '_')}.csv"
     
-    # Create CSV in memory
-    si = StringIO()
-    writer = csv.writer(si)
+    rows = (export_row(row) for row in enrollment_export_query(activity_id))
     
-    # Header
-    writer.writerow(['Nombre', 'Email', 'Teléfono', 'Fecha de inscripción', 'Estado', 'Asistencia'])
+    # Streamed response: each CSV chunk is sent as soon as it is written
+    return Response(
+        stream_with_context(iter_csv(EXPORT_HEADER, rows)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": content_disposition(filename)}
+    )
+
+
+# ==============================
+# EXPORTACIÓN MASIVA
+# ==============================
+@admin_bp.route("/export")
+@login_required
+@admin_required
+def bulk_export():
+    """Exportar inscritos de varias actividades (ZIP con un CSV por actividad o CSV único)"""
+    try:
+        filters = parse_filters(request.args)
+    except ValueError:
+        return "Parámetros inválidos", 400
     
-    # Data
-    for e in enrollments:
-        attended_str = 'Asistió' if e.attended == True else ('No asistió' if e.attended == False else 'Pendiente')
-        writer.writerow([
-            e.user_name,
-            e.email,
-            e.phone or '',
-            e.enrollment_date.strftime('%Y-%m-%d %H:%M') if e.enrollment_date else '',
-            e.status,
-            attended_str
-        ])
+    activity_type = request.args.get("type") or None
+    export_format = request.args.get("format", "zip")
+    if export_format not in ("zip", "csv"):
+        return "Formato inválido", 400
     
-    output = si.getvalue()
-    si.close()
+    rows = bulk_export_query(activity_type=activity_type, **filters)
+    
+    if export_format == "zip":
+        return Response(
+            stream_with_context(iter_zip(rows)),
+            mimetype="application/zip",
+            headers={"Content-Disposition": content_disposition("inscritos.zip")}
+        )
     
-    # Return as downloadable file
     return Response(
-        output,
+        stream_with_context(iter_combined_csv(rows)),
         mimetype="text/csv",
-        headers={"Content-Disposition": f"attachment;filename=inscritos_{activity.title.replace(' ', '_')}.csv"}
+        headers={"Content-Disposition": content_disposition("inscritos.csv")}
     )
 
 
@@ -226,14 +528,30 @@ def delete_activity(activity_id):
     """Eliminar una actividad y todas sus inscripciones"""
     activity = Activity.query.get_or_404(activity_id)
     
-    # Las inscripciones se eliminan automáticamente por cascade
+    title = activity.title
+    
+    # Borrado en bloque de las inscripciones: sus contadores desaparecen con la actividad
+    Enrollment.query.filter_by(activity_id=activity_id).delete(synchronize_session=False)
     db.session.delete(activity)
     db.session.commit()
+    invalidate_activity(activity_id)
+    publish_activity(activity_id)
     
-    flash(f"Actividad '{activity.title}' eliminada correctamente", "success")
+    flash(f"Actividad '{title}' eliminada correctamente", "success")
     return redirect(url_for("admin.dashboard"))
 
 
+# ==============================
+# ESTADÍSTICAS DE CACHÉ
+# ==============================
+@admin_bp.route("/cache")
+@login_required
+@admin_required
+def cache_stats():
+    """Aciertos/fallos de las cachés de páginas y de usuarios (para dimensionarlas)"""
+    return jsonify({"pages": current_page_cache().stats(), "users": current_user_cache().stats()})
+
+
 # ==============================
 # INFORMES BÁSICOS
 # ==============================
@@ -241,28 +559,30 @@ def delete_activity(activity_id):
 @login_required
 @admin_required
 def reports():
-    """Vista de informes básicos"""
-    
-    # Total de actividades por estado
-    activities_by_status = db.session.query(
-        Activity.status, 
-        func.count(Activity.id)
-    ).group_by(Activity.status).all()
-    
-    # Actividades con más inscripciones
-    top_activities = db.session.query(
-        Activity,
-        func.count(Enrollment.id).label('enrollment_count')
-    ).outerjoin(Enrollment).group_by(Activity.id).order_by(func.count(Enrollment.id).desc()).limit(10).all()
-    
-    # Estadísticas generales
-    total_activities = Activity.query.count()
-    total_enrollments = Enrollment.query.count()
-    total_attended = Enrollment.query.filter_by(attended=True).count()
-    
-    return render_template("admin/reports.html", 
-                         activities_by_status=activities_by_status,
-                         top_activities=top_activities,
-                         total_activities=total_activities,
-                         total_enrollments=total_enrollments,
-                         total_attended=total_attended)
+    """Vista de informes básicos, leída de las tablas de resumen"""
+    try:
+        trends = _trends()
+    except ValueError:
+        return "Parámetros inválidos", 400
+    return render_template("admin/reports.html", trends=trends, **report_summary())
+
+
+@admin_bp.route("/reports/trends")
+@login_required
+@admin_required
+def reports_trends():
+    """Series mensuales o semanales de los informes, en JSON"""
+    try:
+        return jsonify(_trends())
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+
+def _trends():
+    trends = trend_series(
+        request.args.get("period", "month"),
+        current_app.config["TREND_BUCKETS"],
+        close_after_days=current_app.config["TREND_CLOSE_AFTER_DAYS"]
+    )
+    db.session.commit()  # closed periods computed for the first time
+    return trends
@@ -0,0 +1,124 @@
+import hashlib
+from datetime import date
+from flask import Blueprint, request, jsonify, current_app, Response, url_for
+from app.services.activity_service import (
+    list_catalog, parse_filters, catalog_version, activity_row
+)
+
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
+
+def _etag(*parts):
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _conditional(etag, build):
+    """
+    JSON response for ``etag``; 304 without building it if the client has it.
+
+    ``build`` is only called when the representation must be sent, so a
+    matching ``If-None-Match`` costs just the version query.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    # Clients may store the response but must revalidate before using it
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _not_found():
+    return jsonify({"error": "Actividad no encontrada"}), 404
+
+
+# ==============================
+# LISTADO DE ACTIVIDADES
+# ==============================
+@api_bp.route("/activities")
+def activities():
+    """Catálogo público: mismos filtros y paginación que /activities/"""
+    try:
+        filters = parse_filters(request.args, default_from=date.today())
+        etag = _etag("activities", request.full_path, catalog_version(**filters))
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+    def build():
+        page = list_catalog(
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+            per_page=current_app.config["ACTIVITIES_PER_PAGE"],
+            **filters
+        )
+        args = {key: value for key, value in request.args.items() if key not in ("after", "before")}
+        return {
+            "activities": [
+                {
+                    "id": item["id"],
+                    "title": item["title"],
+                    "date": _isoformat(item["date"]),
+                    "status": item["status"],
+                    "available_slots": item["available_slots"],
+                    "url": url_for("api.activity", activity_id=item["id"]),
+                }
+                for item in page.items
+            ],
+            "next": url_for("api.activities", after=page.next_cursor, **args) if page.next_cursor else None,
+            "prev": url_for("api.activities", before=page.prev_cursor, **args) if page.prev_cursor else None,
+        }
+
+    try:
+        return _conditional(etag, build)
+    except ValueError:
+        return jsonify({"error": "Parámetros inválidos"}), 400
+
+
+# ==============================
+# DETALLE Y DISPONIBILIDAD
+# ==============================
+@api_bp.route("/activities/<int:activity_id>")
+def activity(activity_id):
+    row = activity_row(activity_id)
+    if row is None:
+        return _not_found()
+
+    etag = _etag("activity", row.id, _isoformat(row.updated_at), row.enrolled_count)
+    return _conditional(etag, lambda: {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "type": row.type,
+        "date": _isoformat(row.date),
+        "time": row.time,
+        "duration": row.duration,
+        "status": row.status,
+        "max_slots": row.max_slots,
+        "enrolled": row.enrolled_count,
+        "available_slots": row.max_slots - row.enrolled_count,
+        "availability_url": url_for("api.availability", activity_id=row.id),
+    })
+
+
+@api_bp.route("/activities/<int:activity_id>/availability")
+def availability(activity_id):
+    """Plazas libres, para pantallas que sondean con frecuencia"""
+    row = activity_row(activity_id)
+    if row is None:
+        return _not_found()
+
+    available = row.max_slots - row.enrolled_count
+    etag = _etag("availability", row.id, row.status, row.max_slots, row.enrolled_count)
+    return _conditional(etag, lambda: {
+        "id": row.id,
+        "status": row.status,
+        "max_slots": row.max_slots,
+        "enrolled": row.enrolled_count,
+        "available_slots": available,
+        "open": row.status == "abierta" and available > 0,
+    })
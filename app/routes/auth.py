@@ -1,7 +1,7 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required
-from app.extensions import db
-from app.models.user import User
+from app.passwords import HasherBusy
+from app.services.auth_service import authenticate
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -11,9 +11,13 @@ def login():
         username = request.form.get("username")
         password = request.form.get("password")
         
-        user = User.query.filter_by(username=username).first()
+        try:
+            user = authenticate(username, password)
+        except HasherBusy:
+            flash("Hay demasiados inicios de sesión en curso. Inténtalo de nuevo en unos segundos.", "error")
+            return render_template("login.html"), 503
         
-        if user and user.check_password(password):
+        if user:
             login_user(user)
             return redirect(url_for("activities.index"))
         else:
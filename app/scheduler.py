@@ -0,0 +1,61 @@
+"""
+Runner of the date-driven status transitions (app/services/status_service.py).
+
+Run ``flask update-statuses`` from cron every minute, or set
+``STATUS_SCHEDULER_INTERVAL`` (seconds) to run it in a background thread
+of each web process. Transitions are idempotent, so several processes
+running it at once do no harm.
+
+The page cache and the live slot stream are per process, so only the
+background thread refreshes them at once. From cron the web workers keep
+cached pages until they expire (``PAGE_CACHE_TTL``) and stream clients
+see the new status on their next page load; set the interval when
+either delay matters.
+"""
+import threading
+from flask import current_app
+from app.extensions import db
+from app.cache import invalidate_activity
+from app.slot_hub import publish_activity
+from app.services.status_service import update_statuses
+
+
+def run_status_update(now=None):
+    """
+    Apply and commit the due transitions, then drop the cached pages and
+    push the slots of the changed activities in this process.
+    """
+    changed = update_statuses(now, current_app.config["STATUS_CLOSE_LEAD_MINUTES"])
+    db.session.commit()
+    for activity_ids in changed.values():
+        for activity_id in activity_ids:
+            invalidate_activity(activity_id)
+            publish_activity(activity_id)
+    return changed
+
+
+def _run_forever(app, interval, stop):
+    while True:
+        with app.app_context():
+            try:
+                run_status_update()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("Error al actualizar estados de actividades")
+            finally:
+                db.session.remove()
+        if stop.wait(interval):
+            return
+
+
+def start_scheduler(app):
+    """Start the background thread if ``STATUS_SCHEDULER_INTERVAL`` > 0. Returns its stop event."""
+    interval = app.config.get("STATUS_SCHEDULER_INTERVAL", 0)
+    if interval <= 0:
+        return None
+    stop = threading.Event()
+    thread = threading.Thread(target=_run_forever, args=(app, interval, stop),
+                              name="status-scheduler", daemon=True)
+    thread.start()
+    app.extensions["status_scheduler"] = stop
+    return stop
@@ -0,0 +1,203 @@
+from datetime import date
+from sqlalchemy import and_, literal, func, exists, tuple_
+from sqlalchemy.orm import aliased
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.pagination import Page, keyset_page
+
+
+ACTIVITY_STATUSES = ["borrador", "abierta", "cerrada", "finalizada"]
+
+
+def parse_filters(args, default_from=None):
+    """
+    Read the ``from``/``to``/``status`` listing filters from request args.
+
+    ``default_from`` applies only when ``from`` is absent; an empty ``from``
+    removes the lower bound. Raises ValueError on invalid values.
+    """
+    date_from = args.get("from")
+    date_to = args.get("to")
+    status = args.get("status") or None
+
+    if date_from is None:
+        date_from = default_from
+    elif date_from:
+        date_from = date.fromisoformat(date_from)
+    else:
+        date_from = None
+
+    date_to = date.fromisoformat(date_to) if date_to else None
+
+    if status is not None and status not in ACTIVITY_STATUSES:
+        raise ValueError(f"Estado inválido: {status}")
+
+    return {"date_from": date_from, "date_to": date_to, "status": status}
+
+
+def filter_args(filters):
+    """Filters back as query-string values, to keep them in pagination links."""
+    return {
+        "from": filters["date_from"].isoformat() if filters["date_from"] else "",
+        "to": filters["date_to"].isoformat() if filters["date_to"] else "",
+        "status": filters["status"] or ""
+    }
+
+
+def _filter_predicates(entity, date_from=None, date_to=None, status=None, activity_type=None, series_id=None):
+    predicates = []
+    if status is not None:
+        predicates.append(entity.status == status)
+    if activity_type is not None:
+        predicates.append(entity.type == activity_type)
+    if series_id is not None:
+        predicates.append(entity.series_id == series_id)
+    if date_from is not None:
+        predicates.append(entity.date >= date_from)
+    if date_to is not None:
+        predicates.append(entity.date <= date_to)
+    return predicates
+
+
+def filter_activities(query, **filters):
+    """Apply the listing filters as range/equality predicates on Activity."""
+    return query.filter(*_filter_predicates(Activity, **filters))
+
+
+def catalog_query(user_id=None, include_drafts=False, collapse_series=False, **filters):
+    """
+    Build the catalogue listing as a single query.
+
+    Each row carries the activity columns shown in the listing, the
+    denormalized enrollment counter and whether ``user_id`` is enrolled
+    (outer join on that user's enrollment). With ``collapse_series`` a
+    recurring series shows only its first session matching the filters:
+    a NOT EXISTS over ``ix_activity_series_date`` drops the later ones.
+    """
+    if user_id is not None:
+        own = aliased(Enrollment)
+        user_enrolled = own.id.isnot(None)
+    else:
+        own = None
+        user_enrolled = literal(False)
+
+    query = db.session.query(
+        Activity.id,
+        Activity.title,
+        Activity.date,
+        Activity.status,
+        Activity.max_slots,
+        Activity.enrolled_count,
+        Activity.series_id,
+        user_enrolled.label("user_enrolled")
+    )
+
+    if own is not None:
+        query = query.outerjoin(own, and_(
+            own.activity_id == Activity.id,
+            own.user_id == user_id
+        ))
+
+    if not include_drafts:
+        query = query.filter(Activity.status != 'borrador')
+
+    if collapse_series:
+        earlier = aliased(Activity)
+        predicates = _filter_predicates(earlier, **filters)
+        if not include_drafts:
+            predicates.append(earlier.status != 'borrador')
+        query = query.filter(~exists().where(
+            earlier.series_id == Activity.series_id,
+            tuple_(earlier.date, earlier.id) < tuple_(Activity.date, Activity.id),
+            *predicates
+        ))
+
+    return filter_activities(query, **filters)
+
+
+def list_catalog(user_id=None, include_drafts=False, after=None, before=None, per_page=24, **filters):
+    """Return a ``Page`` of catalogue dicts ready for ``activities.html``, by date."""
+    page = keyset_page(
+        catalog_query(user_id, include_drafts, **filters),
+        Activity.date, Activity.id, per_page,
+        after=after, before=before
+    )
+    items = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "date": row.date,
+            "status": row.status,
+            "available_slots": row.max_slots - row.enrolled_count,
+            "user_enrolled": bool(row.user_enrolled),
+            "series_id": row.series_id
+        }
+        for row in page.items
+    ]
+    return Page(items, page.next_cursor, page.prev_cursor)
+
+
+def dashboard_rows(after=None, before=None, per_page=50, **filters):
+    """
+    Page of activity rows for the admin dashboard, newest first.
+
+    Only the displayed columns and the denormalized counters are selected,
+    so no ``Enrollment`` (or ``Activity``) objects are materialized.
+    """
+    query = db.session.query(
+        Activity.id,
+        Activity.title,
+        Activity.description,
+        Activity.type,
+        Activity.date,
+        Activity.time,
+        Activity.status,
+        Activity.max_slots,
+        Activity.enrolled_count,
+        Activity.attended_count
+    )
+    return keyset_page(
+        filter_activities(query, **filters),
+        Activity.date, Activity.id, per_page,
+        after=after, before=before, descending=True
+    )
+
+
+def catalog_version(include_drafts=False, **filters):
+    """
+    Cheap fingerprint of the catalogue rows matching ``filters``.
+
+    One aggregate over the filtered activities: how many there are, the
+    latest ``updated_at`` (counter updates bump it too) and the total of
+    enrolled counts. Any change to a listed activity or its enrollments
+    changes the result.
+    """
+    query = db.session.query(
+        func.count(Activity.id),
+        func.max(Activity.updated_at),
+        func.sum(Activity.enrolled_count)
+    )
+    if not include_drafts:
+        query = query.filter(Activity.status != 'borrador')
+    return tuple(filter_activities(query, **filters).one())
+
+
+def activity_row(activity_id, include_drafts=False):
+    """Columns of one activity (no ORM object), or None if it does not exist."""
+    query = db.session.query(
+        Activity.id,
+        Activity.title,
+        Activity.description,
+        Activity.type,
+        Activity.date,
+        Activity.time,
+        Activity.duration,
+        Activity.status,
+        Activity.max_slots,
+        Activity.enrolled_count,
+        Activity.updated_at
+    ).filter(Activity.id == activity_id)
+    if not include_drafts:
+        query = query.filter(Activity.status != 'borrador')
+    return query.one_or_none()
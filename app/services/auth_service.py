@@ -0,0 +1,42 @@
+from app.extensions import db
+from app.models.user import User
+from app.passwords import current_hasher, HasherBusy
+
+# Verified when the username does not exist, so both cases cost one hash
+# and response times do not reveal which usernames are registered.
+_DUMMY_HASHES = {}
+
+
+def _dummy_hash(hasher):
+    if hasher.method not in _DUMMY_HASHES:
+        _DUMMY_HASHES[hasher.method] = hasher.hash("dummy-password")
+    return _DUMMY_HASHES[hasher.method]
+
+
+def authenticate(username, password):
+    """
+    Return the ``User`` for valid credentials, or None.
+
+    A stored hash made with outdated parameters is replaced by one using
+    the configured method, now that the plain password is known (in the
+    hashing pool; if it is saturated, on a later login). Raises
+    ``HasherBusy`` when the pool is saturated for the verification.
+    """
+    hasher = current_hasher()
+    user = User.query.filter_by(username=username).first()
+
+    if user is None:
+        hasher.verify(_dummy_hash(hasher), password or "")
+        return None
+
+    if not hasher.verify(user.password_hash, password or ""):
+        return None
+
+    if hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hasher.rehash(password)
+        except HasherBusy:
+            return user
+        db.session.commit()
+
+    return user
@@ -0,0 +1,377 @@
+import csv
+import unicodedata
+from datetime import date
+from io import StringIO
+from sqlalchemy import func, case, update, insert
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.report_service import record_counter_change, rebuild_rollups
+from app.services.participant_service import normalize_email, record_participant, record_participants
+from app.services.pagination import Page, keyset_page
+
+
+def _adjust_counters(activity_id, enrolled=0, attended=0):
+    """Apply a relative change to the activity counters in the current transaction."""
+    values = {}
+    if enrolled:
+        values[Activity.enrolled_count] = Activity.enrolled_count + enrolled
+    if attended:
+        values[Activity.attended_count] = Activity.attended_count + attended
+    if values:
+        Activity.query.filter_by(id=activity_id).update(values)
+        record_counter_change(activity_id, enrolled=enrolled, attended=attended)
+
+
+def reserve_slot(activity_id):
+    """
+    Atomically take one slot of an activity.
+
+    A single guarded ``UPDATE ... WHERE enrolled_count < max_slots`` so two
+    concurrent requests can never both get the last slot; the row is locked
+    only by the database for the duration of the statement. Returns True if
+    the slot was reserved. The reservation is undone if the transaction is
+    rolled back.
+    """
+    updated = Activity.query.filter(
+        Activity.id == activity_id,
+        Activity.enrolled_count < Activity.max_slots
+    ).update(
+        {Activity.enrolled_count: Activity.enrolled_count + 1},
+        synchronize_session=False
+    )
+    if updated == 1:
+        record_counter_change(activity_id, enrolled=1)
+    return updated == 1
+
+
+def reserve_slots(activity_id, wanted):
+    """
+    Take up to ``wanted`` slots of an activity, or as many as are left.
+
+    Reads the current count, then adds to it with an UPDATE guarded on that
+    count (compare-and-set); if another transaction changed it in between,
+    the UPDATE matches no row and the loop reads again. Returns how many
+    slots were reserved (possibly 0).
+    """
+    while wanted > 0:
+        row = db.session.query(Activity.enrolled_count, Activity.max_slots) \
+            .filter(Activity.id == activity_id).one()
+        take = min(wanted, row.max_slots - row.enrolled_count)
+        if take <= 0:
+            return 0
+        updated = Activity.query.filter(
+            Activity.id == activity_id,
+            Activity.enrolled_count == row.enrolled_count
+        ).update(
+            {Activity.enrolled_count: Activity.enrolled_count + take},
+            synchronize_session=False
+        )
+        if updated == 1:
+            record_counter_change(activity_id, enrolled=take)
+            return take
+    return 0
+
+
+def create_enrollment(activity, user_name, email, phone=None, user_id=None):
+    """
+    Reserve a slot and add the enrollment to the session.
+
+    The email is stored normalized and the participant directory is
+    updated. Returns the new enrollment, or None if the activity is full.
+    The caller is responsible for committing (or rolling back on
+    IntegrityError).
+    """
+    if not reserve_slot(activity.id):
+        return None
+
+    enrollment = Enrollment(
+        user_name=user_name,
+        email=normalize_email(email),
+        phone=phone,
+        activity_id=activity.id,
+        user_id=user_id
+    )
+    db.session.add(enrollment)
+    db.session.flush()
+    db.session.expire(activity, ['enrolled_count'])
+    record_participant(user_name, email, phone)
+    return enrollment
+
+
+def delete_enrollment(enrollment):
+    """Delete an enrollment and decrement the counters it contributed to."""
+    _adjust_counters(
+        enrollment.activity_id,
+        enrolled=-1,
+        attended=-1 if enrollment.attended is True else 0
+    )
+    db.session.delete(enrollment)
+
+
+def set_attendance(enrollment, attended):
+    """Set ``enrollment.attended`` (True, False or None) keeping ``attended_count`` in sync."""
+    delta = int(attended is True) - int(enrollment.attended is True)
+    enrollment.attended = attended
+    _adjust_counters(enrollment.activity_id, attended=delta)
+
+
+def set_attendance_bulk(activity_id, states):
+    """
+    Apply many attendance states of one activity at once.
+
+    ``states`` maps enrollment id to True, False or None. Runs one
+    ``UPDATE ... WHERE id IN (...)`` per state and then recounts the
+    activity, all in the caller's transaction. Returns the rows updated.
+    """
+    ids_by_state = {True: [], False: [], None: []}
+    for enrollment_id, attended in states.items():
+        ids_by_state[attended].append(enrollment_id)
+
+    updated = 0
+    for attended, ids in ids_by_state.items():
+        if ids:
+            updated += Enrollment.query.filter(
+                Enrollment.activity_id == activity_id,
+                Enrollment.id.in_(ids)
+            ).update({Enrollment.attended: attended}, synchronize_session=False)
+
+    recount_activities([activity_id])
+    return updated
+
+
+def user_enrollments(user_id, when="upcoming", today=None, after=None, before=None, per_page=24):
+    """
+    Page of a user's enrollments with their activity, for "Mis inscripciones".
+
+    ``when`` is ``upcoming`` (from ``today``, soonest first) or ``past``
+    (most recent first). One join from ``ix_enrollment_user`` to
+    the activity primary key, keyset-paginated by activity date. Raises
+    ValueError on an unknown ``when`` or a malformed cursor.
+    """
+    if when not in ("upcoming", "past"):
+        raise ValueError("Periodo inválido")
+    today = today or date.today()
+
+    query = db.session.query(
+        Enrollment.id,
+        Enrollment.activity_id,
+        Enrollment.attended,
+        Enrollment.enrollment_date,
+        Activity.title,
+        Activity.date,
+        Activity.time,
+        Activity.status
+    ).join(Activity, Activity.id == Enrollment.activity_id) \
+        .filter(Enrollment.user_id == user_id)
+    if when == "upcoming":
+        query = query.filter(Activity.date >= today)
+    else:
+        query = query.filter(Activity.date < today)
+
+    page = keyset_page(query, Activity.date, Enrollment.id, per_page,
+                       after=after, before=before, descending=when == "past")
+    items = [
+        {
+            "id": row.id,
+            "activity_id": row.activity_id,
+            "title": row.title,
+            "date": row.date,
+            "time": row.time,
+            "status": row.status,
+            "attended": row.attended,
+            "enrollment_date": row.enrollment_date
+        }
+        for row in page.items
+    ]
+    return Page(items, page.next_cursor, page.prev_cursor)
+
+
+def enrollment_totals(activity_ids=None):
+    """
+    Count enrollments and attendances per activity in one grouped scan.
+
+    Returns ``(activity_id, enrolled, attended)`` rows using conditional
+    aggregation, without loading ``Enrollment`` objects.
+    """
+    query = db.session.query(
+        Enrollment.activity_id,
+        func.count(Enrollment.id).label("enrolled"),
+        func.sum(case((Enrollment.attended.is_(True), 1), else_=0)).label("attended")
+    )
+    if activity_ids is not None:
+        query = query.filter(Enrollment.activity_id.in_(activity_ids))
+    return query.group_by(Enrollment.activity_id).all()
+
+
+def recount_activities(activity_ids=None):
+    """
+    Recompute ``enrolled_count`` and ``attended_count`` from the enrollment rows.
+
+    Resets the counters and writes back the grouped totals with a bulk
+    UPDATE by primary key; pass ``activity_ids`` to limit it to some
+    activities. The report rollups follow: rebuilt after a full recount,
+    adjusted by the difference otherwise. Returns the number of
+    activities recounted.
+    """
+    query = Activity.query
+    previous = {}
+    if activity_ids is not None:
+        query = query.filter(Activity.id.in_(activity_ids))
+        previous = {
+            row.id: (row.enrolled_count, row.attended_count)
+            for row in db.session.query(Activity.id, Activity.enrolled_count, Activity.attended_count)
+            .filter(Activity.id.in_(activity_ids))
+        }
+
+    totals = enrollment_totals(activity_ids)
+
+    updated = query.update(
+        {Activity.enrolled_count: 0, Activity.attended_count: 0},
+        synchronize_session=False
+    )
+    if totals:
+        db.session.execute(update(Activity), [
+            {"id": activity_id, "enrolled_count": enrolled, "attended_count": attended}
+            for activity_id, enrolled, attended in totals
+        ])
+
+    if activity_ids is None:
+        rebuild_rollups()
+    else:
+        current = {activity_id: (enrolled, attended) for activity_id, enrolled, attended in totals}
+        for activity_id, (enrolled, attended) in previous.items():
+            new_enrolled, new_attended = current.get(activity_id, (0, 0))
+            record_counter_change(activity_id, enrolled=new_enrolled - enrolled,
+                                  attended=new_attended - attended)
+    db.session.expire_all()
+    return updated
+
+
+# Cabeceras aceptadas en la importación (sin acentos ni mayúsculas)
+IMPORT_COLUMNS = {
+    'nombre': 'name',
+    'name': 'name',
+    'email': 'email',
+    'correo': 'email',
+    'telefono': 'phone',
+    'phone': 'phone'
+}
+
+
+def _normalize_header(value):
+    value = unicodedata.normalize('NFKD', value or '').encode('ascii', 'ignore').decode('ascii')
+    return value.strip().lower()
+
+
+def parse_import_csv(content):
+    """
+    Parse an uploaded CSV of participants.
+
+    ``content`` is the raw upload (bytes). The first row must be a header
+    with at least name and email columns (``Nombre``/``Email``/``Teléfono``,
+    the same as the export). Comma and semicolon delimiters are accepted.
+    Returns a list of dicts with ``line``, ``name``, ``email`` and ``phone``;
+    raises ValueError if the header is not usable.
+    """
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = content.decode('latin-1')
+
+    # Excel en español guarda con punto y coma: se decide por la cabecera
+    first_line = text.split('\n', 1)[0]
+    delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+
+    reader = csv.reader(StringIO(text), delimiter=delimiter)
+    header = next(reader, None)
+    if not header:
+        raise ValueError("El fichero está vacío")
+
+    positions = {}
+    for index, column in enumerate(header):
+        field = IMPORT_COLUMNS.get(_normalize_header(column))
+        if field and field not in positions:
+            positions[field] = index
+    if 'name' not in positions or 'email' not in positions:
+        raise ValueError("El fichero debe tener columnas Nombre y Email")
+
+    def cell(values, field):
+        index = positions.get(field)
+        if index is None or index >= len(values):
+            return ''
+        return values[index].strip()
+
+    rows = []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        rows.append({
+            'line': line,
+            'name': cell(values, 'name'),
+            'email': cell(values, 'email'),
+            'phone': cell(values, 'phone')
+        })
+    return rows
+
+
+def bulk_create_enrollments(activity, rows):
+    """
+    Validate and insert a batch of in-person enrollments.
+
+    Emails are normalized; duplicates against ``unique_enrollment`` are
+    found with one ``email IN (...)`` query, slots are reserved for all accepted rows at
+    once and the enrollments are written with a single bulk INSERT. The
+    caller commits. Returns one report dict per row with ``accepted`` and
+    ``reason``.
+    """
+    report = []
+    candidates = []
+    seen = set()
+
+    for row in rows:
+        entry = dict(row, email=normalize_email(row['email']), accepted=False, reason=None)
+        report.append(entry)
+        if not entry['name'] or not entry['email']:
+            entry['reason'] = "Nombre y email son obligatorios"
+        elif '@' not in entry['email']:
+            entry['reason'] = "Email no válido"
+        elif entry['email'] in seen:
+            entry['reason'] = "Email repetido en el fichero"
+        else:
+            seen.add(entry['email'])
+            candidates.append(entry)
+
+    if candidates:
+        existing = {
+            email for (email,) in db.session.query(Enrollment.email).filter(
+                Enrollment.activity_id == activity.id,
+                Enrollment.email.in_([entry['email'] for entry in candidates])
+            )
+        }
+        for entry in candidates:
+            if entry['email'] in existing:
+                entry['reason'] = "Ya está inscrito en la actividad"
+        candidates = [entry for entry in candidates if entry['reason'] is None]
+
+    reserved = reserve_slots(activity.id, len(candidates))
+    for entry in candidates[reserved:]:
+        entry['reason'] = "No hay plazas disponibles"
+    accepted = candidates[:reserved]
+
+    if accepted:
+        db.session.execute(insert(Enrollment), [
+            {
+                'user_name': entry['name'],
+                'email': entry['email'],
+                'phone': entry['phone'] or None,
+                'activity_id': activity.id
+            }
+            for entry in accepted
+        ])
+        for entry in accepted:
+            entry['accepted'] = True
+        record_participants((entry['name'], entry['email'], entry['phone']) for entry in accepted)
+        db.session.expire(activity, ['enrolled_count'])
+
+    return report
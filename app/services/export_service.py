@@ -0,0 +1,205 @@
+import csv
+import unicodedata
+import re
+import zipfile
+from io import StringIO
+from urllib.parse import quote
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.activity_service import filter_activities
+
+
+EXPORT_HEADER = ['Nombre', 'Email', 'Teléfono', 'Fecha de inscripción', 'Estado', 'Asistencia']
+
+# Rows fetched from the cursor (and written to the response) per chunk
+EXPORT_BATCH_SIZE = 500
+
+
+def attendance_label(attended):
+    if attended is True:
+        return 'Asistió'
+    if attended is False:
+        return 'No asistió'
+    return 'Pendiente'
+
+
+def enrollment_export_query(activity_id):
+    """Only the exported columns, streamed from the cursor in batches."""
+    return db.session.query(
+        Enrollment.user_name,
+        Enrollment.email,
+        Enrollment.phone,
+        Enrollment.enrollment_date,
+        Enrollment.status,
+        Enrollment.attended
+    ).filter(Enrollment.activity_id == activity_id) \
+        .order_by(Enrollment.enrollment_date, Enrollment.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def bulk_export_query(**filters):
+    """
+    One ordered scan over activities and their enrollments for bulk exports.
+
+    Activities are outer-joined so those without enrollments still appear
+    (with null enrollment columns). Rows come grouped by activity, ordered
+    by ``(date, id)`` and then by enrollment date.
+    """
+    query = db.session.query(
+        Activity.id.label("activity_id"),
+        Activity.title.label("activity_title"),
+        Activity.date.label("activity_date"),
+        Enrollment.id.label("enrollment_id"),
+        Enrollment.user_name,
+        Enrollment.email,
+        Enrollment.phone,
+        Enrollment.enrollment_date,
+        Enrollment.status,
+        Enrollment.attended
+    ).outerjoin(Enrollment, Enrollment.activity_id == Activity.id)
+
+    return filter_activities(query, **filters) \
+        .order_by(Activity.date, Activity.id, Enrollment.enrollment_date, Enrollment.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def export_row(row):
+    return [
+        row.user_name,
+        row.email,
+        row.phone or '',
+        row.enrollment_date.strftime('%Y-%m-%d %H:%M') if row.enrollment_date else '',
+        row.status,
+        attendance_label(row.attended)
+    ]
+
+
+def iter_csv(header, rows, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Serialize ``rows`` (already converted to lists) as CSV text chunks.
+
+    Yields the header first and then one chunk every ``batch_size`` rows,
+    so the first byte goes out before the whole result is read.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
+
+    writer.writerow(header)
+    yield flush()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_size:
+            pending = 0
+            yield flush()
+
+    if pending:
+        yield flush()
+
+
+def ascii_filename(name):
+    """ASCII-only version of ``name`` safe for file names."""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', name)
+
+
+def content_disposition(filename):
+    """
+    ``Content-Disposition`` for a download whose name may contain accents.
+
+    Sends an ASCII fallback in ``filename`` and the exact UTF-8 name in
+    ``filename*`` (RFC 6266 / RFC 5987).
+    """
+    return f"attachment; filename=\"{ascii_filename(filename)}\"; filename*=UTF-8''{quote(filename)}"
+
+
+COMBINED_HEADER = ['Actividad', 'Fecha actividad'] + EXPORT_HEADER
+
+
+def iter_combined_csv(rows):
+    """Single CSV for a bulk export, with the activity in the first columns."""
+    return iter_csv(COMBINED_HEADER, (
+        [row.activity_title, row.activity_date.isoformat()] + export_row(row)
+        for row in rows
+        if row.enrollment_id is not None
+    ))
+
+
+class _ZipStream:
+    """Write-only file object that hands out what ``zipfile`` wrote so far."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(rows, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Stream a ZIP archive with one CSV per activity from grouped ``rows``.
+
+    The archive is written on the fly (no seeking, data descriptors after
+    each member), so memory stays bounded by one batch of rows.
+    """
+    stream = _ZipStream()
+    archive = zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    member = None
+    current_activity = None
+    pending = 0
+
+    def flush_rows():
+        member.write(buffer.getvalue().encode('utf-8'))
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    for row in rows:
+        if row.activity_id != current_activity:
+            if member is not None:
+                flush_rows()
+                member.close()
+                yield stream.pop()
+            current_activity = row.activity_id
+            name = f"{row.activity_date.isoformat()}_{row.activity_id}_{ascii_filename(row.activity_title)}.csv"
+            member = archive.open(name, mode='w')
+            writer.writerow(EXPORT_HEADER)
+            pending = 0
+
+        if row.enrollment_id is not None:
+            writer.writerow(export_row(row))
+            pending += 1
+            if pending >= batch_size:
+                pending = 0
+                flush_rows()
+                yield stream.pop()
+
+    if member is not None:
+        flush_rows()
+        member.close()
+    archive.close()
+    yield stream.pop()
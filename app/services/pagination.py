@@ -0,0 +1,65 @@
+from collections import namedtuple
+from datetime import date
+from sqlalchemy import tuple_
+
+
+Page = namedtuple("Page", ["items", "next_cursor", "prev_cursor"])
+
+
+def encode_cursor(row):
+    """Cursor for a row exposing ``date`` and ``id`` (e.g. ``2026-05-01_42``)."""
+    return f"{row.date.isoformat()}_{row.id}"
+
+
+def decode_cursor(cursor):
+    """Inverse of ``encode_cursor``. Raises ValueError on malformed cursors."""
+    day, _, row_id = cursor.partition("_")
+    return date.fromisoformat(day), int(row_id)
+
+
+def keyset_page(query, date_column, id_column, per_page, after=None, before=None, descending=False):
+    """
+    Return one page of ``query`` ordered by ``(date, id)`` using keyset pagination.
+
+    Instead of OFFSET, the page starts right after (or before) the row
+    encoded in the cursor, so every page is a bounded range scan and page
+    N costs the same as page 1. ``query`` must not be ordered yet and its
+    rows must expose ``date`` and ``id``.
+    """
+    key = tuple_(date_column, id_column)
+    forward = before is None
+
+    if forward:
+        if after:
+            bound = decode_cursor(after)
+            query = query.filter(key < bound if descending else key > bound)
+        walk_descending = descending
+    else:
+        bound = decode_cursor(before)
+        query = query.filter(key > bound if descending else key < bound)
+        walk_descending = not descending
+
+    if walk_descending:
+        query = query.order_by(date_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(date_column, id_column)
+
+    rows = query.limit(per_page + 1).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return Page(rows, None, None)
+
+    if forward:
+        has_next, has_prev = has_more, after is not None
+    else:
+        has_next, has_prev = True, has_more
+
+    return Page(
+        rows,
+        encode_cursor(rows[-1]) if has_next else None,
+        encode_cursor(rows[0]) if has_prev else None
+    )
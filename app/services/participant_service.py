@@ -0,0 +1,118 @@
+"""
+Participant directory: returning participants found by name or email prefix.
+
+Emails are compared by ``normalize_email`` everywhere (the directory key
+and the enrollment duplicate checks), so ``Ana@Example.com `` and
+``ana@example.com`` are the same person. Searches are range scans over
+the unique email index and the folded-name index, never a LIKE scan.
+"""
+import unicodedata
+from datetime import datetime
+from sqlalchemy import or_, select, insert, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+from app.models.enrollment import Enrollment
+from app.models.participant import Participant
+
+# Sorts after every character, so ``key <= x < key + _PREFIX_END`` is "starts with key"
+_PREFIX_END = "\U0010ffff"
+
+
+def normalize_email(email):
+    """Key used to compare emails: trimmed and case-folded."""
+    return (email or "").strip().casefold()
+
+
+def fold_name(name):
+    """Name without accents, case or repeated spaces, for prefix search."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    plain = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(plain.casefold().split())
+
+
+def _directory_row(name, email, phone, seen_at):
+    return {
+        "email": normalize_email(email),
+        "name": name.strip(),
+        "name_key": fold_name(name),
+        "phone": phone or None,
+        "last_enrolled_at": seen_at,
+    }
+
+
+def record_participants(people, seen_at=None):
+    """
+    Upsert ``(name, email, phone)`` tuples into the directory in one statement.
+
+    The latest name and enrollment date win; a known phone is kept when
+    the new enrollment has none. Runs in the caller's transaction.
+    """
+    seen_at = seen_at or datetime.utcnow()
+    rows = [_directory_row(name, email, phone, seen_at) for name, email, phone in people]
+    rows = [row for row in rows if row["email"]]
+    if not rows:
+        return
+    stmt = sqlite_insert(Participant)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Participant.email],
+        set_={
+            "name": stmt.excluded.name,
+            "name_key": stmt.excluded.name_key,
+            "phone": func.coalesce(stmt.excluded.phone, Participant.phone),
+            "last_enrolled_at": stmt.excluded.last_enrolled_at,
+        }
+    )
+    db.session.execute(stmt, rows)
+
+
+def record_participant(name, email, phone=None):
+    record_participants([(name, email, phone)])
+
+
+def participant_search_query(prefix):
+    """Query of the participants whose name or email starts with ``prefix``, most recent first."""
+    email_key = normalize_email(prefix)
+    name_key = fold_name(prefix)
+    return Participant.query.filter(or_(
+        Participant.email.between(email_key, email_key + _PREFIX_END),
+        Participant.name_key.between(name_key, name_key + _PREFIX_END)
+    )).order_by(Participant.last_enrolled_at.desc())
+
+
+def search_participants(prefix, limit=10):
+    """Up to ``limit`` participants matching ``prefix`` (none for an empty prefix)."""
+    if not normalize_email(prefix):
+        return []
+    return participant_search_query(prefix).limit(limit).all()
+
+
+def recent_participants(limit=20):
+    """The participants who enrolled most recently."""
+    return Participant.query.order_by(Participant.last_enrolled_at.desc()).limit(limit).all()
+
+
+def rebuild_participants(connection=None):
+    """
+    Recompute the directory from all enrollments (latest enrollment per email wins).
+
+    Returns the number of participants.
+    """
+    connection = connection or db.session.connection()
+    latest = {}
+    enrollments = connection.execute(
+        select(Enrollment.user_name, Enrollment.email, Enrollment.phone,
+               func.coalesce(Enrollment.enrollment_date, Enrollment.created_at).label("seen_at"))
+        .order_by("seen_at", Enrollment.id)
+    )
+    for name, email, phone, seen_at in enrollments:
+        row = _directory_row(name, email, phone, seen_at)
+        if not row["email"]:
+            continue
+        if not row["phone"] and row["email"] in latest:
+            row["phone"] = latest[row["email"]]["phone"]
+        latest[row["email"]] = row
+
+    connection.execute(delete(Participant))
+    if latest:
+        connection.execute(insert(Participant), list(latest.values()))
+    return len(latest)
@@ -0,0 +1,207 @@
+"""
+Rollup tables behind the admin reports.
+
+``report_rollup`` keeps, per status, per activity type and per month, the
+number of activities, enrollments and attendances. It is maintained
+incrementally:
+
+* enrollment and attendance writes go through the counter helpers of
+  ``enrollment_service``, which call ``record_counter_change``;
+* creating, editing or deleting an ``Activity`` is picked up by a
+  ``before_flush`` hook that moves the activity's contribution between
+  buckets;
+* set-based writes of many activities (recurring series) call
+  ``record_activity_rows`` around the statement.
+
+``rebuild_rollups`` recomputes everything from the activity counters
+(``flask rebuild-reports``).
+"""
+from sqlalchemy import event, func, insert, select, delete, inspect, literal
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.report import ReportRollup
+
+TOP_ACTIVITIES = 10
+
+
+def _buckets(status, activity_type, activity_date):
+    return [
+        ("status", status or ""),
+        ("type", activity_type or ""),
+        ("month", activity_date.strftime("%Y-%m")),
+    ]
+
+
+def _bump(session, buckets, activities=0, enrolled=0, attended=0):
+    """Add the given deltas to each ``(dimension, bucket)``, creating missing rows."""
+    if not (activities or enrolled or attended):
+        return
+    stmt = sqlite_insert(ReportRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportRollup.dimension, ReportRollup.bucket],
+        set_={
+            "activities": ReportRollup.activities + stmt.excluded.activities,
+            "enrolled": ReportRollup.enrolled + stmt.excluded.enrolled,
+            "attended": ReportRollup.attended + stmt.excluded.attended,
+        }
+    )
+    session.execute(stmt, [
+        {"dimension": dimension, "bucket": bucket,
+         "activities": activities, "enrolled": enrolled, "attended": attended}
+        for dimension, bucket in buckets
+    ])
+
+
+def record_counter_change(activity_id, enrolled=0, attended=0):
+    """Apply a change of an activity's enrollment counters to its rollup buckets."""
+    if not (enrolled or attended):
+        return
+    row = db.session.query(Activity.status, Activity.type, Activity.date) \
+        .filter(Activity.id == activity_id).one_or_none()
+    if row is not None:
+        _bump(db.session, _buckets(*row), enrolled=enrolled, attended=attended)
+
+
+def record_status_change(old_status, new_status, activities, enrolled, attended):
+    """Move totals between status buckets after a bulk status UPDATE (no flush events)."""
+    _bump(db.session, [("status", old_status)], -activities, -enrolled, -attended)
+    _bump(db.session, [("status", new_status)], activities, enrolled, attended)
+
+
+def record_activity_rows(sign, *criteria):
+    """
+    Add (``sign=1``) or take away (``sign=-1``) the activities matching ``criteria``.
+
+    For INSERTs, UPDATEs and DELETEs of many activities in one statement,
+    which skip the flush hook: call it with -1 before the write and with 1
+    after it. One grouped query per call.
+    """
+    rows = db.session.execute(
+        select(Activity.status, Activity.type, func.min(Activity.date), func.count(Activity.id),
+               func.coalesce(func.sum(Activity.enrolled_count), 0),
+               func.coalesce(func.sum(Activity.attended_count), 0))
+        .where(*criteria)
+        .group_by(Activity.status, Activity.type, func.strftime("%Y-%m", Activity.date))
+    ).all()
+    for status, activity_type, day, activities, enrolled, attended in rows:
+        _bump(db.session, _buckets(status, activity_type, day),
+              sign * activities, sign * enrolled, sign * attended)
+
+
+def rebuild_rollups(connection=None):
+    """
+    Recompute ``report_rollup`` from the activity table and its counters.
+
+    Runs on ``connection`` (used by the migrations) or the current session.
+    Returns the number of rows written.
+    """
+    executor = connection if connection is not None else db.session
+    executor.execute(delete(ReportRollup))
+
+    written = 0
+    for dimension, column in [
+        ("status", func.coalesce(Activity.status, "")),
+        ("type", func.coalesce(Activity.type, "")),
+        ("month", func.strftime("%Y-%m", Activity.date)),
+    ]:
+        grouped = select(
+            literal(dimension),
+            column,
+            func.count(Activity.id),
+            func.coalesce(func.sum(Activity.enrolled_count), 0),
+            func.coalesce(func.sum(Activity.attended_count), 0),
+        ).group_by(column)
+        result = executor.execute(insert(ReportRollup).from_select(
+            ["dimension", "bucket", "activities", "enrolled", "attended"], grouped
+        ))
+        written += result.rowcount
+    return written
+
+
+def _rollup_rows(dimension, order_by):
+    return ReportRollup.query.filter(
+        ReportRollup.dimension == dimension,
+        ReportRollup.activities > 0
+    ).order_by(order_by).all()
+
+
+def report_summary():
+    """
+    Everything ``admin/reports.html`` shows, read from precomputed rows.
+
+    The status buckets give the grand totals; the most popular activities
+    come from the ``ix_activity_enrolled_count`` index.
+    """
+    by_status = _rollup_rows("status", ReportRollup.bucket)
+    top_activities = db.session.query(
+        Activity.id, Activity.title, Activity.date, Activity.enrolled_count
+    ).order_by(Activity.enrolled_count.desc(), Activity.id).limit(TOP_ACTIVITIES).all()
+
+    return {
+        "by_status": by_status,
+        "by_type": _rollup_rows("type", ReportRollup.enrolled.desc()),
+        "by_month": _rollup_rows("month", ReportRollup.bucket.desc()),
+        "top_activities": top_activities,
+        "total_activities": sum(row.activities for row in by_status),
+        "total_enrollments": sum(row.enrolled for row in by_status),
+        "total_attended": sum(row.attended for row in by_status),
+    }
+
+
+def _stored_contribution(session, activity_id):
+    """Buckets and counters of an activity as currently stored in the database."""
+    row = session.execute(
+        select(Activity.status, Activity.type, Activity.date,
+               Activity.enrolled_count, Activity.attended_count)
+        .where(Activity.id == activity_id)
+    ).one_or_none()
+    if row is None:
+        return None
+    return _buckets(row.status, row.type, row.date), row.enrolled_count, row.attended_count
+
+
+def _pending_contribution(activity, stored=None):
+    """
+    Buckets and counters the activity will have after the flush.
+
+    Counters are normally changed by bulk UPDATEs that can leave the
+    in-session values stale, so the stored ones win unless the counter
+    itself was assigned on the object.
+    """
+    state = inspect(activity)
+    counters = []
+    for index, key in [(1, "enrolled_count"), (2, "attended_count")]:
+        added = state.attrs[key].history.added
+        if added or stored is None:
+            counters.append((added[0] if added else getattr(activity, key)) or 0)
+        else:
+            counters.append(stored[index])
+    return _buckets(activity.status, activity.type, activity.date), counters[0], counters[1]
+
+
+@event.listens_for(Session, "before_flush")
+def _track_activity_changes(session, flush_context, instances):
+    """Move the contribution of created, edited and deleted activities between buckets."""
+    # Old values are read from the database: after a commit the attributes
+    # are expired, so the attribute history does not know them.
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Activity):
+                buckets, enrolled, attended = _pending_contribution(obj)
+                _bump(session, buckets, 1, enrolled, attended)
+
+        for obj in list(session.deleted) + list(session.dirty):
+            if not isinstance(obj, Activity) or obj.id is None:
+                continue
+            if obj not in session.deleted and not session.is_modified(obj):
+                continue
+            before = _stored_contribution(session, obj.id)
+            after = None if obj in session.deleted else _pending_contribution(obj, before)
+            if before == after:
+                continue
+            if before is not None:
+                _bump(session, before[0], -1, -before[1], -before[2])
+            if after is not None:
+                _bump(session, after[0], 1, after[1], after[2])
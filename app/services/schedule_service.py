@@ -0,0 +1,122 @@
+"""
+Activity time slots and schedule-conflict detection.
+
+``Activity.starts_at``/``ends_at`` are derived from ``date``, ``time``
+("HH:MM") and ``duration`` whenever an activity is flushed. Activities
+without a time have no slot and never conflict; without a duration they
+are taken to last ``DEFAULT_DURATION_MINUTES``.
+
+An overlap lookup is a range scan of ``ix_activity_starts_at``: a slot
+overlapping ``[start, end)`` starts before ``end`` and no earlier than
+``start`` minus the longest duration stored, which is read from
+``ix_activity_duration``.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+
+DEFAULT_DURATION_MINUTES = 60
+
+_SLOT_FIELDS = ("date", "time", "duration")
+
+
+def parse_time(value):
+    """``datetime.time`` of an "HH:MM" string, or None if empty or malformed."""
+    try:
+        return datetime.strptime((value or "").strip()[:5], "%H:%M").time()
+    except ValueError:
+        return None
+
+
+def activity_slot(day, time, duration):
+    """``(starts_at, ends_at)`` of an activity, or ``(None, None)`` without a time."""
+    start_time = parse_time(time)
+    if day is None or start_time is None:
+        return None, None
+    start = datetime.combine(day, start_time)
+    return start, start + timedelta(minutes=duration or DEFAULT_DURATION_MINUTES)
+
+
+def overlapping(start, end, exclude_id=None):
+    """Query of the activities whose slot overlaps ``[start, end)``, by start time."""
+    longest = db.session.query(func.max(Activity.duration)).scalar() or 0
+    earliest = start - timedelta(minutes=max(longest, DEFAULT_DURATION_MINUTES))
+    query = Activity.query.filter(
+        Activity.starts_at >= earliest,
+        Activity.starts_at < end,
+        Activity.ends_at > start
+    )
+    if exclude_id is not None:
+        query = query.filter(Activity.id != exclude_id)
+    return query.order_by(Activity.starts_at, Activity.id)
+
+
+def schedule_conflicts(day, time, duration, exclude_id=None):
+    """Activities overlapping the slot given by ``day``, ``time`` and ``duration``."""
+    start, end = activity_slot(day, time, duration)
+    if start is None:
+        return []
+    return overlapping(start, end, exclude_id).all()
+
+
+def enrollment_conflicts(user_id, activity):
+    """Other activities the user is enrolled in that overlap ``activity``."""
+    start, end = activity_slot(activity.date, activity.time, activity.duration)
+    if start is None:
+        return []
+    return overlapping(start, end, activity.id) \
+        .join(Enrollment, Enrollment.activity_id == Activity.id) \
+        .filter(Enrollment.user_id == user_id).all()
+
+
+def slots_conflicts(slots):
+    """
+    Activities overlapping any of ``slots`` (``(start, end)`` pairs, e.g. the sessions of a series).
+
+    One range query over the whole span of the slots; the candidates are
+    then checked against each slot in memory.
+    """
+    slots = [slot for slot in slots if slot[0] is not None]
+    if not slots:
+        return []
+    candidates = overlapping(min(start for start, _ in slots), max(end for _, end in slots)).all()
+    return [
+        activity for activity in candidates
+        if any(start < activity.ends_at and activity.starts_at < end for start, end in slots)
+    ]
+
+
+def slot_values(time, duration):
+    """
+    SQL expressions of ``starts_at``/``ends_at`` from each row's ``date``,
+    for UPDATEs that set the same time and duration on many activities.
+    """
+    start_time = parse_time(time)
+    if start_time is None:
+        return {"starts_at": None, "ends_at": None}
+    start = func.printf("%s %s", Activity.date, start_time.strftime("%H:%M"))
+    minutes = duration or DEFAULT_DURATION_MINUTES
+    # Same text format as the DateTime columns written by the ORM
+    return {
+        "starts_at": func.strftime("%Y-%m-%d %H:%M:%S.000000", start),
+        "ends_at": func.strftime("%Y-%m-%d %H:%M:%S.000000", start, f"+{minutes} minutes"),
+    }
+
+
+def describe_conflicts(activities):
+    """Human-readable list of conflicting activities for flash messages."""
+    return ", ".join(f"{activity.title} ({activity.date} {activity.time})" for activity in activities)
+
+
+@event.listens_for(Session, "before_flush")
+def _update_slots(session, flush_context, instances):
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Activity):
+                continue
+            state = inspect(obj)
+            if state.pending or any(state.attrs[field].history.has_changes() for field in _SLOT_FIELDS):
+                obj.starts_at, obj.ends_at = activity_slot(obj.date, obj.time, obj.duration)
@@ -0,0 +1,87 @@
+"""
+Full-text search of the catalogue over the FTS5 index of app/models/search.py.
+
+Accents and case are folded (``musica`` finds "Música") and every word
+matches as a prefix; there is no Spanish stemmer in SQLite, so the prefix
+stands in for plurals and derived forms. Results are ranked by bm25 with
+the title weighted above the type and the description.
+"""
+import re
+from sqlalchemy import func, literal_column
+from sqlalchemy.sql import table, column
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.search import rebuild_activity_fts
+from app.services.activity_service import catalog_query
+from app.services.pagination import Page
+
+activity_fts = table("activity_fts", column("rowid"))
+
+# Column weights for bm25 (title, description, type): the title matters most
+_RANK = func.bm25(literal_column("activity_fts"), 10.0, 1.0, 5.0)
+MAX_TERMS = 8
+
+
+def match_expression(query_text):
+    """
+    FTS5 query for free text typed by a patron, or None if it has no words.
+
+    Every word must appear, as a prefix ("taller" also finds "talleres");
+    words are quoted so FTS5 operators and punctuation are taken literally.
+    """
+    words = re.findall(r"\w+", query_text or "")[:MAX_TERMS]
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_catalog(query_text, user_id=None, include_drafts=False, after=None, before=None,
+                   per_page=24, **filters):
+    """
+    Catalogue activities matching ``query_text``, most relevant first.
+
+    Same row dicts and filters as ``list_catalog``. The cursors are
+    offsets: ``after`` starts the page there, ``before`` ends it there.
+    Raises ValueError on malformed cursors.
+    """
+    match = match_expression(query_text)
+    if match is None:
+        return Page([], None, None)
+
+    if before is not None:
+        offset = max(int(before) - per_page, 0)
+    else:
+        offset = int(after) if after else 0
+    if offset < 0:
+        raise ValueError("Cursor inválido")
+
+    rows = catalog_query(user_id, include_drafts, **filters) \
+        .join(activity_fts, activity_fts.c.rowid == Activity.id) \
+        .filter(literal_column("activity_fts").op("MATCH")(match)) \
+        .order_by(_RANK, Activity.id) \
+        .offset(offset).limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    items = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "date": row.date,
+            "status": row.status,
+            "available_slots": row.max_slots - row.enrolled_count,
+            "user_enrolled": bool(row.user_enrolled),
+            "series_id": row.series_id
+        }
+        for row in rows[:per_page]
+    ]
+    return Page(
+        items,
+        str(offset + per_page) if has_more else None,
+        str(offset) if offset > 0 else None
+    )
+
+
+def rebuild_search_index():
+    """Reindex all activities (the triggers normally keep the index current)."""
+    rebuild_activity_fts(db.session.connection())
+    return db.session.query(func.count(Activity.id)).scalar()
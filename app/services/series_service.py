@@ -0,0 +1,197 @@
+"""
+Recurring activity series: generation, propagation and cancellation.
+
+A series is a template plus a recurrence rule (every ``interval`` weeks
+or months from ``starts_on`` to ``until``). Its sessions are ordinary
+activities, so enrollments, counters and reports work unchanged, but
+they are written set-based:
+
+* ``create_series`` inserts every session with one bulk INSERT;
+* ``update_series`` and ``cancel_series`` change or delete the sessions
+  from today on with one UPDATE or DELETE, leaving past sessions (and
+  sessions already finished) as they were.
+
+Bulk statements skip the session hooks, so the report rollups, the time
+slots and the delta-sync tombstones are maintained here explicitly. The
+caller commits.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+from sqlalchemy import select, insert, update, delete, func, literal, case
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.models.series import ActivitySeries
+from app.models.tombstone import Tombstone
+from app.services.report_service import record_activity_rows
+from app.services.schedule_service import activity_slot, slot_values
+
+FREQUENCIES = {"weekly": "semanal", "monthly": "mensual"}
+MAX_SESSIONS = 200
+MAX_SEASON_DAYS = 5 * 366
+
+# Template fields copied to every session
+TEMPLATE_FIELDS = ("title", "description", "type", "time", "duration", "max_slots", "status")
+
+
+def _rule_dates(starts_on, until, frequency, interval):
+    if frequency == "weekly":
+        step = 7 * interval
+        day = starts_on
+        while True:
+            yield day
+            if (until - day).days < step:
+                return
+            day += timedelta(days=step)
+    months = 0
+    while True:
+        year, month = divmod(starts_on.month - 1 + months, 12)
+        year, month = starts_on.year + year, month + 1
+        if year > until.year or date(year, month, 1) > until:
+            return
+        if starts_on.day <= calendar.monthrange(year, month)[1]:
+            day = date(year, month, starts_on.day)
+            if day <= until:
+                yield day
+        months += interval
+
+
+def occurrences(starts_on, until, frequency="weekly", interval=1):
+    """
+    Dates of the sessions of a series, from ``starts_on`` through ``until``.
+
+    Weekly series repeat on the same weekday; monthly ones on the same day
+    of the month, skipping months that do not have it (the 31st). Raises
+    ValueError on an invalid rule, a season longer than
+    ``MAX_SEASON_DAYS`` or more than ``MAX_SESSIONS`` sessions (checked as
+    the dates are generated).
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Frecuencia inválida: {frequency}")
+    if interval < 1 or until < starts_on:
+        raise ValueError("Regla de repetición inválida")
+    if (until - starts_on).days > MAX_SEASON_DAYS:
+        raise ValueError(f"La serie no puede durar más de {MAX_SEASON_DAYS} días")
+
+    dates = []
+    for day in _rule_dates(starts_on, until, frequency, interval):
+        dates.append(day)
+        if len(dates) > MAX_SESSIONS:
+            raise ValueError(f"La serie tendría más de {MAX_SESSIONS} sesiones")
+    return dates
+
+
+def series_slots(series):
+    """``(starts_at, ends_at)`` of every session the series' rule generates."""
+    return [
+        activity_slot(day, series.time, series.duration)
+        for day in occurrences(series.starts_on, series.until, series.frequency, series.interval)
+    ]
+
+
+def create_series(**fields):
+    """
+    Add the series and insert all its sessions in one statement.
+
+    ``fields`` are the ``ActivitySeries`` columns. Returns the series.
+    Raises ValueError on an invalid rule.
+    """
+    series = ActivitySeries(**fields)
+    dates = occurrences(series.starts_on, series.until, series.frequency, series.interval)
+    db.session.add(series)
+    db.session.flush()
+
+    rows = []
+    for day in dates:
+        starts_at, ends_at = activity_slot(day, series.time, series.duration)
+        row = {field: getattr(series, field) for field in TEMPLATE_FIELDS}
+        row.update(date=day, series_id=series.id, starts_at=starts_at, ends_at=ends_at)
+        rows.append(row)
+    if rows:
+        db.session.execute(insert(Activity), rows)
+        record_activity_rows(1, Activity.series_id == series.id)
+    return series
+
+
+def _future(series, today):
+    return [
+        Activity.series_id == series.id,
+        Activity.date >= (today or date.today()),
+        Activity.status != "finalizada",
+    ]
+
+
+def future_sessions(series, today=None):
+    """``(id, date)`` of the sessions that ``update_series`` and ``cancel_series`` would change."""
+    return db.session.execute(
+        select(Activity.id, Activity.date).where(*_future(series, today)).order_by(Activity.date)
+    ).all()
+
+
+def update_series(series, today=None, **fields):
+    """
+    Change the template of the series and apply it to its future sessions.
+
+    One UPDATE over the sessions from ``today`` on; a session never gets
+    fewer slots than people already enrolled. Dates are not moved. The
+    status is only applied when it changes (sessions the scheduler already
+    closed keep theirs), and sessions with enrollments are never turned
+    back into drafts. Returns the ids of the sessions changed.
+    """
+    status_changed = "status" in fields and fields["status"] != series.status
+    for field, value in fields.items():
+        setattr(series, field, value)
+    db.session.flush()
+
+    criteria = _future(series, today)
+    values = {field: getattr(series, field) for field in TEMPLATE_FIELDS
+              if field not in ("max_slots", "status")}
+    values["max_slots"] = func.max(series.max_slots, Activity.enrolled_count)
+    if status_changed and series.status == "borrador":
+        values["status"] = case((Activity.enrolled_count > 0, Activity.status), else_=series.status)
+    elif status_changed:
+        values["status"] = series.status
+    values.update(slot_values(series.time, series.duration))
+
+    record_activity_rows(-1, *criteria)
+    changed = db.session.execute(
+        update(Activity).where(*criteria).values(values).returning(Activity.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+    # By id: the new status may no longer match ``criteria`` (finalizada)
+    if changed:
+        record_activity_rows(1, Activity.id.in_(changed))
+    db.session.expire_all()
+    return changed
+
+
+def cancel_series(series, today=None):
+    """
+    Delete the future sessions of the series and their enrollments.
+
+    The series ends the day before ``today`` (or, if it had not started,
+    on its first day); past sessions are kept. Returns the ids of the
+    sessions deleted.
+    """
+    today = today or date.today()
+    criteria = _future(series, today)
+    sessions = select(Activity.id).where(*criteria)
+    deleted = db.session.scalars(sessions).all()
+
+    if deleted:
+        record_activity_rows(-1, *criteria)
+        # Same tombstones the flush hook writes when one activity is deleted
+        db.session.execute(insert(Tombstone).from_select(
+            ["entity", "entity_id", "activity_id", "deleted_at"],
+            select(literal("activity"), Activity.id, Activity.id,
+                   literal(datetime.utcnow(), Tombstone.deleted_at.type)).where(*criteria)
+        ))
+        db.session.execute(delete(Enrollment).where(Enrollment.activity_id.in_(sessions)),
+                           execution_options={"synchronize_session": False})
+        db.session.execute(delete(Activity).where(Activity.id.in_(deleted)),
+                           execution_options={"synchronize_session": False})
+
+    series.until = max(series.starts_on, min(series.until, today - timedelta(days=1)))
+    db.session.flush()
+    db.session.expire_all()
+    return deleted
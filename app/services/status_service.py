@@ -0,0 +1,63 @@
+"""
+Date-driven status transitions of activities.
+
+* ``abierta`` -> ``cerrada`` once the activity starts within the lead time
+  (``STATUS_CLOSE_LEAD_MINUTES``), so late enrollments stop in time.
+* ``abierta``/``cerrada`` -> ``finalizada`` once it has ended.
+
+Start and end are the stored ``starts_at``/``ends_at`` slot columns
+(app/services/schedule_service.py), the same ones the schedule-conflict
+checks use; an activity without time starts at midnight and ends with its
+day. Each transition is a single guarded ``UPDATE ... RETURNING`` over the
+``(status, date)`` index, so running it every minute is cheap and running
+it twice changes nothing. Drafts are never touched. Dates and times are
+the library's local time.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import update, and_, or_
+from app.extensions import db
+from app.models.activity import Activity
+from app.services.report_service import record_status_change
+
+
+def _transition(old_status, new_status, *conditions):
+    """Move matching activities to ``new_status``. Returns the changed ids."""
+    changed = db.session.execute(
+        update(Activity)
+        .where(Activity.status == old_status, *conditions)
+        .values(status=new_status)
+        .returning(Activity.id, Activity.enrolled_count, Activity.attended_count),
+        execution_options={"synchronize_session": False}
+    ).all()
+    if changed:
+        record_status_change(
+            old_status, new_status, len(changed),
+            sum(row.enrolled_count for row in changed),
+            sum(row.attended_count for row in changed)
+        )
+    return [row.id for row in changed]
+
+
+def update_statuses(now=None, close_lead_minutes=60):
+    """
+    Apply the due transitions in the current transaction (the caller commits).
+
+    Returns ``{"cerrada": [ids], "finalizada": [ids]}`` with the
+    activities that changed.
+    """
+    now = now or datetime.now()
+    close_before = now + timedelta(minutes=close_lead_minutes)
+
+    ended = [
+        Activity.date <= now.date(),
+        or_(Activity.ends_at <= now, and_(Activity.ends_at.is_(None), Activity.date < now.date()))
+    ]
+    finished = _transition("abierta", "finalizada", *ended) + _transition("cerrada", "finalizada", *ended)
+    closed = _transition(
+        "abierta", "cerrada",
+        Activity.date <= close_before.date(),
+        or_(Activity.starts_at <= close_before, Activity.starts_at.is_(None))
+    )
+    if finished or closed:
+        db.session.expire_all()
+    return {"cerrada": closed, "finalizada": finished}
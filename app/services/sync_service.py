@@ -0,0 +1,133 @@
+"""
+Delta sync for pages kept open by staff (the admin dashboard).
+
+Clients send back the ``cursor`` of their previous response and receive
+the activities and enrollments whose ``updated_at`` is at or after it,
+plus the tombstones of the rows deleted since. Counter and attendance
+UPDATEs bump ``updated_at`` as well, so they are included.
+
+The window starts ``SYNC_OVERLAP_SECONDS`` before the cursor: a row
+written by a transaction that was still committing when the previous
+response was built is sent on the next poll. Patches are idempotent, so
+rows sent twice are harmless. When the client is too far behind (older
+than the tombstones kept, or more than ``SYNC_MAX_CHANGES`` rows) the
+response asks it to reload instead.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.models.tombstone import Tombstone
+
+
+_DELETED_KEYS = {"activity": "activities", "enrollment": "enrollments"}
+
+
+def encode_sync_cursor(moment):
+    return moment.isoformat()
+
+
+def decode_sync_cursor(cursor):
+    """Parse a cursor from a previous response. Raises ValueError if malformed."""
+    return datetime.fromisoformat(cursor)
+
+
+def _activity_patch(row):
+    return {
+        "id": row.id,
+        "title": row.title,
+        "type": row.type,
+        "date": row.date.isoformat(),
+        "time": row.time,
+        "status": row.status,
+        "max_slots": row.max_slots,
+        "enrolled_count": row.enrolled_count,
+        "attended_count": row.attended_count,
+        "available_slots": row.max_slots - row.enrolled_count,
+        "created": bool(row.created),
+    }
+
+
+def _enrollment_patch(row):
+    return {
+        "id": row.id,
+        "activity_id": row.activity_id,
+        "user_name": row.user_name,
+        "email": row.email,
+        "phone": row.phone,
+        "attended": row.attended,
+        "enrollment_date": row.enrollment_date.isoformat() if row.enrollment_date else None,
+    }
+
+
+def changes_since(since, activity_id=None, overlap_seconds=5, retention_days=7, max_changes=500, now=None):
+    """
+    Changes after ``since`` (a datetime, or None for a new client).
+
+    Returns ``{"cursor", "reset", "activities", "enrollments", "deleted"}``;
+    with ``reset`` the lists are empty and the client must reload the page
+    and continue from ``cursor``. ``activity_id`` limits the result to one
+    activity.
+    """
+    now = now or datetime.utcnow()
+    result = {
+        "cursor": encode_sync_cursor(now),
+        "reset": False,
+        "activities": [],
+        "enrollments": [],
+        "deleted": {"activities": [], "enrollments": []},
+    }
+    if since is None or since < now - timedelta(days=retention_days):
+        result["reset"] = True
+        return result
+
+    start = since - timedelta(seconds=overlap_seconds)
+
+    activities = db.session.query(
+        Activity.id, Activity.title, Activity.type, Activity.date, Activity.time,
+        Activity.status, Activity.max_slots, Activity.enrolled_count, Activity.attended_count,
+        (Activity.created_at >= start).label("created")
+    ).filter(Activity.updated_at >= start)
+    enrollments = db.session.query(
+        Enrollment.id, Enrollment.activity_id, Enrollment.user_name, Enrollment.email,
+        Enrollment.phone, Enrollment.attended, Enrollment.enrollment_date
+    ).filter(Enrollment.updated_at >= start)
+    tombstones = db.session.query(Tombstone.entity, Tombstone.entity_id) \
+        .filter(Tombstone.deleted_at >= start)
+
+    if activity_id is not None:
+        activities = activities.filter(Activity.id == activity_id)
+        enrollments = enrollments.filter(Enrollment.activity_id == activity_id)
+        tombstones = tombstones.filter(Tombstone.activity_id == activity_id)
+
+    activities = activities.order_by(Activity.updated_at).limit(max_changes + 1).all()
+    enrollments = enrollments.order_by(Enrollment.updated_at).limit(max_changes + 1).all()
+    tombstones = tombstones.order_by(Tombstone.deleted_at).limit(max_changes + 1).all()
+
+    if len(activities) + len(enrollments) + len(tombstones) > max_changes:
+        result["reset"] = True
+        return result
+
+    result["activities"] = [_activity_patch(row) for row in activities]
+    result["enrollments"] = [_enrollment_patch(row) for row in enrollments]
+    for entity, entity_id in tombstones:
+        result["deleted"][_DELETED_KEYS[entity]].append(entity_id)
+    return result
+
+
+def prune_tombstones(older_than_days=7, now=None):
+    """Delete tombstones no client can still need. Returns how many were deleted."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+    return Tombstone.query.filter(Tombstone.deleted_at < cutoff).delete(synchronize_session=False)
+
+
+@event.listens_for(Session, "before_flush")
+def _record_deletions(session, flush_context, instances):
+    with session.no_autoflush:
+        for obj in list(session.deleted):
+            if isinstance(obj, Activity):
+                session.add(Tombstone(entity="activity", entity_id=obj.id, activity_id=obj.id))
+            elif isinstance(obj, Enrollment):
+                session.add(Tombstone(entity="enrollment", entity_id=obj.id, activity_id=obj.activity_id))
@@ -0,0 +1,194 @@
+"""
+Monthly and weekly trends of enrollments, attendance and occupancy.
+
+Two date-bucketed aggregations feed each period:
+
+* enrollments made in the period (``Enrollment.enrollment_date``);
+* for the activities held in the period (``Activity.date``): enrolled,
+  attended and no-show counts and the slots offered.
+
+Both are grouped by activity type with range predicates on indexed
+columns, so the cost depends on the periods shown, not on the history.
+Closed periods (ended more than ``TREND_CLOSE_AFTER_DAYS`` ago) are
+stored in ``trend_bucket`` the first time they are computed; after that
+only the open periods are recomputed. Two requests computing the same
+period store it once (the second insert is ignored); the caller commits.
+"""
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import func, case
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.extensions import db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.models.trend import TrendBucket
+
+PERIODS = ("month", "week")
+ALL_TYPES = "*"
+_FIELDS = ("enrollments", "enrolled", "attended", "no_show", "max_slots")
+
+
+def bucket_start(day, period):
+    """First day of the month, or Monday of the week, containing ``day``."""
+    if period == "month":
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def next_bucket(start, period):
+    if period == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=7)
+
+
+def bucket_starts(period, count, today):
+    """The last ``count`` period starts, oldest first, ending with the current one."""
+    starts = [bucket_start(today, period)]
+    while len(starts) < count:
+        previous = starts[-1] - timedelta(days=1)
+        starts.append(bucket_start(previous, period))
+    return starts[::-1]
+
+
+def _bucket_sql(column, period):
+    """SQLite expression with the period start (``YYYY-MM-DD``) of a date column."""
+    if period == "month":
+        return func.strftime("%Y-%m-01", column)
+    # Next Sunday (or the same day), then back to its Monday
+    return func.date(column, "weekday 0", "-6 days")
+
+
+def _aggregate(period, start, end):
+    """
+    Compute the periods in ``[start, end)``.
+
+    Returns ``{(bucket_start, activity_type): {field: value}}`` including
+    the ``ALL_TYPES`` totals.
+    """
+    totals = {}
+
+    def add(bucket, activity_type, **values):
+        bucket = date.fromisoformat(bucket)
+        for key in (activity_type or "", ALL_TYPES):
+            entry = totals.setdefault((bucket, key), dict.fromkeys(_FIELDS, 0))
+            for field, value in values.items():
+                entry[field] += value or 0
+
+    enrolled_bucket = _bucket_sql(Enrollment.enrollment_date, period)
+    for bucket, activity_type, enrollments in db.session.query(
+        enrolled_bucket, Activity.type, func.count(Enrollment.id)
+    ).join(Activity, Activity.id == Enrollment.activity_id).filter(
+        Enrollment.enrollment_date >= datetime.combine(start, time.min),
+        Enrollment.enrollment_date < datetime.combine(end, time.min)
+    ).group_by(enrolled_bucket, Activity.type):
+        add(bucket, activity_type, enrollments=enrollments)
+
+    held_bucket = _bucket_sql(Activity.date, period)
+    held = db.session.query(
+        held_bucket, Activity.type,
+        func.sum(Activity.enrolled_count),
+        func.sum(Activity.attended_count),
+        func.sum(Activity.max_slots)
+    ).filter(
+        Activity.date >= start,
+        Activity.date < end,
+        Activity.status != "borrador"
+    ).group_by(held_bucket, Activity.type)
+    for bucket, activity_type, enrolled, attended, max_slots in held:
+        add(bucket, activity_type, enrolled=enrolled, attended=attended, max_slots=max_slots)
+
+    for bucket, activity_type, no_show in db.session.query(
+        held_bucket, Activity.type,
+        func.sum(case((Enrollment.attended.is_(False), 1), else_=0))
+    ).join(Enrollment, Enrollment.activity_id == Activity.id).filter(
+        Activity.date >= start,
+        Activity.date < end,
+        Activity.status != "borrador"
+    ).group_by(held_bucket, Activity.type):
+        add(bucket, activity_type, no_show=no_show)
+
+    return totals
+
+
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _point(values):
+    return {
+        "enrollments": values["enrollments"],
+        "enrolled": values["enrolled"],
+        "attendance_rate": _rate(values["attended"], values["enrolled"]),
+        "no_show_rate": _rate(values["no_show"], values["enrolled"]),
+        "fill_ratio": _rate(values["enrolled"], values["max_slots"]),
+    }
+
+
+def _load_closed(period, starts):
+    """Stored closed periods, computing and storing the missing ones first."""
+    stored = {}
+    if not starts:
+        return stored
+
+    for row in TrendBucket.query.filter(
+        TrendBucket.period == period,
+        TrendBucket.bucket_start.in_(starts)
+    ):
+        stored[(row.bucket_start, row.activity_type)] = {field: getattr(row, field) for field in _FIELDS}
+
+    missing = [start for start in starts if (start, ALL_TYPES) not in stored]
+    if missing:
+        computed = _aggregate(period, missing[0], next_bucket(missing[-1], period))
+        for start in missing:
+            computed.setdefault((start, ALL_TYPES), dict.fromkeys(_FIELDS, 0))
+        rows = []
+        for (start, activity_type), values in computed.items():
+            if start in missing:
+                rows.append(dict(period=period, bucket_start=start, activity_type=activity_type, **values))
+                stored[(start, activity_type)] = values
+        # A concurrent request may have stored the same closed period already
+        db.session.execute(sqlite_insert(TrendBucket).on_conflict_do_nothing(), rows)
+
+    return stored
+
+
+def trend_series(period="month", count=12, today=None, close_after_days=7):
+    """
+    Series of the last ``count`` periods for the reports page.
+
+    Returns ``{"period", "labels", "total", "by_type"}``: ``total`` is a
+    list of points (one per period) and ``by_type`` maps each activity
+    type ("" for untyped) to its list of points. A point has
+    ``enrollments``, ``enrolled``, ``attendance_rate``, ``no_show_rate``
+    and ``fill_ratio`` (rates are None when undefined). Raises ValueError
+    for an unknown period.
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Periodo inválido: {period}")
+    today = today or date.today()
+    starts = bucket_starts(period, count, today)
+    closed = [start for start in starts
+              if next_bucket(start, period) + timedelta(days=close_after_days) <= today]
+    open_starts = starts[len(closed):]
+
+    values = _load_closed(period, closed)
+    if open_starts:
+        values.update(_aggregate(period, open_starts[0], next_bucket(open_starts[-1], period)))
+
+    empty = dict.fromkeys(_FIELDS, 0)
+    types = sorted({activity_type for _, activity_type in values if activity_type != ALL_TYPES})
+    return {
+        "period": period,
+        "labels": [start.isoformat() for start in starts],
+        "total": [_point(values.get((start, ALL_TYPES), empty)) for start in starts],
+        "by_type": {
+            activity_type: [_point(values.get((start, activity_type), empty)) for start in starts]
+            for activity_type in types
+        },
+    }
+
+
+def clear_trend_cache():
+    """Forget the stored closed periods (they are recomputed on the next view)."""
+    deleted = TrendBucket.query.delete()
+    db.session.commit()
+    return deleted
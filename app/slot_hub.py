@@ -0,0 +1,114 @@
+"""
+In-process publish/subscribe hub for live slot counts (Server-Sent Events).
+
+Routes that change the slots or status of an activity call
+``publish_activity`` after committing. Subscribers do not get a queue
+each: the hub keeps only the latest state of every recently changed
+activity, ordered by a global sequence number, and each subscriber
+remembers just the last sequence it sent. Waking up, a subscriber reads
+the entries newer than that. An idle connection therefore costs one
+integer plus its serving thread, and a slow client skips the states it
+missed, receiving only the newest.
+
+Each process has its own hub: with several worker processes a change is
+pushed only to the clients connected to the process that committed it,
+and the others pick it up on their next page load. Serve the stream
+from a threaded (or gevent) worker, since each open connection holds one.
+"""
+import json
+import threading
+from collections import OrderedDict
+from flask import current_app
+
+
+class SlotHub:
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._latest = OrderedDict()  # activity_id -> (seq, payload), oldest first
+        self._seq = 0
+        self._condition = threading.Condition()
+        self.subscribers = 0
+
+    @property
+    def seq(self):
+        with self._condition:
+            return self._seq
+
+    def publish(self, activity_id, payload):
+        with self._condition:
+            self._seq += 1
+            self._latest[activity_id] = (self._seq, payload)
+            self._latest.move_to_end(activity_id)
+            while len(self._latest) > self.max_entries:
+                self._latest.popitem(last=False)
+            self._condition.notify_all()
+
+    def changes_after(self, seq):
+        """``(seq, payload)`` entries newer than ``seq``, oldest first."""
+        with self._condition:
+            return self._changes_after(seq)
+
+    def _changes_after(self, seq):
+        newer = []
+        for entry_seq, payload in reversed(self._latest.values()):
+            if entry_seq <= seq:
+                break
+            newer.append((entry_seq, payload))
+        return newer[::-1]
+
+    def wait(self, seq, timeout):
+        """Block until there are entries newer than ``seq`` or ``timeout`` expires."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > seq, timeout)
+            return self._changes_after(seq)
+
+    def stream(self, seq, heartbeat=15.0, activity_ids=None):
+        """
+        Generator of SSE messages after ``seq``.
+
+        Sends a comment every ``heartbeat`` seconds without changes, so
+        proxies keep the connection open and a closed client is noticed.
+        """
+        with self._condition:
+            self.subscribers += 1
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                changes = self.wait(seq, heartbeat)
+                if not changes:
+                    yield ": keep-alive\n\n"
+                    continue
+                for entry_seq, payload in changes:
+                    seq = entry_seq
+                    if activity_ids is None or payload["id"] in activity_ids:
+                        yield f"id: {entry_seq}\nevent: slots\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+    def stats(self):
+        with self._condition:
+            return {"seq": self._seq, "tracked": len(self._latest), "subscribers": self.subscribers}
+
+
+def init_app(app):
+    app.extensions["slot_hub"] = SlotHub()
+
+
+def current_slot_hub():
+    return current_app.extensions["slot_hub"]
+
+
+def publish_activity(activity_id):
+    """Push the committed slots and status of an activity to the subscribers."""
+    from app.extensions import db
+    from app.models.activity import Activity
+
+    row = db.session.query(Activity.id, Activity.status, Activity.max_slots, Activity.enrolled_count) \
+        .filter(Activity.id == activity_id).one_or_none()
+    if row is None:
+        payload = {"id": activity_id, "status": None, "available_slots": 0}
+    else:
+        payload = {"id": row.id, "status": row.status, "available_slots": row.max_slots - row.enrolled_count}
+    current_slot_hub().publish(activity_id, payload)
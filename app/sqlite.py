@@ -0,0 +1,21 @@
+from sqlalchemy import event
+
+
+def install_pragmas(engine, pragmas):
+    """
+    Run ``PRAGMA name = value`` on every new connection of a SQLite engine.
+
+    PRAGMAs such as ``busy_timeout`` or ``synchronous`` are per connection,
+    so they have to be applied when the pool opens each one.
+    """
+    if not pragmas or engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,136 @@
+"""
+Per-process cache of the users returned to Flask-Login.
+
+``load_user`` runs on every request of a logged-in user; with this cache
+it only hits the database once per ``USER_CACHE_TTL`` seconds per user.
+The cache stores read-only snapshots (not ORM objects, which would be
+expired or detached once their session ends). Any committed update or
+delete of a ``User`` row invalidates that user's entry; a snapshot loaded
+before such an invalidation is returned to its request but not stored.
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class UserSnapshot(UserMixin):
+    """Read-only copy of the ``User`` fields used by views and templates."""
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.role = user.role
+        self.name = user.name
+        self.email = user.email
+        self.phone = user.phone
+
+    def __repr__(self):
+        return f"<UserSnapshot {self.username}>"
+
+
+class UserCache:
+
+    def __init__(self, ttl=300, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id -> (snapshot, expires_at)
+        self._invalidated = {}  # user_id -> generation of its last invalidation
+        self._generation = 0
+        self._floor = 0  # snapshots loaded before this generation are not stored
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id, loader):
+        """Snapshot of ``user_id``, calling ``loader(user_id)`` on a miss."""
+        if self.ttl <= 0:
+            user = loader(user_id)
+            return UserSnapshot(user) if user else None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            since = self._generation
+
+        user = loader(user_id)
+        if user is None:
+            return None
+        snapshot = UserSnapshot(user)
+        with self._lock:
+            # Invalidated while loading: the row read may predate the change
+            if since < self._floor or self._invalidated.get(user_id, 0) > since:
+                return snapshot
+            self._entries[user_id] = (snapshot, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+                self._invalidated[user_id] = self._generation
+            if len(self._invalidated) > self.max_entries:
+                self._invalidated.clear()
+                self._floor = self._generation
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidated.clear()
+            self._floor = self._generation
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+def init_app(app):
+    app.extensions["user_cache"] = UserCache(app.config.get("USER_CACHE_TTL", 300))
+
+
+def current_user_cache():
+    return current_app.extensions["user_cache"]
+
+
+# Invalidate on commit (not on flush) so a concurrent request cannot cache
+# the old row again before the change is visible.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    from app.models.user import User
+
+    changed = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault("changed_users", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    changed = session.info.pop("changed_users", None)
+    if changed and has_app_context() and "user_cache" in current_app.extensions:
+        current_user_cache().invalidate(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_users", None)
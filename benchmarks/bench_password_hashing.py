@@ -0,0 +1,90 @@
+"""
+Login throughput for each password hashing setting.
+
+For every method, measures password checks per second on a single thread
+(i.e. per core: hashing is CPU bound) and full ``POST /auth/login``
+requests per second through the app, and prints both.
+
+    python benchmarks/bench_password_hashing.py [--seconds 3] [--method pbkdf2:sha256:600000 ...]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import DevelopmentConfig  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.passwords import PasswordHasher  # noqa: E402
+
+DEFAULT_METHODS = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:1000000",
+    "pbkdf2:sha256:600000",
+    "pbkdf2:sha256:260000",
+]
+
+
+def checks_per_second(method, seconds):
+    hasher = PasswordHasher(method, workers=1)
+    pwhash = hasher.hash("bench-password")
+    done = 0
+    stop = time.perf_counter() + seconds
+    while time.perf_counter() < stop:
+        hasher.verify(pwhash, "bench-password")
+        done += 1
+    return done / seconds
+
+
+def logins_per_second(method, seconds, path):
+    class BenchConfig(DevelopmentConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        PASSWORD_HASH_METHOD = method
+        PASSWORD_HASH_WORKERS = 1
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        user = User(username="bench", role="user")
+        user.set_password("bench-password")
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    done = 0
+    stop = time.perf_counter() + seconds
+    while time.perf_counter() < stop:
+        response = client.post("/auth/login", data={"username": "bench", "password": "bench-password"})
+        assert response.status_code == 302, response.status_code
+        client.get("/auth/logout")
+        done += 1
+
+    with app.app_context():
+        db.engine.dispose()
+    return done / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--method", action="append", dest="methods",
+                        help="werkzeug hash method (repeatable, default: a preset list)")
+    args = parser.parse_args()
+
+    print(f"{args.seconds}s per measurement, 1 thread\n")
+    print(f"{'method':<24} {'checks/s/core':>14} {'logins/s/core':>14}")
+
+    for method in args.methods or DEFAULT_METHODS:
+        checks = checks_per_second(method, args.seconds)
+        with tempfile.TemporaryDirectory() as tmp:
+            logins = logins_per_second(method, args.seconds, os.path.join(tmp, "bench.db"))
+        print(f"{method:<24} {checks:>14.1f} {logins:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
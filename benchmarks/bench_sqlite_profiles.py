@@ -0,0 +1,109 @@
+"""
+Read/write throughput of the SQLite database under each config profile.
+
+Runs the catalogue query (reads) and enrollments (writes) from several
+threads against a fresh file database, once with the development profile
+(SQLite defaults) and once with the production profile (WAL, busy_timeout,
+synchronous=NORMAL, cache/mmap), and prints operations per second.
+
+    python benchmarks/bench_sqlite_profiles.py [--threads 8] [--seconds 5] [--write-ratio 0.2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.config import DevelopmentConfig, ProductionConfig  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models.activity import Activity  # noqa: E402
+from app.services.activity_service import list_catalog  # noqa: E402
+from app.services.enrollment_service import create_enrollment  # noqa: E402
+
+
+def make_app(profile, path):
+    class BenchConfig(profile):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+    return create_app(BenchConfig)
+
+
+def seed(app, activities):
+    with app.app_context():
+        start = date.today()
+        for i in range(activities):
+            db.session.add(Activity(title=f"Actividad {i}", date=start + timedelta(days=i % 90),
+                                    max_slots=1_000_000, status="abierta"))
+        db.session.commit()
+        return [a.id for a in Activity.query.all()]
+
+
+def run(app, activity_ids, threads, seconds, write_ratio):
+    stop = time.perf_counter() + seconds
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker(n):
+        reads = writes = errors = 0
+        rng = random.Random(n)
+        with app.app_context():
+            while time.perf_counter() < stop:
+                try:
+                    if rng.random() < write_ratio:
+                        activity = db.session.get(Activity, rng.choice(activity_ids))
+                        create_enrollment(activity, user_name="Bench",
+                                          email=f"bench-{n}-{writes}-{errors}@test.com")
+                        db.session.commit()
+                        writes += 1
+                    else:
+                        list_catalog()
+                        db.session.rollback()
+                        reads += 1
+                except Exception:
+                    db.session.rollback()
+                    errors += 1
+            db.session.remove()
+        with lock:
+            counters["reads"] += reads
+            counters["writes"] += writes
+            counters["errors"] += errors
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--activities", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads, {args.seconds}s, {args.write_ratio:.0%} writes, {args.activities} activities\n")
+    print(f"{'profile':<12} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+
+    for name, profile in [("development", DevelopmentConfig), ("production", ProductionConfig)]:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(profile, os.path.join(tmp, "bench.db"))
+            activity_ids = seed(app, args.activities)
+            result = run(app, activity_ids, args.threads, args.seconds, args.write_ratio)
+            with app.app_context():
+                db.engine.dispose()
+        print(f"{name:<12} {result['reads'] / args.seconds:>10.0f} "
+              f"{result['writes'] / args.seconds:>10.0f} {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,11 +25,9 @@ IF NOT EXIST "venv\Lib\site-packages\pytest" (
     pip install -r requirements-dev.txt
 )
 
-REM 4. Migrar la base de datos (crear/tocar si no existe)
-IF NOT EXIST "instance\app.db" (
-    echo [INFO] Migrando base de datos inicial...
-    python migrate_db.py
-)
+REM 4. Migrar la base de datos (idempotente: solo aplica los cambios pendientes)
+echo [INFO] Migrando base de datos...
+python migrate_db.py
 
 REM 5. Seed de datos si está vacío
 python seed_data.py
@@ -6,6 +6,7 @@ from app.extensions import db
 from app.models.user import User
 from app.models.activity import Activity
 from app.models.enrollment import Enrollment
+from app.services.enrollment_service import recount_activities
 from datetime import datetime, timedelta
 
 app = create_app()
@@ -210,6 +211,10 @@ with app.app_context():
     db.session.commit()
     print(f"✓ Created {enrollment_count} enrollments")
     
+    # Sync denormalized counters with the enrollments created above
+    recount_activities()
+    db.session.commit()
+    
     print("\n✅ Database seeded successfully!")
     print("\n📊 Summary:")
     print(f"   - Users: {User.query.count()}")
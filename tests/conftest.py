@@ -1,20 +1,26 @@
 import pytest
+from flask import g
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import create_app
+from app.config import TestingConfig
 from app.extensions import db as _db
 from app.models.user import User
 from app.models.activity import Activity
-from app.models.enrollment import Enrollment
+from app.services.enrollment_service import create_enrollment
 from datetime import date
 
 
 @pytest.fixture(scope='session')
 def app():
     """Create application for the tests."""
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    app.config['WTF_CSRF_ENABLED'] = False
-    app.config['SECRET_KEY'] = 'test-secret-key'
+    app = create_app(TestingConfig)
+
+    # Requests reuse the test's app context: forget the user Flask-Login
+    # cached in ``g`` so each request authenticates from its own session.
+    @app.before_request
+    def reset_login_cache():
+        g.pop('_login_user', None)
     
     ctx = app.app_context()
     ctx.push()
@@ -27,12 +33,15 @@ def app():
 @pytest.fixture(scope='function')
 def db(app):
     """Create database for the tests."""
-    _db.create_all()
-    
-    yield _db
-    
-    _db.session.remove()
-    _db.drop_all()
+    # Fresh app context per test so per-request globals (e.g. the user
+    # cached by Flask-Login in ``g``) do not leak between tests.
+    with app.app_context():
+        _db.create_all()
+
+        yield _db
+
+        _db.session.remove()
+        _db.drop_all()
 
 
 @pytest.fixture(scope='function')
@@ -59,6 +68,72 @@ def auth_admin(client, admin_user):
     return client
 
 
+@pytest.fixture
+def normal_user(db):
+    """Create regular user."""
+    user = User(
+        username='usuario',
+        role='user',
+        name='Usuario Normal',
+        email='usuario@test.com'
+    )
+    user.set_password('usuario123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_user(client, normal_user):
+    """Authenticated regular user client."""
+    with client.session_transaction() as session:
+        session['_user_id'] = str(normal_user.id)
+    return client
+
+
+@pytest.fixture
+def count_queries(db):
+    """Context manager that records the SQL statements executed inside it."""
+    @contextmanager
+    def _count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _count
+
+
+@pytest.fixture
+def page_cache(app, monkeypatch):
+    """Enabled page cache (TestingConfig disables it), emptied around the test."""
+    page_cache = app.extensions['page_cache']
+    monkeypatch.setattr(page_cache, 'max_entries', 16)
+    page_cache.clear()
+    yield page_cache
+    page_cache.clear()
+
+
+@pytest.fixture
+def make_activity(db):
+    """Factory of committed activities: ``make_activity(title, **columns)``."""
+    def _make(title, **columns):
+        values = dict(date=date(2026, 5, 10), max_slots=10, status='abierta')
+        values.update(columns)
+        activity = Activity(title=title, **values)
+        _db.session.add(activity)
+        _db.session.commit()
+        return activity
+
+    return _make
+
+
 @pytest.fixture
 def activity(db):
     """Create a test activity."""
@@ -104,12 +179,11 @@ def full_activity(db):
     
     # Fill activity
     for i in range(2):
-        enrollment = Enrollment(
+        create_enrollment(
+            activity,
             user_name=f'Usuario {i}',
-            email=f'user{i}@test.com',
-            activity_id=activity.id
+            email=f'user{i}@test.com'
         )
-        db.session.add(enrollment)
     
     db.session.commit()
     return activity
@@ -130,12 +204,11 @@ def activity_with_enrollments(db):
     
     # Add enrollments
     for i in range(3):
-        enrollment = Enrollment(
+        create_enrollment(
+            activity,
             user_name=f'Participante {i+1}',
-            email=f'participante{i+1}@test.com',
-            activity_id=activity.id
+            email=f'participante{i+1}@test.com'
         )
-        db.session.add(enrollment)
     
     db.session.commit()
     return activity
@@ -0,0 +1,222 @@
+import pytest
+from datetime import date
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.series_service import create_series
+from app.cache import invalidate_activity
+
+
+def _create_activities(db, count, start=0):
+    for i in range(start, start + count):
+        activity = Activity(
+            title=f'Actividad {i}',
+            date=date(2026, 7, 1),
+            max_slots=5,
+            status='abierta'
+        )
+        db.session.add(activity)
+        db.session.flush()
+        db.session.add(Enrollment(
+            user_name=f'Participante {i}',
+            email=f'participante{i}@test.com',
+            activity_id=activity.id
+        ))
+    db.session.commit()
+
+
+@pytest.mark.integration
+class TestActivityIndex:
+
+    def test_index_shows_available_slots(self, client, activity_with_enrollments):
+        """RF05: Plazas disponibles en el listado"""
+        response = client.get('/activities/?from=')
+
+        assert response.status_code == 200
+        assert 'Taller con Inscritos' in response.get_data(as_text=True)
+        assert '7 plazas disponibles' in response.get_data(as_text=True)
+
+    def test_index_hides_drafts_from_anonymous(self, client, activity, open_activity):
+        response = client.get('/activities/?from=')
+
+        html = response.get_data(as_text=True)
+        assert 'Taller Abierto' in html
+        assert 'Taller Test' not in html
+
+    def test_index_marks_user_enrollment(self, db, auth_user, normal_user, open_activity, activity_with_enrollments):
+        db.session.add(Enrollment(
+            user_name='Usuario Normal',
+            email='usuario@test.com',
+            activity_id=open_activity.id,
+            user_id=normal_user.id
+        ))
+        db.session.commit()
+
+        html = auth_user.get('/activities/?from=').get_data(as_text=True)
+
+        assert html.count('Ya inscrito') == 1
+        assert f'/activities/{open_activity.id}/unenroll' in html
+
+    @pytest.mark.parametrize('logged_in', [False, True])
+    def test_index_query_count_is_constant(self, db, client, normal_user, count_queries, logged_in):
+        """The listing must not issue queries per activity"""
+        if logged_in:
+            with client.session_transaction() as session:
+                session['_user_id'] = str(normal_user.id)
+
+        _create_activities(db, 2)
+        with count_queries() as few:
+            client.get('/activities/?from=')
+
+        _create_activities(db, 20, start=2)
+        with count_queries() as many:
+            client.get('/activities/?from=')
+
+        assert len(many) == len(few)
+
+
+    def test_index_collapses_series(self, db, client):
+        series = create_series(title='Club semanal', time='18:00', duration=60, max_slots=10,
+                               status='abierta', frequency='weekly', interval=1,
+                               starts_on=date(2026, 5, 6), until=date(2026, 5, 27))
+        db.session.commit()
+
+        html = client.get('/activities/?from=').get_data(as_text=True)
+        assert html.count('Club semanal') == 1
+        assert f'series={series.id}' in html
+
+        html = client.get(f'/activities/?from=&series={series.id}').get_data(as_text=True)
+        assert html.count('Club semanal') == 4
+
+@pytest.mark.integration
+class TestActivityPagination:
+
+    def test_default_view_hides_past_activities(self, db, client):
+        db.session.add(Activity(title='Pasada', date=date(2000, 1, 1), max_slots=5, status='finalizada'))
+        db.session.add(Activity(title='Futura', date=date(2999, 1, 1), max_slots=5, status='abierta'))
+        db.session.commit()
+
+        html = client.get('/activities/').get_data(as_text=True)
+
+        assert 'Futura' in html
+        assert 'Pasada' not in html
+
+    def test_pages_follow_cursors(self, app, db, client, monkeypatch):
+        monkeypatch.setitem(app.config, 'ACTIVITIES_PER_PAGE', 2)
+        for day in range(1, 6):
+            db.session.add(Activity(title=f'Sesión {day}', date=date(2026, 8, day),
+                                    max_slots=5, status='abierta'))
+        db.session.commit()
+
+        first = client.get('/activities/?from=2026-08-01').get_data(as_text=True)
+        assert 'Sesión 1' in first and 'Sesión 2' in first and 'Sesión 3' not in first
+
+        second = client.get('/activities/?from=2026-08-01&after=2026-08-02_2').get_data(as_text=True)
+        assert 'Sesión 3' in second and 'Sesión 4' in second
+        assert 'before=2026-08-03_3' in second
+        assert 'after=2026-08-04_4' in second
+
+    def test_status_filter(self, db, client, open_activity, activity_with_enrollments):
+        open_activity.status = 'cerrada'
+        db.session.commit()
+
+        html = client.get('/activities/?from=&status=cerrada').get_data(as_text=True)
+
+        assert 'Taller Abierto' in html
+        assert 'Taller con Inscritos' not in html
+
+    def test_invalid_cursor_returns_400(self, client):
+        assert client.get('/activities/?after=no-es-un-cursor').status_code == 400
+
+
+@pytest.mark.integration
+class TestActivitySearch:
+
+    def test_search_filters_catalog(self, client, open_activity, activity_with_enrollments):
+        html = client.get('/activities/?from=&q=inscritos').get_data(as_text=True)
+
+        assert 'Taller con Inscritos' in html
+        assert 'Taller Abierto' not in html
+        assert 'value="inscritos"' in html
+
+    def test_no_results_message(self, client, open_activity):
+        html = client.get('/activities/?from=&q=zzzz').get_data(as_text=True)
+
+        assert 'No hay actividades que coincidan' in html
+
+    def test_pages_keep_query(self, app, db, client, monkeypatch):
+        monkeypatch.setitem(app.config, 'ACTIVITIES_PER_PAGE', 2)
+        for day in range(1, 4):
+            db.session.add(Activity(title=f'Sesión de ajedrez {day}', date=date(2026, 8, day),
+                                    max_slots=5, status='abierta'))
+        db.session.commit()
+
+        html = client.get('/activities/?from=&q=ajedrez').get_data(as_text=True)
+
+        assert 'after=2' in html and 'q=ajedrez' in html
+
+    def test_invalid_cursor_returns_400(self, client):
+        assert client.get('/activities/?q=taller&after=x').status_code == 400
+
+
+@pytest.mark.integration
+class TestCatalogPageCache:
+
+    def test_second_visit_served_from_cache(self, client, open_activity, page_cache, count_queries):
+        client.get('/activities/?from=')
+
+        with count_queries() as statements:
+            response = client.get('/activities/?from=')
+
+        assert response.headers['X-Page-Cache'] == 'hit'
+        assert statements == []
+        assert page_cache.stats()['hits'] == 1
+
+    def test_enroll_invalidates_catalog(self, db, auth_user, open_activity, page_cache):
+        auth_user.get('/activities/?from=')
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+        auth_user.get('/activities/?from=')  # consumes the flash message, not cached
+
+        response = auth_user.get('/activities/?from=')
+
+        assert response.headers['X-Page-Cache'] == 'miss'
+        assert '9 plazas disponibles' in response.get_data(as_text=True)
+
+    def test_write_during_render_not_cached(self, client, open_activity, page_cache, monkeypatch):
+        import app.routes.activities as activities_routes
+        render = activities_routes.render_template
+
+        def render_then_write(*args, **kwargs):
+            html = render(*args, **kwargs)
+            invalidate_activity(open_activity.id)  # another request commits meanwhile
+            return html
+
+        monkeypatch.setattr(activities_routes, 'render_template', render_then_write)
+        client.get('/activities/?from=')
+
+        assert page_cache.stats()['size'] == 0
+
+    def test_edit_invalidates_detail(self, db, auth_admin, client, open_activity, page_cache):
+        client.get(f'/activities/{open_activity.id}')
+        auth_admin.post(f'/admin/activity/{open_activity.id}/edit', data={
+            'title': 'Taller Renombrado', 'date': '2026-05-15', 'max_slots': '10', 'status': 'abierta'
+        })
+        with client.session_transaction() as session:
+            session.clear()
+
+        response = client.get(f'/activities/{open_activity.id}')
+
+        assert response.headers['X-Page-Cache'] == 'miss'
+        assert 'Taller Renombrado' in response.get_data(as_text=True)
+
+    def test_admin_bypasses_cache(self, auth_admin, open_activity, page_cache):
+        auth_admin.get('/activities/?from=')
+        response = auth_admin.get('/activities/?from=')
+
+        assert 'X-Page-Cache' not in response.headers
+        assert page_cache.stats()['size'] == 0
+
+    def test_cache_stats_endpoint(self, auth_admin, page_cache):
+        response = auth_admin.get('/admin/cache')
+
+        assert response.status_code == 200
+        assert set(response.get_json()['pages']) >= {'hits', 'misses', 'size', 'max_entries'}
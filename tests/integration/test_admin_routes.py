@@ -0,0 +1,278 @@
+import io
+import zipfile
+import pytest
+from datetime import date
+from app.models.activity import Activity
+from app.models.series import ActivitySeries
+from app.services.enrollment_service import create_enrollment, set_attendance
+
+
+@pytest.mark.integration
+class TestAdminDashboard:
+
+    def test_dashboard_shows_counters(self, db, auth_admin, activity_with_enrollments):
+        set_attendance(activity_with_enrollments.enrollments[0], True)
+        activity_with_enrollments.status = 'finalizada'
+        db.session.commit()
+
+        html = auth_admin.get('/admin/').get_data(as_text=True)
+
+        assert 'Taller con Inscritos' in html
+        assert '<strong>3</strong> / 10' in html
+        assert '1 / 3' in html
+
+    def test_dashboard_does_not_read_enrollments(self, db, auth_admin, count_queries):
+        for i in range(5):
+            activity = Activity(title=f'Actividad {i}', date=date(2026, 7, i + 1),
+                                max_slots=5, status='abierta')
+            db.session.add(activity)
+            db.session.flush()
+            create_enrollment(activity, user_name=f'P{i}', email=f'p{i}@test.com')
+        db.session.commit()
+
+        with count_queries() as statements:
+            auth_admin.get('/admin/')
+
+        assert not any('FROM enrollment' in statement for statement in statements)
+
+
+@pytest.mark.integration
+class TestExportEnrollments:
+
+    def test_export_is_streamed_csv(self, auth_admin, activity_with_enrollments):
+        response = auth_admin.get(f'/admin/activity/{activity_with_enrollments.id}/export')
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'Nombre,Email,Teléfono,Fecha de inscripción,Estado,Asistencia'
+        assert len(lines) == 4
+        assert lines[1].startswith('Participante 1,participante1@test.com,')
+        assert lines[1].endswith(',confirmada,Pendiente')
+
+    def test_export_filename_with_accents(self, db, auth_admin):
+        activity = Activity(title='Taller de Programación', date=date(2026, 7, 1), max_slots=5)
+        db.session.add(activity)
+        db.session.commit()
+
+        response = auth_admin.get(f'/admin/activity/{activity.id}/export')
+
+        disposition = response.headers['Content-Disposition']
+        assert 'filename="inscritos_Taller_de_Programacion.csv"' in disposition
+        assert "filename*=UTF-8''inscritos_Taller_de_Programaci%C3%B3n.csv" in disposition
+
+
+@pytest.mark.integration
+class TestBulkExport:
+
+    @pytest.fixture
+    def term(self, db):
+        activities = []
+        for day, activity_type in [(1, 'taller'), (2, 'club_lectura'), (3, 'taller')]:
+            activity = Activity(title=f'Sesión {day}', type=activity_type,
+                                date=date(2026, 6, day), max_slots=5, status='finalizada')
+            db.session.add(activity)
+            db.session.flush()
+            activities.append(activity)
+        for i in range(2):
+            create_enrollment(activities[0], user_name=f'P{i}', email=f'p{i}@test.com')
+        create_enrollment(activities[1], user_name='Lectora', email='lectora@test.com')
+        db.session.commit()
+        return activities
+
+    def test_zip_has_one_csv_per_activity(self, auth_admin, term, count_queries):
+        with count_queries() as statements:
+            response = auth_admin.get('/admin/export?from=2026-06-01&to=2026-06-30')
+            data = response.get_data()
+
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        names = archive.namelist()
+        assert len(names) == 3
+        assert names[0] == f'2026-06-01_{term[0].id}_Sesion_1.csv'
+        assert archive.read(names[0]).decode('utf-8').count('\n') == 3
+        assert archive.read(names[2]).decode('utf-8').count('\n') == 1
+        assert sum('FROM activity' in s for s in statements) == 1
+
+    def test_combined_csv_filtered_by_type(self, auth_admin, term):
+        response = auth_admin.get('/admin/export?from=&format=csv&type=taller')
+
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0].startswith('Actividad,Fecha actividad,Nombre')
+        assert len(lines) == 3
+        assert all(line.startswith('Sesión 1,2026-06-01,') for line in lines[1:])
+
+    def test_invalid_format(self, auth_admin):
+        assert auth_admin.get('/admin/export?format=xls').status_code == 400
+
+
+@pytest.mark.integration
+class TestReports:
+
+    def test_reports_read_rollups(self, db, auth_admin, activity_with_enrollments, count_queries):
+        with count_queries() as statements:
+            response = auth_admin.get('/admin/reports')
+
+        assert response.status_code == 200
+        assert 'Por Mes' in response.data.decode()
+        assert not any('GROUP BY activity.status' in s or 'GROUP BY activity.id' in s for s in statements)
+        # Only the trend queries read enrollments, always within a date range
+        reads = [s for s in statements if 'FROM enrollment' in s or 'JOIN enrollment' in s]
+        assert reads and all('>=' in s for s in reads)
+
+    def test_weekly_trends_page(self, db, auth_admin, activity_with_enrollments):
+        response = auth_admin.get('/admin/reports?period=week')
+
+        assert response.status_code == 200
+        assert 'Tendencias' in response.data.decode()
+
+    def test_trends_json(self, db, auth_admin, activity_with_enrollments):
+        data = auth_admin.get('/admin/reports/trends').get_json()
+
+        assert data['period'] == 'month'
+        assert len(data['labels']) == len(data['total']) == 12
+
+    def test_invalid_trend_period(self, db, auth_admin):
+        assert auth_admin.get('/admin/reports?period=year').status_code == 400
+
+
+@pytest.mark.integration
+class TestDashboardSync:
+
+    def test_dashboard_embeds_cursor(self, db, auth_admin, open_activity):
+        html = auth_admin.get('/admin/?from=').data.decode()
+
+        assert 'data-sync-cursor="' in html
+        assert f'data-activity-id="{open_activity.id}"' in html
+
+    def test_changes_since_cursor(self, db, auth_admin, open_activity):
+        cursor = auth_admin.get('/admin/changes?since=2000-01-01T00:00:00').get_json()['cursor']
+        auth_admin.post(f'/activities/{open_activity.id}/status', data={'status': 'cerrada'})
+
+        data = auth_admin.get(f'/admin/changes?since={cursor}').get_json()
+
+        assert data['reset'] is False
+        assert [a['status'] for a in data['activities']] == ['cerrada']
+
+    def test_invalid_cursor(self, db, auth_admin):
+        assert auth_admin.get('/admin/changes?since=ayer').status_code == 400
+
+    def test_requires_admin(self, db, auth_user):
+        assert auth_user.get('/admin/changes').status_code != 200
+
+
+@pytest.mark.integration
+class TestScheduleConflicts:
+
+    @pytest.fixture
+    def evening(self, db):
+        activity = Activity(title='Club de tarde', date=date(2026, 5, 15), time='18:00', duration=60,
+                            max_slots=10, status='abierta')
+        db.session.add(activity)
+        db.session.commit()
+        return activity
+
+    def form(self, **values):
+        return dict({'title': 'Cine', 'date': '2026-05-15', 'time': '18:30', 'duration': '60',
+                     'max_slots': '10', 'status': 'abierta'}, **values)
+
+    def test_create_asks_for_confirmation(self, db, auth_admin, evening):
+        response = auth_admin.post('/activities/new', data=self.form())
+        html = response.get_data(as_text=True)
+
+        assert 'Coincide en horario con: Club de tarde' in html
+        assert 'name="allow_conflicts"' in html and 'value="Cine"' in html
+        assert Activity.query.count() == 1
+
+        auth_admin.post('/activities/new', data=self.form(allow_conflicts='1'))
+        created = Activity.query.filter_by(title='Cine').one()
+        assert (created.time, created.duration) == ('18:30', 60)
+
+    def test_create_without_conflict(self, db, auth_admin, evening):
+        response = auth_admin.post('/activities/new', data=self.form(time='19:00'))
+
+        assert response.status_code == 302
+        assert Activity.query.count() == 2
+
+    def test_edit_keeps_activity_on_conflict(self, db, auth_admin, evening, open_activity):
+        response = auth_admin.post(f'/admin/activity/{open_activity.id}/edit', data=self.form())
+
+        assert 'Coincide en horario con: Club de tarde' in response.get_data(as_text=True)
+        assert db.session.get(Activity, open_activity.id).title == 'Taller Abierto'
+
+        auth_admin.post(f'/admin/activity/{open_activity.id}/edit', data=self.form(allow_conflicts='1'))
+        assert db.session.get(Activity, open_activity.id).title == 'Cine'
+
+
+@pytest.mark.integration
+class TestSeriesRoutes:
+
+    def form(self, **values):
+        return dict({'title': 'Club semanal', 'time': '18:00', 'duration': '60', 'max_slots': '10',
+                     'status': 'abierta', 'frequency': 'weekly', 'interval': '1',
+                     'starts_on': '2030-03-06', 'until': '2030-03-27'}, **values)
+
+    def test_create_series(self, db, auth_admin):
+        response = auth_admin.post('/admin/series/new', data=self.form())
+
+        assert response.status_code == 302
+        series = ActivitySeries.query.one()
+        assert series.activities.count() == 4
+
+        html = auth_admin.get('/admin/series').get_data(as_text=True)
+        assert 'Club semanal' in html and 'Semanal' in html
+
+    def test_create_asks_for_confirmation_on_conflict(self, db, auth_admin):
+        db.session.add(Activity(title='Charla', date=date(2030, 3, 13), time='18:30', duration=60,
+                                max_slots=10, status='abierta'))
+        db.session.commit()
+
+        html = auth_admin.post('/admin/series/new', data=self.form()).get_data(as_text=True)
+        assert 'Coincide en horario con: Charla' in html
+        assert ActivitySeries.query.count() == 0
+
+        auth_admin.post('/admin/series/new', data=self.form(allow_conflicts='1'))
+        assert ActivitySeries.query.count() == 1
+
+    def test_invalid_rule_rejected(self, db, auth_admin):
+        html = auth_admin.post('/admin/series/new', data=self.form(until='2030-01-01')).get_data(as_text=True)
+
+        assert 'Regla de repetición inválida' in html
+        assert Activity.query.count() == 0
+
+    def test_edit_and_cancel_series(self, db, auth_admin):
+        auth_admin.post('/admin/series/new', data=self.form())
+        series = ActivitySeries.query.one()
+
+        response = auth_admin.post(f'/admin/series/{series.id}/edit', data=self.form(title='Club de novela'))
+        assert response.status_code == 302
+        assert {activity.title for activity in series.activities} == {'Club de novela'}
+
+        auth_admin.post(f'/admin/series/{series.id}/cancel')
+        assert series.activities.count() == 0
+
+    def test_far_future_until_rejected(self, db, auth_admin):
+        response = auth_admin.post('/admin/series/new', data=self.form(until='9999-12-31'))
+
+        assert response.status_code == 200
+        assert 'no puede durar más de' in response.get_data(as_text=True)
+        assert Activity.query.count() == 0
+
+    def test_edit_and_cancel_refresh_cached_details(self, app, db, auth_admin, page_cache):
+        auth_admin.post('/admin/series/new', data=self.form())
+        series = ActivitySeries.query.one()
+        session_id = series.activities.order_by(Activity.date).first().id
+        visitor = app.test_client()
+
+        visitor.get(f'/activities/{session_id}')
+        auth_admin.post(f'/admin/series/{series.id}/edit', data=self.form(title='Club de novela'))
+        response = visitor.get(f'/activities/{session_id}')
+        assert response.headers['X-Page-Cache'] == 'miss'
+        assert 'Club de novela' in response.get_data(as_text=True)
+
+        visitor.get(f'/activities/{session_id}')
+        auth_admin.post(f'/admin/series/{series.id}/cancel')
+        assert visitor.get(f'/activities/{session_id}').status_code == 404
+
+    def test_requires_admin(self, auth_user):
+        assert auth_user.get('/admin/series').status_code in (302, 403)
@@ -0,0 +1,77 @@
+import pytest
+from app.services.enrollment_service import create_enrollment
+
+
+@pytest.mark.integration
+class TestActivitiesApi:
+
+    def test_list(self, client, open_activity, activity):
+        response = client.get('/api/activities?from=')
+
+        data = response.get_json()
+        assert response.status_code == 200
+        assert response.headers['ETag']
+        assert [item['id'] for item in data['activities']] == [open_activity.id]
+        assert data['activities'][0]['date'] == '2026-05-15'
+        assert data['next'] is None
+
+    def test_list_invalid_filters(self, client, db):
+        assert client.get('/api/activities?status=otro').status_code == 400
+
+    def test_detail(self, client, activity_with_enrollments):
+        data = client.get(f'/api/activities/{activity_with_enrollments.id}').get_json()
+
+        assert data['title'] == 'Taller con Inscritos'
+        assert data['enrolled'] == 3
+        assert data['available_slots'] == 7
+
+    def test_draft_is_not_found(self, client, activity):
+        assert client.get(f'/api/activities/{activity.id}').status_code == 404
+
+    def test_availability(self, client, full_activity):
+        data = client.get(f'/api/activities/{full_activity.id}/availability').get_json()
+
+        assert data['available_slots'] == 0
+        assert data['open'] is False
+
+
+@pytest.mark.integration
+class TestConditionalGet:
+
+    def test_not_modified_skips_body_and_orm(self, client, open_activity, count_queries):
+        url = f'/api/activities/{open_activity.id}'
+        etag = client.get(url).headers['ETag']
+
+        with count_queries() as statements:
+            response = client.get(url, headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert len(statements) == 1
+
+    def test_enrollment_changes_etag(self, db, client, open_activity):
+        urls = [f'/api/activities/{open_activity.id}', f'/api/activities/{open_activity.id}/availability',
+                '/api/activities?from=']
+        etags = [client.get(url).headers['ETag'] for url in urls]
+
+        create_enrollment(open_activity, user_name='Ana', email='ana@test.com')
+        db.session.commit()
+
+        for url, etag in zip(urls, etags):
+            response = client.get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert response.headers['ETag'] != etag
+
+    def test_edit_changes_list_etag(self, db, client, open_activity):
+        etag = client.get('/api/activities?from=').headers['ETag']
+
+        open_activity.title = 'Otro título'
+        db.session.commit()
+
+        assert client.get('/api/activities?from=', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_list_not_modified(self, client, open_activity):
+        etag = client.get('/api/activities?from=').headers['ETag']
+
+        assert client.get('/api/activities?from=', headers={'If-None-Match': etag}).status_code == 304
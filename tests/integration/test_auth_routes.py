@@ -0,0 +1,53 @@
+import pytest
+from app.models.user import User
+from app.passwords import HasherBusy, PasswordHasher
+
+
+@pytest.mark.integration
+class TestLogin:
+
+    def test_login_ok(self, client, normal_user):
+        response = client.post('/auth/login', data={'username': 'usuario', 'password': 'usuario123'})
+
+        assert response.status_code == 302
+        assert '/auth/login' not in response.headers['Location']
+
+    def test_wrong_password(self, client, normal_user):
+        response = client.post('/auth/login', data={'username': 'usuario', 'password': 'mala'})
+
+        assert response.status_code == 200
+        assert 'incorrectos' in response.data.decode()
+
+    def test_unknown_user(self, client, db):
+        response = client.post('/auth/login', data={'username': 'nadie', 'password': 'x'})
+
+        assert response.status_code == 200
+        assert 'incorrectos' in response.data.decode()
+
+    def test_outdated_hash_upgraded_on_login(self, client, db, normal_user):
+        normal_user.password_hash = PasswordHasher("pbkdf2:sha256:500", workers=1).hash('usuario123')
+        db.session.commit()
+
+        client.post('/auth/login', data={'username': 'usuario', 'password': 'usuario123'})
+
+        pwhash = db.session.get(User, normal_user.id).password_hash
+        assert pwhash.startswith('pbkdf2:sha256:1000$')
+        assert normal_user.check_password('usuario123')
+
+    def test_failed_login_keeps_hash(self, client, db, normal_user):
+        old = PasswordHasher("pbkdf2:sha256:500", workers=1).hash('usuario123')
+        normal_user.password_hash = old
+        db.session.commit()
+
+        client.post('/auth/login', data={'username': 'usuario', 'password': 'mala'})
+
+        assert db.session.get(User, normal_user.id).password_hash == old
+
+    def test_busy_returns_503(self, app, client, normal_user, monkeypatch):
+        def busy(pwhash, password):
+            raise HasherBusy()
+        monkeypatch.setattr(app.extensions['password_hasher'], 'verify', busy)
+
+        response = client.post('/auth/login', data={'username': 'usuario', 'password': 'usuario123'})
+
+        assert response.status_code == 503
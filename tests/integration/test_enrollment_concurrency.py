@@ -0,0 +1,94 @@
+import threading
+import pytest
+from datetime import date
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.config import ProductionConfig
+from app.extensions import db as _db
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.enrollment_service import create_enrollment
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """Production profile on a file database so several threads share the same data."""
+    class StressConfig(ProductionConfig):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'stress.db'}"
+
+    app = create_app(StressConfig)
+    yield app
+    with app.app_context():
+        _db.session.remove()
+        _db.engine.dispose()
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+class TestConcurrentEnrollment:
+
+    def test_concurrent_enrollments_never_exceed_max_slots(self, file_app):
+        max_slots = 10
+        attempts = 60
+
+        with file_app.app_context():
+            activity = Activity(title='Taller Popular', date=date(2026, 9, 1),
+                                max_slots=max_slots, status='abierta')
+            _db.session.add(activity)
+            _db.session.commit()
+            activity_id = activity.id
+
+        barrier = threading.Barrier(attempts)
+        results = []
+        errors = []
+
+        def enroll(i):
+            with file_app.app_context():
+                try:
+                    barrier.wait(timeout=30)
+                    activity = _db.session.get(Activity, activity_id)
+                    enrollment = create_enrollment(
+                        activity,
+                        user_name=f'Participante {i}',
+                        email=f'participante{i}@test.com'
+                    )
+                    if enrollment is None:
+                        _db.session.rollback()
+                        results.append(False)
+                    else:
+                        _db.session.commit()
+                        results.append(True)
+                except Exception as exc:  # pragma: no cover - reported below
+                    _db.session.rollback()
+                    errors.append(exc)
+                finally:
+                    _db.session.remove()
+
+        threads = [threading.Thread(target=enroll, args=(i,)) for i in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert results.count(True) == max_slots
+
+        with file_app.app_context():
+            assert Enrollment.query.filter_by(activity_id=activity_id).count() == max_slots
+            assert _db.session.get(Activity, activity_id).enrolled_count == max_slots
+
+    def test_duplicate_enrollment_releases_slot(self, file_app):
+        with file_app.app_context():
+            activity = Activity(title='Taller', date=date(2026, 9, 1), max_slots=2, status='abierta')
+            _db.session.add(activity)
+            _db.session.commit()
+
+            create_enrollment(activity, user_name='Ana', email='ana@test.com')
+            _db.session.commit()
+
+            with pytest.raises(IntegrityError):
+                create_enrollment(activity, user_name='Ana', email='ana@test.com')
+            _db.session.rollback()
+
+            assert _db.session.get(Activity, activity.id).enrolled_count == 1
@@ -0,0 +1,259 @@
+import io
+import pytest
+from datetime import datetime
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.slot_hub import publish_activity
+from app.scheduler import run_status_update
+
+
+@pytest.mark.integration
+class TestEnrollmentRoutes:
+
+    def test_enroll_updates_counter(self, db, auth_user, open_activity):
+        """RF08: Inscripción de usuario"""
+        response = auth_user.post(f'/activities/{open_activity.id}/enroll')
+
+        assert response.status_code == 302
+        assert db.session.get(Activity, open_activity.id).enrolled_count == 1
+
+    def test_enroll_rejected_when_full(self, db, auth_user, full_activity):
+        """RF09: Control de plazas"""
+        auth_user.post(f'/activities/{full_activity.id}/enroll')
+
+        assert Enrollment.query.filter_by(activity_id=full_activity.id).count() == 2
+        assert db.session.get(Activity, full_activity.id).enrolled_count == 2
+
+    def test_unenroll_updates_counter(self, db, auth_user, open_activity):
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+        auth_user.post(f'/activities/{open_activity.id}/unenroll')
+
+        assert Enrollment.query.filter_by(activity_id=open_activity.id).count() == 0
+        assert db.session.get(Activity, open_activity.id).enrolled_count == 0
+
+    def test_internal_enrollment_updates_counter(self, db, auth_admin, open_activity):
+        auth_admin.post(f'/admin/activity/{open_activity.id}/enroll', data={
+            'name': 'Presencial',
+            'email': 'presencial@test.com',
+            'phone': '600000000'
+        })
+
+        assert db.session.get(Activity, open_activity.id).enrolled_count == 1
+
+    def test_internal_enrollment_duplicate_ignores_case(self, db, auth_admin, activity_with_enrollments):
+        response = auth_admin.post(f'/admin/activity/{activity_with_enrollments.id}/enroll', data={
+            'name': 'Otra vez',
+            'email': ' Participante1@TEST.com'
+        }, follow_redirects=True)
+
+        assert 'Esta persona ya está inscrita' in response.get_data(as_text=True)
+        assert db.session.get(Activity, activity_with_enrollments.id).enrolled_count == 3
+
+    def test_internal_enrollment_lists_recent_participants(self, auth_admin, activity_with_enrollments, open_activity):
+        html = auth_admin.get(f'/admin/activity/{open_activity.id}/enroll').get_data(as_text=True)
+
+        assert 'participante3@test.com' in html
+
+    def test_participant_typeahead(self, auth_admin, activity_with_enrollments):
+        found = auth_admin.get('/admin/participants?q=PARTICIPANTE 2').get_json()['participants']
+
+        assert found == [{'name': 'Participante 2', 'email': 'participante2@test.com', 'phone': None}]
+        assert auth_admin.get('/admin/participants?q=p').get_json() == {'participants': []}
+
+    def test_participant_typeahead_requires_admin(self, auth_user):
+        assert auth_user.get('/admin/participants?q=pa').status_code == 302
+
+    def test_enroll_rejects_schedule_conflict(self, db, auth_user, open_activity, activity_with_enrollments):
+        for activity in (open_activity, activity_with_enrollments):
+            activity.date, activity.time, activity.duration = open_activity.date, '18:00', 60
+        db.session.commit()
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+
+        response = auth_user.post(f'/activities/{activity_with_enrollments.id}/enroll', follow_redirects=True)
+
+        assert 'Coincide en horario' in response.get_data(as_text=True)
+        assert db.session.get(Activity, activity_with_enrollments.id).enrolled_count == 3
+
+    def test_my_enrollments_page(self, db, auth_user, open_activity, activity_with_enrollments):
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+
+        html = auth_user.get('/activities/mine?when=past').get_data(as_text=True)
+
+        assert 'Taller Abierto' in html
+        assert 'Taller con Inscritos' not in html
+        assert 'Pendiente' in html
+
+    def test_my_enrollments_json(self, db, auth_user, open_activity):
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+
+        data = auth_user.get('/activities/mine?when=past&format=json').get_json()
+
+        assert [item['activity_id'] for item in data['enrollments']] == [open_activity.id]
+        assert data['enrollments'][0]['date'] == '2026-05-15'
+        assert data['next'] is None and data['prev'] is None
+
+    def test_my_enrollments_invalid_params(self, auth_user):
+        assert auth_user.get('/activities/mine?when=todas').status_code == 400
+        assert auth_user.get('/activities/mine?after=x').status_code == 400
+
+    def test_my_enrollments_requires_login(self, client):
+        assert client.get('/activities/mine').status_code == 302
+
+    def test_mark_attendance_updates_counter(self, db, auth_admin, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+
+        auth_admin.post(f'/admin/enrollment/{enrollment.id}/attendance', data={'attended': 'true'})
+        assert db.session.get(Activity, activity_with_enrollments.id).attended_count == 1
+
+        auth_admin.post(f'/admin/enrollment/{enrollment.id}/attendance', data={'attended': 'false'})
+        assert db.session.get(Activity, activity_with_enrollments.id).attended_count == 0
+
+    def test_delete_activity_removes_enrollments(self, db, auth_admin, activity_with_enrollments):
+        activity_id = activity_with_enrollments.id
+
+        auth_admin.post(f'/admin/activity/{activity_id}/delete')
+
+        assert db.session.get(Activity, activity_id) is None
+        assert Enrollment.query.filter_by(activity_id=activity_id).count() == 0
+
+
+@pytest.mark.integration
+class TestRecountCommand:
+
+    def test_recount_command(self, app, db, open_activity):
+        db.session.add(Enrollment(user_name='Directo', email='directo@test.com', activity_id=open_activity.id))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=['recount-activities'])
+
+        assert result.exit_code == 0
+        assert db.session.get(Activity, open_activity.id).enrolled_count == 1
+
+
+@pytest.mark.integration
+class TestImportEnrollments:
+
+    def test_import_csv_renders_report(self, db, auth_admin, open_activity):
+        content = 'Nombre,Email,Teléfono\nAna,ana@test.com,600\nLuis,no-es-email,\n'.encode('utf-8')
+
+        response = auth_admin.post(
+            f'/admin/activity/{open_activity.id}/import',
+            data={'file': (io.BytesIO(content), 'hoja.csv')},
+            content_type='multipart/form-data'
+        )
+
+        html = response.get_data(as_text=True)
+        assert response.status_code == 200
+        assert 'Email no válido' in html
+        assert Enrollment.query.filter_by(activity_id=open_activity.id).count() == 1
+        assert db.session.get(Activity, open_activity.id).enrolled_count == 1
+
+
+@pytest.mark.integration
+class TestBatchAttendance:
+
+    def test_batch_attendance_updates_all_states(self, db, auth_admin, activity_with_enrollments, count_queries):
+        first, second, third = activity_with_enrollments.enrollments
+        data = {
+            f'attended-{first.id}': 'true',
+            f'attended-{second.id}': 'false',
+            f'attended-{third.id}': 'true',
+        }
+
+        with count_queries() as statements:
+            response = auth_admin.post(f'/admin/activity/{activity_with_enrollments.id}/attendance', data=data)
+
+        assert response.status_code == 302
+        assert sum(s.startswith('UPDATE enrollment') for s in statements) == 2
+        db.session.expire_all()
+        assert [e.attended for e in activity_with_enrollments.enrollments] == [True, False, True]
+        assert activity_with_enrollments.attended_count == 2
+
+    def test_batch_attendance_ignores_other_activities(self, db, auth_admin, activity_with_enrollments, full_activity):
+        other = full_activity.enrollments[0]
+
+        auth_admin.post(f'/admin/activity/{activity_with_enrollments.id}/attendance',
+                        data={f'attended-{other.id}': 'true'})
+
+        db.session.expire_all()
+        assert other.attended is None
+        assert full_activity.attended_count == 0
+
+    def test_batch_attendance_rejects_invalid_state(self, auth_admin, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+
+        response = auth_admin.post(f'/admin/activity/{activity_with_enrollments.id}/attendance',
+                                   data={f'attended-{enrollment.id}': 'quizas'})
+
+        assert response.status_code == 400
+
+    def test_enrollments_page_has_batch_form(self, auth_admin, activity_with_enrollments):
+        html = auth_admin.get(f'/admin/activity/{activity_with_enrollments.id}/enrollments').get_data(as_text=True)
+
+        assert 'id="batch-attendance"' in html
+        assert html.count('form="batch-attendance"') == 9
+
+
+@pytest.mark.integration
+class TestSlotStream:
+
+    def test_enroll_publishes_slots(self, app, auth_user, open_activity):
+        hub = app.extensions['slot_hub']
+        start = hub.seq
+
+        auth_user.post(f'/activities/{open_activity.id}/enroll')
+
+        assert hub.changes_after(start) == [
+            (start + 1, {'id': open_activity.id, 'status': 'abierta', 'available_slots': 9})
+        ]
+
+    def test_stream_pushes_committed_change(self, app, db, client, open_activity):
+        response = client.get(f'/activities/stream?ids={open_activity.id}', buffered=False)
+        chunks = iter(response.response)
+        assert response.mimetype == 'text/event-stream'
+        assert next(chunks).startswith(b'retry:')
+
+        open_activity.status = 'cerrada'
+        db.session.commit()
+        publish_activity(open_activity.id)
+
+        event = next(chunks).decode()
+        response.close()
+        assert 'event: slots' in event
+        assert '"status": "cerrada"' in event
+
+    def test_invalid_ids(self, client):
+        assert client.get('/activities/stream?ids=a,b').status_code == 400
+
+    def test_catalog_has_stream_url(self, client, open_activity):
+        html = client.get('/activities/?from=').data.decode()
+
+        assert f'/activities/stream?ids={open_activity.id}' in html
+
+
+@pytest.mark.integration
+class TestStatusScheduler:
+
+    def test_closed_activity_rejects_enrollment(self, db, auth_user, open_activity):
+        open_activity.status = 'cerrada'
+        db.session.commit()
+
+        response = auth_user.post(f'/activities/{open_activity.id}/enroll', follow_redirects=True)
+
+        assert 'cerrada' in response.data.decode()
+        assert Enrollment.query.count() == 0
+
+    def test_run_publishes_changes(self, app, db, open_activity):
+        hub = app.extensions['slot_hub']
+        start = hub.seq
+
+        changed = run_status_update(now=datetime(2026, 6, 1, 0, 0))
+
+        assert changed['finalizada'] == [open_activity.id]
+        assert hub.changes_after(start)[0][1]['status'] == 'finalizada'
+
+    def test_cli_command(self, app, db, open_activity):
+        result = app.test_cli_runner().invoke(args=['update-statuses'])
+
+        assert 'finalizadas' in result.output
+        assert db.session.get(Activity, open_activity.id).status == 'finalizada'
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+from app import create_app
+from app.config import get_config, DevelopmentConfig, ProductionConfig
+from app.extensions import db as _db
+
+
+@pytest.mark.unit
+class TestConfigProfiles:
+
+    def test_get_config_from_env(self, monkeypatch):
+        monkeypatch.setenv('APP_ENV', 'production')
+        assert get_config() is ProductionConfig
+
+        monkeypatch.delenv('APP_ENV')
+        assert get_config() is DevelopmentConfig
+
+    def test_unknown_profile(self):
+        with pytest.raises(ValueError):
+            get_config('staging')
+
+    def test_production_pragmas_on_every_connection(self, tmp_path):
+        class FileProductionConfig(ProductionConfig):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'prod.db'}"
+
+        app = create_app(FileProductionConfig)
+        with app.app_context():
+            with _db.engine.connect() as connection:
+                assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+                assert connection.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+                assert connection.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+                assert connection.execute(text('PRAGMA foreign_keys')).scalar() == 1
+            _db.engine.dispose()
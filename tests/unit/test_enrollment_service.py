@@ -0,0 +1,146 @@
+import pytest
+from datetime import date
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.services.enrollment_service import (
+    create_enrollment, delete_enrollment, set_attendance, recount_activities,
+    parse_import_csv, bulk_create_enrollments, user_enrollments
+)
+
+
+@pytest.mark.unit
+class TestEnrollmentCounters:
+
+    def test_create_enrollment_increments_counter(self, db, open_activity):
+        create_enrollment(open_activity, user_name='Ana', email='ana@test.com')
+        db.session.commit()
+
+        assert open_activity.enrolled_count == 1
+        assert open_activity.available_slots == 9
+
+    def test_delete_enrollment_decrements_counters(self, db, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+        set_attendance(enrollment, True)
+        db.session.commit()
+        assert activity_with_enrollments.attended_count == 1
+
+        delete_enrollment(enrollment)
+        db.session.commit()
+
+        assert activity_with_enrollments.enrolled_count == 2
+        assert activity_with_enrollments.attended_count == 0
+
+    def test_set_attendance_only_counts_attended(self, db, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+
+        set_attendance(enrollment, True)
+        set_attendance(enrollment, True)
+        db.session.commit()
+        assert activity_with_enrollments.attended_count == 1
+
+        set_attendance(enrollment, False)
+        db.session.commit()
+        assert activity_with_enrollments.attended_count == 0
+
+    def test_recount_activities_repairs_counters(self, db, open_activity):
+        for i in range(4):
+            db.session.add(Enrollment(
+                user_name=f'Directo {i}',
+                email=f'directo{i}@test.com',
+                activity_id=open_activity.id,
+                attended=i < 2
+            ))
+        db.session.commit()
+        assert open_activity.enrolled_count == 0
+
+        updated = recount_activities()
+        db.session.commit()
+
+        assert updated == 1
+        assert open_activity.enrolled_count == 4
+        assert open_activity.attended_count == 2
+
+
+@pytest.mark.unit
+class TestBulkImport:
+
+    def test_parse_import_csv_semicolon_and_accents(self):
+        content = 'Nombre;Email;Teléfono\nAna;ana@test.com;600\n;\nLuis;luis@test.com;\n'.encode('utf-8-sig')
+
+        rows = parse_import_csv(content)
+
+        assert [row['line'] for row in rows] == [2, 4]
+        assert rows[0] == {'line': 2, 'name': 'Ana', 'email': 'ana@test.com', 'phone': '600'}
+
+    def test_parse_import_csv_requires_header(self):
+        with pytest.raises(ValueError):
+            parse_import_csv(b'foo,bar\n1,2\n')
+
+    def test_bulk_create_reports_every_row(self, db, full_activity):
+        full_activity.max_slots = 4
+        db.session.commit()
+        rows = [
+            {'line': 2, 'name': 'Nueva', 'email': 'nueva@test.com', 'phone': ''},
+            {'line': 3, 'name': 'Repetida', 'email': 'user0@test.com', 'phone': ''},
+            {'line': 4, 'name': '', 'email': 'sin-nombre@test.com', 'phone': ''},
+            {'line': 5, 'name': 'Nueva bis', 'email': 'nueva@test.com', 'phone': ''},
+            {'line': 6, 'name': 'Otra', 'email': 'otra@test.com', 'phone': '600'},
+            {'line': 7, 'name': 'Sin plaza', 'email': 'tarde@test.com', 'phone': ''},
+        ]
+
+        report = bulk_create_enrollments(full_activity, rows)
+        db.session.commit()
+
+        assert [entry['accepted'] for entry in report] == [True, False, False, False, True, False]
+        assert report[1]['reason'] == 'Ya está inscrito en la actividad'
+        assert report[5]['reason'] == 'No hay plazas disponibles'
+        assert full_activity.enrolled_count == 4
+        assert Enrollment.query.filter_by(activity_id=full_activity.id).count() == 4
+
+
+@pytest.mark.unit
+class TestUserEnrollments:
+
+    @pytest.fixture
+    def enrolled(self, db, normal_user):
+        """The user enrolled in activities on May 1st to 5th; someone else in the 3rd."""
+        activities = []
+        for day in range(1, 6):
+            activity = Activity(title=f'Sesión {day}', date=date(2026, 5, day), max_slots=5, status='abierta')
+            db.session.add(activity)
+            activities.append(activity)
+        db.session.commit()
+        for activity in activities:
+            create_enrollment(activity, user_name='Usuario', email='usuario@test.com', user_id=normal_user.id)
+        create_enrollment(activities[2], user_name='Otra', email='otra@test.com')
+        db.session.commit()
+        return activities
+
+    def titles(self, page):
+        return [item['title'] for item in page.items]
+
+    def test_upcoming_and_past(self, normal_user, enrolled):
+        today = date(2026, 5, 3)
+
+        upcoming = user_enrollments(normal_user.id, 'upcoming', today=today)
+        past = user_enrollments(normal_user.id, 'past', today=today)
+
+        assert self.titles(upcoming) == ['Sesión 3', 'Sesión 4', 'Sesión 5']
+        assert self.titles(past) == ['Sesión 2', 'Sesión 1']
+        assert upcoming.items[0]['attended'] is None
+
+    def test_keyset_pages(self, normal_user, enrolled):
+        first = user_enrollments(normal_user.id, 'past', today=date(2026, 6, 1), per_page=2)
+        second = user_enrollments(normal_user.id, 'past', today=date(2026, 6, 1), per_page=2,
+                                  after=first.next_cursor)
+
+        assert self.titles(first) == ['Sesión 5', 'Sesión 4']
+        assert self.titles(second) == ['Sesión 3', 'Sesión 2']
+        assert second.prev_cursor is not None
+
+    def test_only_own_enrollments(self, normal_user, admin_user, enrolled):
+        assert user_enrollments(admin_user.id, today=date(2026, 5, 1)).items == []
+
+    def test_invalid_period(self, normal_user):
+        with pytest.raises(ValueError):
+            user_enrollments(normal_user.id, 'todas')
@@ -0,0 +1,19 @@
+import pytest
+from app.services.export_service import iter_csv, content_disposition
+
+
+@pytest.mark.unit
+class TestCsvExport:
+
+    def test_iter_csv_yields_header_and_batches(self):
+        chunks = list(iter_csv(['a', 'b'], ([i, i * 2] for i in range(5)), batch_size=2))
+
+        assert chunks[0] == 'a,b\r\n'
+        assert len(chunks) == 4
+        assert ''.join(chunks[1:]) == ''.join(f'{i},{i * 2}\r\n' for i in range(5))
+
+    def test_content_disposition_ascii_fallback(self):
+        header = content_disposition('inscritos_Club_Lectura_Niños.csv')
+
+        assert 'filename="inscritos_Club_Lectura_Ninos.csv"' in header
+        assert "filename*=UTF-8''inscritos_Club_Lectura_Ni%C3%B1os.csv" in header
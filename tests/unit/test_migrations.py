@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app.migrations import upgrade, MIGRATIONS
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """Database as created by the first versions of the app (no phone, no counters)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE activity (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, "
+            "description TEXT, type VARCHAR(100), date DATE NOT NULL, time VARCHAR(10), "
+            "duration INTEGER, max_slots INTEGER NOT NULL, status VARCHAR(50), "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE enrollment (id INTEGER PRIMARY KEY, user_name VARCHAR(200) NOT NULL, "
+            "email VARCHAR(200) NOT NULL, activity_id INTEGER NOT NULL, user_id INTEGER, "
+            "enrollment_date DATETIME, status VARCHAR(50), attended BOOLEAN, created_at DATETIME, "
+            "CONSTRAINT unique_enrollment UNIQUE (email, activity_id))"
+        ))
+        connection.execute(text(
+            "INSERT INTO activity (id, title, date, max_slots, status) VALUES (1, 'Taller', '2026-05-01', 10, 'abierta')"
+        ))
+        connection.execute(text(
+            "INSERT INTO enrollment (user_name, email, activity_id, attended) VALUES "
+            "('Ana', 'ana@test.com', 1, 1), ('Luis', ' Luis@Test.com', 1, NULL)"
+        ))
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.unit
+class TestMigrations:
+
+    def test_upgrade_legacy_database(self, legacy_engine):
+        applied = upgrade(legacy_engine)
+
+        assert applied == [name for _, name, _ in MIGRATIONS]
+        inspector = inspect(legacy_engine)
+        assert 'phone' in {c['name'] for c in inspector.get_columns('enrollment')}
+        assert {'ix_enrollment_activity_user', 'ix_enrollment_activity_date'} <= \
+            {i['name'] for i in inspector.get_indexes('enrollment')}
+        assert 'ix_activity_status_date' in {i['name'] for i in inspector.get_indexes('activity')}
+        with legacy_engine.connect() as connection:
+            counters = connection.execute(text(
+                "SELECT enrolled_count, attended_count FROM activity WHERE id = 1"
+            )).one()
+        assert tuple(counters) == (2, 1)
+        with legacy_engine.connect() as connection:
+            assert connection.execute(text("SELECT email FROM enrollment ORDER BY id")).scalars().all() == \
+                ['ana@test.com', 'luis@test.com']
+            assert connection.execute(text("SELECT name FROM participant ORDER BY email")).scalars().all() == \
+                ['Ana', 'Luis']
+
+    def test_database_upgraded_at_v10_gets_user_index(self, legacy_engine):
+        upgrade(legacy_engine)
+        with legacy_engine.begin() as connection:
+            # As left by migration 10 before migration 13 existed
+            connection.execute(text("DROP INDEX ix_enrollment_user"))
+            connection.execute(text("CREATE INDEX ix_enrollment_user_activity ON enrollment (user_id, activity_id)"))
+            connection.execute(text("DELETE FROM schema_migrations WHERE version = 13"))
+
+        assert upgrade(legacy_engine) == ['enrollment_user_index_only']
+        indexes = {i['name'] for i in inspect(legacy_engine).get_indexes('enrollment')}
+        assert 'ix_enrollment_user' in indexes
+        assert 'ix_enrollment_user_activity' not in indexes
+
+    def test_upgrade_is_idempotent(self, legacy_engine):
+        upgrade(legacy_engine)
+
+        assert upgrade(legacy_engine) == []
+
+    def test_upgrade_fresh_database(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+        upgrade(engine)
+
+        assert {'user', 'activity', 'enrollment', 'schema_migrations'} <= set(inspect(engine).get_table_names())
+        engine.dispose()
+
+
+@pytest.mark.unit
+class TestExplainQueries:
+
+    def test_hot_queries_use_indexes(self, app, db):
+        result = app.test_cli_runner().invoke(args=['explain-queries'])
+
+        assert result.exit_code == 0
+        assert 'ix_enrollment_activity_user' in result.output
+        assert 'ix_enrollment_activity_date' in result.output
+        assert 'SCAN enrollment' not in result.output
@@ -0,0 +1,69 @@
+import pytest
+from app.cache import PageCache
+
+
+@pytest.mark.unit
+class TestPageCache:
+
+    def test_lru_eviction(self):
+        cache = PageCache(max_entries=2)
+        cache.set('a', b'A')
+        cache.set('b', b'B')
+        cache.get('a')
+        cache.set('c', b'C')
+
+        assert cache.get('b') is None
+        assert cache.get('a') == b'A'
+        assert cache.get('c') == b'C'
+        assert cache.evictions == 1
+
+    def test_invalidate_by_tag(self):
+        cache = PageCache()
+        cache.set('index', b'I', ['catalog'])
+        cache.set('detail-1', b'D1', ['activity:1'])
+        cache.set('detail-2', b'D2', ['activity:2'])
+
+        assert cache.invalidate('catalog', 'activity:1') == 2
+        assert cache.get('index') is None
+        assert cache.get('detail-1') is None
+        assert cache.get('detail-2') == b'D2'
+
+    def test_page_rendered_before_invalidation_not_stored(self):
+        cache = PageCache()
+        since = cache.generation()
+        cache.invalidate('catalog')  # a write commits while the page renders
+
+        assert cache.set('index', b'stale', ['catalog'], since=since) is False
+        assert cache.get('index') is None
+        assert cache.set('detail-1', b'D1', ['activity:1'], since=since) is True
+        assert cache.set('index', b'fresh', ['catalog'], since=cache.generation()) is True
+
+    def test_forgotten_generations_refuse_older_pages(self):
+        cache = PageCache(max_entries=1)
+        since = cache.generation()
+        for activity_id in range(65):
+            cache.invalidate(f'activity:{activity_id}')
+
+        assert cache.set('detail-99', b'D', ['activity:99'], since=since) is False
+        assert cache.set('detail-99', b'D', ['activity:99'], since=cache.generation()) is True
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = PageCache(ttl=60)
+        now = [1000.0]
+        monkeypatch.setattr('app.cache.time.monotonic', lambda: now[0])
+        cache.set('index', b'I', ['catalog'])
+
+        now[0] += 59
+        assert cache.get('index') == b'I'
+        now[0] += 2
+        assert cache.get('index') is None
+        assert cache.stats()['size'] == 0
+
+    def test_stats(self):
+        cache = PageCache()
+        cache.set('a', b'A')
+        cache.get('a')
+        cache.get('b')
+
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (1, 1, 0.5)
@@ -0,0 +1,56 @@
+import pytest
+from datetime import date
+from app.models.activity import Activity
+from app.services.pagination import keyset_page, encode_cursor, decode_cursor
+
+
+@pytest.fixture
+def activities(db):
+    items = []
+    for i in range(7):
+        activity = Activity(title=f'A{i}', date=date(2026, 3, 1 + i // 2), max_slots=5)
+        db.session.add(activity)
+        items.append(activity)
+    db.session.commit()
+    return items
+
+
+def _page(db, **kwargs):
+    query = db.session.query(Activity.id, Activity.date)
+    return keyset_page(query, Activity.date, Activity.id, 3, **kwargs)
+
+
+@pytest.mark.unit
+class TestKeysetPagination:
+
+    def test_cursor_roundtrip(self, activities):
+        cursor = encode_cursor(activities[0])
+        assert decode_cursor(cursor) == (activities[0].date, activities[0].id)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor('2026-13-01_x')
+
+    def test_forward_walk_visits_every_row_once(self, db, activities):
+        seen = []
+        page = _page(db)
+        assert page.prev_cursor is None
+        while True:
+            seen.extend(row.id for row in page.items)
+            if not page.next_cursor:
+                break
+            page = _page(db, after=page.next_cursor)
+
+        assert seen == [a.id for a in activities]
+
+    def test_backward_page(self, db, activities):
+        second = _page(db, after=_page(db).next_cursor)
+        back = _page(db, before=second.prev_cursor)
+
+        assert [row.id for row in back.items] == [a.id for a in activities[:3]]
+        assert back.prev_cursor is None
+        assert back.next_cursor is not None
+
+    def test_descending(self, db, activities):
+        page = _page(db, descending=True)
+        assert [row.id for row in page.items] == [a.id for a in reversed(activities)][:3]
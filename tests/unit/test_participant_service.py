@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime
+from app.models.enrollment import Enrollment
+from app.models.participant import Participant
+from app.services.enrollment_service import create_enrollment, bulk_create_enrollments
+from app.services.participant_service import (
+    normalize_email, fold_name, record_participant, search_participants,
+    recent_participants, rebuild_participants
+)
+
+
+def emails(participants):
+    return [participant.email for participant in participants]
+
+
+@pytest.mark.unit
+class TestNormalization:
+
+    def test_normalize_email(self):
+        assert normalize_email('  Ana.Pérez@Example.COM ') == 'ana.pérez@example.com'
+        assert normalize_email(None) == ''
+
+    def test_fold_name(self):
+        assert fold_name('  José   ÁLVAREZ Núñez') == 'jose alvarez nunez'
+
+
+@pytest.mark.unit
+class TestParticipantDirectory:
+
+    def test_enrollments_fill_directory(self, db, open_activity, activity_with_enrollments):
+        create_enrollment(open_activity, user_name='Ana Ruiz', email=' Ana@Test.com', phone='600111222')
+        create_enrollment(activity_with_enrollments, user_name='Ana Ruiz Gil', email='ana@test.com')
+        db.session.commit()
+
+        participant = Participant.query.filter_by(email='ana@test.com').one()
+        assert participant.name == 'Ana Ruiz Gil'
+        assert participant.phone == '600111222'
+        assert Enrollment.query.filter_by(activity_id=open_activity.id).one().email == 'ana@test.com'
+
+    def test_prefix_search_by_name_and_email(self, db):
+        record_participant('Álvaro Gómez', 'agomez@test.com')
+        record_participant('Lucía Alba', 'lucia@test.com')
+        record_participant('Marta Ruiz', 'marta@test.com')
+        db.session.commit()
+
+        assert sorted(emails(search_participants('alva'))) == ['agomez@test.com']
+        assert sorted(emails(search_participants('LUC'))) == ['lucia@test.com']
+        assert sorted(emails(search_participants('a'))) == ['agomez@test.com']
+        assert search_participants('  ') == []
+        assert search_participants('z') == []
+
+    def test_most_recent_first(self, db):
+        record_participant('Ana Uno', 'ana1@test.com')
+        db.session.commit()
+        record_participant('Ana Dos', 'ana2@test.com')
+        db.session.commit()
+
+        assert emails(search_participants('ana')) == ['ana2@test.com', 'ana1@test.com']
+        assert emails(recent_participants(1)) == ['ana2@test.com']
+
+    def test_bulk_import_records_participants(self, db, open_activity):
+        rows = [
+            {'line': 2, 'name': 'Nueva', 'email': 'Nueva@Test.com', 'phone': ''},
+            {'line': 3, 'name': 'Nueva bis', 'email': 'nueva@test.com ', 'phone': ''},
+        ]
+
+        report = bulk_create_enrollments(open_activity, rows)
+        db.session.commit()
+
+        assert [entry['accepted'] for entry in report] == [True, False]
+        assert report[1]['reason'] == 'Email repetido en el fichero'
+        assert emails(Participant.query.all()) == ['nueva@test.com']
+
+    def test_rebuild_from_enrollments(self, db, activity_with_enrollments):
+        Participant.query.delete()
+        # Legacy row stored before emails were normalized
+        db.session.add(Enrollment(user_name='Mayúsculas', email='PARTICIPANTE1@test.com',
+                                  activity_id=activity_with_enrollments.id,
+                                  enrollment_date=datetime(2030, 1, 1)))
+        db.session.commit()
+
+        assert rebuild_participants() == 3
+        assert Participant.query.filter_by(email='participante1@test.com').one().name == 'Mayúsculas'
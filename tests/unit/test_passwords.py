@@ -0,0 +1,53 @@
+import threading
+import pytest
+from app.passwords import PasswordHasher, HasherBusy
+
+
+@pytest.mark.unit
+class TestPasswordHasher:
+
+    def test_hash_uses_configured_method(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1)
+
+        assert hasher.hash('secreto').startswith('pbkdf2:sha256:1000$')
+
+    def test_verify(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1)
+        pwhash = hasher.hash('secreto')
+
+        assert hasher.verify(pwhash, 'secreto') is True
+        assert hasher.verify(pwhash, 'otro') is False
+
+    def test_needs_rehash_on_other_parameters(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1)
+        old = PasswordHasher("pbkdf2:sha256:500", workers=1).hash('secreto')
+
+        assert hasher.needs_rehash(old) is True
+        assert hasher.needs_rehash(hasher.hash('secreto')) is False
+
+    def test_short_method_is_expanded(self):
+        hasher = PasswordHasher("scrypt", workers=1)
+
+        assert hasher.needs_rehash(PasswordHasher("scrypt:32768:8:1", workers=1).hash('x')) is False
+
+    def test_busy_when_no_slot_frees(self):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, queue=0, wait=0.01)
+        pwhash = hasher.hash('secreto')
+        hasher._slots.acquire()
+
+        with pytest.raises(HasherBusy):
+            hasher.verify(pwhash, 'secreto')
+
+    def test_rehash_runs_in_pool(self, monkeypatch):
+        hasher = PasswordHasher("pbkdf2:sha256:1000", workers=1, queue=0, wait=0.01)
+        threads = []
+        monkeypatch.setattr('app.passwords.generate_password_hash', lambda password, method: (
+            threads.append(threading.current_thread().name) or f'{method}$salt$hash'
+        ))
+
+        assert hasher.rehash('secreto').startswith('pbkdf2:sha256:1000$')
+        assert threads[0].startswith('password-hash')
+
+        hasher._slots.acquire()
+        with pytest.raises(HasherBusy):
+            hasher.rehash('secreto')
@@ -0,0 +1,86 @@
+import pytest
+from datetime import date
+from app.models.activity import Activity
+from app.models.report import ReportRollup
+from app.services.enrollment_service import (
+    create_enrollment, delete_enrollment, set_attendance, set_attendance_bulk, bulk_create_enrollments
+)
+from app.services.report_service import rebuild_rollups, report_summary
+
+
+def rollups(db):
+    return {
+        (row.dimension, row.bucket): (row.activities, row.enrolled, row.attended)
+        for row in ReportRollup.query.all()
+        if row.activities or row.enrolled or row.attended
+    }
+
+
+@pytest.mark.unit
+class TestReportRollups:
+
+    def test_new_activity_counted(self, db, open_activity):
+        assert rollups(db) == {
+            ('status', 'abierta'): (1, 0, 0),
+            ('type', ''): (1, 0, 0),
+            ('month', '2026-05'): (1, 0, 0),
+        }
+
+    def test_enrollment_and_attendance_writes(self, db, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+        set_attendance(enrollment, True)
+        db.session.commit()
+
+        assert rollups(db)[('status', 'abierta')] == (1, 3, 1)
+
+        delete_enrollment(enrollment)
+        db.session.commit()
+
+        assert rollups(db)[('status', 'abierta')] == (1, 2, 0)
+
+    def test_status_change_moves_contribution(self, db, activity_with_enrollments):
+        activity_with_enrollments.status = 'cerrada'
+        activity_with_enrollments.type = 'taller'
+        db.session.commit()
+
+        current = rollups(db)
+        assert ('status', 'abierta') not in current
+        assert current[('status', 'cerrada')] == (1, 3, 0)
+        assert current[('type', 'taller')] == (1, 3, 0)
+
+    def test_edit_after_counter_update_keeps_counts(self, db, activity_with_enrollments):
+        activity_with_enrollments.title  # loaded, then counters change in bulk
+        set_attendance(activity_with_enrollments.enrollments[0], True)
+        activity_with_enrollments.type = 'taller'
+        db.session.commit()
+
+        assert rollups(db)[('type', 'taller')] == (1, 3, 1)
+
+    def test_incremental_matches_rebuild(self, db, open_activity, activity):
+        create_enrollment(open_activity, user_name='Ana', email='ana@test.com')
+        bulk_create_enrollments(open_activity, [
+            {'line': 2, 'name': 'Luis', 'email': 'luis@test.com', 'phone': ''},
+            {'line': 3, 'name': 'Eva', 'email': 'eva@test.com', 'phone': ''},
+        ])
+        db.session.commit()
+        ids = [e.id for e in open_activity.enrollments]
+        set_attendance_bulk(open_activity.id, {ids[0]: True, ids[1]: True, ids[2]: False})
+        other = Activity(title='Club', type='club', date=date(2026, 6, 2), max_slots=5, status='abierta')
+        db.session.add(other)
+        db.session.commit()
+        db.session.delete(activity)
+        db.session.commit()
+
+        incremental = rollups(db)
+        rebuild_rollups()
+        db.session.commit()
+
+        assert incremental == rollups(db)
+        assert incremental[('status', 'abierta')] == (2, 3, 2)
+
+    def test_summary_totals(self, db, activity_with_enrollments, activity):
+        summary = report_summary()
+
+        assert summary['total_activities'] == 2
+        assert summary['total_enrollments'] == 3
+        assert summary['top_activities'][0].id == activity_with_enrollments.id
@@ -0,0 +1,73 @@
+import pytest
+from datetime import date, datetime
+from app.services.enrollment_service import create_enrollment
+from app.services.schedule_service import (
+    parse_time, activity_slot, schedule_conflicts, enrollment_conflicts
+)
+
+DAY = date(2026, 5, 10)
+
+
+def titles(activities):
+    return [activity.title for activity in activities]
+
+
+@pytest.mark.unit
+class TestActivitySlot:
+
+    def test_parse_time(self):
+        assert parse_time('09:30').hour == 9
+        assert parse_time('') is None
+        assert parse_time('mañana') is None
+
+    def test_slot_with_default_duration(self):
+        assert activity_slot(DAY, '18:00', 90) == (datetime(2026, 5, 10, 18), datetime(2026, 5, 10, 19, 30))
+        assert activity_slot(DAY, '18:00', None) == (datetime(2026, 5, 10, 18), datetime(2026, 5, 10, 19))
+        assert activity_slot(DAY, None, 90) == (None, None)
+
+    def test_columns_follow_edits(self, db, make_activity):
+        activity = make_activity('Taller', time='10:00', duration=30)
+        assert (activity.starts_at, activity.ends_at) == (datetime(2026, 5, 10, 10), datetime(2026, 5, 10, 10, 30))
+
+        activity.time = '11:00'
+        db.session.commit()
+        assert activity.ends_at == datetime(2026, 5, 10, 11, 30)
+
+        activity.time = None
+        db.session.commit()
+        assert activity.starts_at is None and activity.ends_at is None
+
+
+@pytest.mark.unit
+class TestScheduleConflicts:
+
+    def test_overlaps_only(self, make_activity):
+        make_activity('Mañana', time='10:00', duration=60)
+        make_activity('Tarde', time='17:00', duration=120)
+        make_activity('Sin hora')
+        make_activity('Otro día', time='17:30', duration=60, date=date(2026, 5, 11))
+
+        assert titles(schedule_conflicts(DAY, '18:00', 30)) == ['Tarde']
+        assert titles(schedule_conflicts(DAY, '11:00', 420)) == ['Tarde']
+        assert schedule_conflicts(DAY, '11:00', 60) == []  # touching slots do not overlap
+        assert schedule_conflicts(DAY, None, None) == []
+
+    def test_long_activity_found_by_range_scan(self, make_activity):
+        make_activity('Jornada', time='08:00', duration=600)
+
+        assert titles(schedule_conflicts(DAY, '17:00', 30)) == ['Jornada']
+
+    def test_excludes_itself(self, make_activity):
+        activity = make_activity('Taller', time='10:00', duration=60)
+
+        assert schedule_conflicts(DAY, '10:30', 60, exclude_id=activity.id) == []
+
+    def test_enrollment_conflicts_of_user(self, db, normal_user, make_activity):
+        enrolled = make_activity('Club', time='18:00', duration=60)
+        create_enrollment(enrolled, user_name='Usuario', email='usuario@test.com', user_id=normal_user.id)
+        make_activity('Ajeno', time='18:00', duration=60)
+        db.session.commit()
+        wanted = make_activity('Cine', time='18:30', duration=90)
+
+        assert titles(enrollment_conflicts(normal_user.id, wanted)) == ['Club']
+        assert enrollment_conflicts(normal_user.id + 1, wanted) == []
@@ -0,0 +1,88 @@
+import pytest
+from app.services.search_service import match_expression, search_catalog, rebuild_search_index
+
+
+def titles(page):
+    return [item['title'] for item in page.items]
+
+
+@pytest.mark.unit
+class TestMatchExpression:
+
+    def test_words_quoted_as_prefixes(self):
+        assert match_expression('taller música') == '"taller"* "música"*'
+
+    def test_operators_and_punctuation_are_literal(self):
+        assert match_expression('club OR "lectura" -(niños)') == '"club"* "OR"* "lectura"* "niños"*'
+
+    def test_empty_query(self):
+        assert match_expression('  ¿? ') is None
+        assert match_expression(None) is None
+
+
+@pytest.mark.unit
+class TestSearchCatalog:
+
+    def test_accents_and_prefixes(self, make_activity):
+        make_activity('Taller de Música', description='Iniciación al ukelele')
+        make_activity('Club de lectura')
+
+        assert titles(search_catalog('musica')) == ['Taller de Música']
+        assert titles(search_catalog('talle')) == ['Taller de Música']
+        assert titles(search_catalog('UKELELE')) == ['Taller de Música']
+
+    def test_all_words_required(self, make_activity):
+        make_activity('Taller de cómic')
+        make_activity('Taller de poesía')
+
+        assert titles(search_catalog('taller poesia')) == ['Taller de poesía']
+
+    def test_title_ranks_above_description(self, make_activity):
+        make_activity('Cuentacuentos', description='Historias con marionetas y teatro de sombras')
+        make_activity('Teatro en familia')
+
+        assert titles(search_catalog('teatro')) == ['Teatro en familia', 'Cuentacuentos']
+
+    def test_index_follows_updates_and_deletes(self, db, make_activity):
+        activity = make_activity('Cineforum')
+        activity.title = 'Videoforum'
+        db.session.commit()
+
+        assert titles(search_catalog('cineforum')) == []
+        assert titles(search_catalog('videoforum')) == ['Videoforum']
+
+        db.session.delete(activity)
+        db.session.commit()
+
+        assert titles(search_catalog('videoforum')) == []
+
+    def test_catalog_filters_apply(self, make_activity):
+        make_activity('Yoga borrador', status='borrador')
+        make_activity('Yoga cerrado', status='cerrada')
+
+        assert titles(search_catalog('yoga')) == ['Yoga cerrado']
+        assert titles(search_catalog('yoga', include_drafts=True, status='borrador')) == ['Yoga borrador']
+
+    def test_offset_cursors(self, make_activity):
+        for number in range(5):
+            make_activity(f'Ajedrez {number}')
+
+        first = search_catalog('ajedrez', per_page=2)
+        second = search_catalog('ajedrez', after=first.next_cursor, per_page=2)
+        back = search_catalog('ajedrez', before=second.prev_cursor, per_page=2)
+
+        assert first.prev_cursor is None and first.next_cursor == '2'
+        assert len(second.items) == 2 and not set(titles(first)) & set(titles(second))
+        assert titles(back) == titles(first)
+
+    def test_invalid_cursor(self, db):
+        with pytest.raises(ValueError):
+            search_catalog('ajedrez', after='no-es-un-cursor')
+        with pytest.raises(ValueError):
+            search_catalog('ajedrez', after='-3')
+
+    def test_rebuild(self, make_activity):
+        make_activity('Robótica')
+
+        assert rebuild_search_index() == 1
+        assert titles(search_catalog('robotica')) == ['Robótica']
@@ -0,0 +1,177 @@
+import pytest
+from datetime import date, datetime
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.models.report import ReportRollup
+from app.models.tombstone import Tombstone
+from app.services.activity_service import list_catalog
+from app.services.enrollment_service import create_enrollment
+from app.services.report_service import rebuild_rollups
+from app.services.series_service import (
+    occurrences, create_series, update_series, cancel_series, future_sessions
+)
+
+TODAY = date(2026, 5, 13)
+
+
+def rollups(db):
+    return {
+        (row.dimension, row.bucket): (row.activities, row.enrolled, row.attended)
+        for row in ReportRollup.query.all()
+        if row.activities or row.enrolled or row.attended
+    }
+
+
+def assert_rollups_consistent(db):
+    kept = rollups(db)
+    rebuild_rollups()
+    assert rollups(db) == kept
+
+
+def make_series(db, **fields):
+    values = dict(title='Club de lectura', time='18:00', duration=90, max_slots=10, status='abierta',
+                  frequency='weekly', interval=1, starts_on=date(2026, 5, 6), until=date(2026, 5, 27))
+    values.update(fields)
+    series = create_series(**values)
+    db.session.commit()
+    return series
+
+
+def sessions(series):
+    return series.activities.order_by(Activity.date).all()
+
+
+@pytest.mark.unit
+class TestOccurrences:
+
+    def test_weekly(self):
+        assert occurrences(date(2026, 5, 6), date(2026, 6, 3), 'weekly', 2) == [
+            date(2026, 5, 6), date(2026, 5, 20), date(2026, 6, 3)
+        ]
+
+    def test_monthly_skips_missing_days(self):
+        assert occurrences(date(2026, 1, 31), date(2026, 6, 30), 'monthly') == [
+            date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31)
+        ]
+
+    def test_invalid_rules(self):
+        with pytest.raises(ValueError):
+            occurrences(date(2026, 5, 6), date(2026, 5, 1))
+        with pytest.raises(ValueError):
+            occurrences(date(2026, 5, 6), date(2026, 6, 1), 'daily')
+        with pytest.raises(ValueError):
+            occurrences(date(2026, 1, 1), date(2030, 1, 1))
+
+    def test_far_future_until_refused_before_generating(self):
+        with pytest.raises(ValueError):
+            occurrences(date(2026, 1, 1), date(9999, 12, 31))
+        with pytest.raises(ValueError):
+            occurrences(date(2026, 1, 1), date(9999, 12, 31), 'monthly')
+        assert occurrences(date(2026, 1, 1), date(2030, 1, 1), 'weekly', 10 ** 9) == [date(2026, 1, 1)]
+
+
+@pytest.mark.unit
+class TestSeriesWrites:
+
+    def test_create_inserts_all_sessions(self, db, count_queries):
+        with count_queries() as statements:
+            series = make_series(db)
+
+        created = sessions(series)
+        assert [activity.date.day for activity in created] == [6, 13, 20, 27]
+        assert created[0].starts_at == datetime(2026, 5, 6, 18)
+        assert created[0].ends_at == datetime(2026, 5, 6, 19, 30)
+        assert sum('INSERT INTO activity ' in statement for statement in statements) == 1
+        assert rollups(db)[('status', 'abierta')] == (4, 0, 0)
+        assert_rollups_consistent(db)
+
+    def test_update_changes_future_sessions_only(self, db):
+        series = make_series(db)
+        full = sessions(series)[2]
+        for n in range(6):
+            create_enrollment(full, user_name=f'Usuario {n}', email=f'u{n}@test.com')
+        db.session.commit()
+
+        changed = update_series(series, today=TODAY, title='Club de novela', time='19:00', max_slots=4)
+        db.session.commit()
+
+        past, *future = sessions(series)
+        assert len(changed) == 3 and past.id not in changed
+        assert (past.title, past.time, past.max_slots) == ('Club de lectura', '18:00', 10)
+        assert [activity.title for activity in future] == ['Club de novela'] * 3
+        assert future[0].starts_at == datetime(2026, 5, 13, 19)
+        assert future[0].ends_at == datetime(2026, 5, 13, 20, 30)
+        assert [activity.max_slots for activity in future] == [4, 6, 4]  # never below the enrolled
+        assert_rollups_consistent(db)
+
+    def test_status_change_keeps_rollups(self, db):
+        series = make_series(db, until=date(2026, 7, 1))
+
+        changed = update_series(series, today=date(2026, 5, 1), status='finalizada')
+        db.session.commit()
+
+        assert len(changed) == 9
+        assert rollups(db)[('status', 'finalizada')] == (9, 0, 0)
+        assert_rollups_consistent(db)
+
+    def test_status_propagated_only_when_changed(self, db):
+        series = make_series(db)
+        closed, enrolled, empty = sessions(series)[1:]
+        closed.status = 'cerrada'  # as the scheduler leaves it
+        create_enrollment(enrolled, user_name='Usuario', email='usuario@test.com')
+        db.session.commit()
+
+        update_series(series, today=TODAY, title='Club de novela', status='abierta')
+        db.session.commit()
+        assert [activity.status for activity in sessions(series)[1:]] == ['cerrada', 'abierta', 'abierta']
+
+        update_series(series, today=TODAY, status='borrador')
+        db.session.commit()
+        # A draft would hide the session from the people enrolled in it
+        assert [activity.status for activity in sessions(series)[1:]] == ['borrador', 'abierta', 'borrador']
+        assert_rollups_consistent(db)
+
+    def test_cancel_before_start_keeps_season_ordered(self, db):
+        series = make_series(db)
+
+        assert len(cancel_series(series, today=date(2026, 5, 1))) == 4
+        db.session.commit()
+
+        assert series.until == series.starts_on == date(2026, 5, 6)
+
+    def test_cancel_deletes_future_sessions(self, db):
+        series = make_series(db)
+        upcoming = sessions(series)[1]
+        create_enrollment(upcoming, user_name='Usuario', email='usuario@test.com')
+        db.session.commit()
+        upcoming_id = upcoming.id
+
+        deleted = cancel_series(series, today=TODAY)
+        db.session.commit()
+
+        assert [activity.date for activity in sessions(series)] == [date(2026, 5, 6)]
+        assert len(deleted) == 3 and upcoming_id in deleted
+        assert Enrollment.query.count() == 0
+        assert sorted(t.entity_id for t in Tombstone.query.filter_by(entity='activity')) == sorted(deleted)
+        assert series.until == date(2026, 5, 12)
+        assert future_sessions(series, TODAY) == []
+        assert_rollups_consistent(db)
+
+
+@pytest.mark.unit
+class TestSeriesCatalog:
+
+    def test_series_collapsed_to_next_session(self, db):
+        series = make_series(db)
+        single = Activity(title='Charla', date=date(2026, 5, 8), max_slots=10, status='abierta')
+        db.session.add(single)
+        db.session.commit()
+
+        page = list_catalog(date_from=TODAY, collapse_series=True)
+        assert [(item['title'], item['date']) for item in page.items] == [
+            ('Club de lectura', date(2026, 5, 13))
+        ]
+
+        page = list_catalog(series_id=series.id)
+        assert len(page.items) == 4
+        assert {item['series_id'] for item in page.items} == {series.id}
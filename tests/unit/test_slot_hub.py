@@ -0,0 +1,56 @@
+import pytest
+import threading
+from app.slot_hub import SlotHub
+
+
+@pytest.mark.unit
+class TestSlotHub:
+
+    def test_changes_after_keep_latest_state_only(self):
+        hub = SlotHub()
+        hub.publish(1, {'id': 1, 'available_slots': 3})
+        start = hub.seq
+        hub.publish(2, {'id': 2, 'available_slots': 5})
+        hub.publish(1, {'id': 1, 'available_slots': 2})
+
+        changes = hub.changes_after(start)
+
+        assert [payload for _, payload in changes] == [
+            {'id': 2, 'available_slots': 5},
+            {'id': 1, 'available_slots': 2},
+        ]
+
+    def test_bounded_entries(self):
+        hub = SlotHub(max_entries=2)
+        for activity_id in range(5):
+            hub.publish(activity_id, {'id': activity_id})
+
+        assert hub.stats()['tracked'] == 2
+
+    def test_wait_times_out_without_changes(self):
+        hub = SlotHub()
+
+        assert hub.wait(hub.seq, timeout=0.01) == []
+
+    def test_wait_wakes_on_publish(self):
+        hub = SlotHub()
+        start = hub.seq
+        timer = threading.Timer(0.05, hub.publish, args=(7, {'id': 7}))
+        timer.start()
+
+        assert hub.wait(start, timeout=5) == [(1, {'id': 7})]
+        timer.join()
+
+    def test_stream_filters_and_counts_subscribers(self):
+        hub = SlotHub()
+        stream = hub.stream(hub.seq, heartbeat=0.01, activity_ids={2})
+        assert next(stream).startswith('retry:')
+        assert hub.stats()['subscribers'] == 1
+
+        hub.publish(1, {'id': 1})
+        hub.publish(2, {'id': 2})
+
+        assert next(stream) == 'id: 2\nevent: slots\ndata: {"id": 2}\n\n'
+        assert next(stream) == ': keep-alive\n\n'
+        stream.close()
+        assert hub.stats()['subscribers'] == 0
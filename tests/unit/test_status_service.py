@@ -0,0 +1,67 @@
+import pytest
+from datetime import date, datetime
+from app.models.report import ReportRollup
+from app.services.status_service import update_statuses
+
+NOW = datetime(2026, 5, 10, 12, 0)
+
+
+@pytest.mark.unit
+class TestUpdateStatuses:
+
+    def test_transitions_by_date_time_and_duration(self, db, make_activity):
+        ended = make_activity('Terminada', time='10:00', duration=90)
+        running = make_activity('En curso', time='11:30', duration=60)
+        soon = make_activity('Pronto', time='12:45', duration=60)
+        later = make_activity('Más tarde', time='14:00', duration=60)
+        closed_past = make_activity('Cerrada ayer', date=date(2026, 5, 9), time='18:00', duration=60, status='cerrada')
+
+        changed = update_statuses(NOW, close_lead_minutes=60)
+        db.session.commit()
+
+        assert sorted(changed['finalizada']) == sorted([ended.id, closed_past.id])
+        assert sorted(changed['cerrada']) == sorted([running.id, soon.id])
+        assert later.status == 'abierta'
+        assert ended.status == 'finalizada' and running.status == 'cerrada'
+
+    def test_without_time_ends_with_the_day(self, make_activity):
+        today = make_activity('Hoy sin hora')
+        yesterday = make_activity('Ayer sin hora', date=date(2026, 5, 9))
+
+        update_statuses(NOW)
+
+        assert today.status == 'cerrada'
+        assert yesterday.status == 'finalizada'
+
+    def test_same_end_as_schedule_slots(self, make_activity):
+        # Without duration the slot lasts the default hour, as for overlaps
+        short = make_activity('Sin duración', time='10:30')
+        running = make_activity('En curso', time='11:30')
+
+        update_statuses(NOW)
+
+        assert short.ends_at == datetime(2026, 5, 10, 11, 30)
+        assert short.status == 'finalizada'
+        assert running.status == 'cerrada'
+
+    def test_drafts_untouched(self, make_activity):
+        draft = make_activity('Borrador', date=date(2026, 5, 1), time='10:00', duration=60, status='borrador')
+
+        assert update_statuses(NOW) == {'cerrada': [], 'finalizada': []}
+        assert draft.status == 'borrador'
+
+    def test_idempotent(self, db, make_activity):
+        make_activity('Pasada', date=date(2026, 5, 1), time='10:00', duration=60)
+
+        update_statuses(NOW)
+        db.session.commit()
+
+        assert update_statuses(NOW) == {'cerrada': [], 'finalizada': []}
+
+    def test_rollups_follow(self, db, activity_with_enrollments):
+        update_statuses(datetime(2026, 6, 2, 9, 0))
+        db.session.commit()
+
+        status = {row.bucket: (row.activities, row.enrolled) for row in
+                  ReportRollup.query.filter_by(dimension='status') if row.activities}
+        assert status == {'finalizada': (1, 3)}
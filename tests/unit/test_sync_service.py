@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime, timedelta
+from app.models.tombstone import Tombstone
+from app.services.enrollment_service import create_enrollment, delete_enrollment, set_attendance_bulk
+from app.services.sync_service import changes_since, prune_tombstones
+
+
+def later(seconds=60):
+    """A cursor after every row written so far (beyond the overlap window)."""
+    return datetime.utcnow() + timedelta(seconds=seconds)
+
+
+@pytest.mark.unit
+class TestChangesSince:
+
+    def test_new_client_must_reload(self, db):
+        changes = changes_since(None)
+
+        assert changes['reset'] is True
+        assert changes['cursor']
+
+    def test_nothing_changed(self, db, activity_with_enrollments):
+        changes = changes_since(later(), now=later(61))
+
+        assert changes['reset'] is False
+        assert changes['activities'] == [] and changes['enrollments'] == []
+
+    def test_enrollment_after_cursor(self, db, open_activity):
+        cursor = datetime.utcnow()
+        enrollment = create_enrollment(open_activity, user_name='Ana', email='ana@test.com')
+        db.session.commit()
+
+        changes = changes_since(cursor, overlap_seconds=0)
+
+        assert [e['id'] for e in changes['enrollments']] == [enrollment.id]
+        assert changes['activities'][0]['enrolled_count'] == 1
+        assert changes['activities'][0]['created'] is False
+
+    def test_bulk_attendance_bumps_updated_at(self, db, activity_with_enrollments):
+        enrollments = activity_with_enrollments.enrollments
+        cursor = datetime.utcnow()
+        set_attendance_bulk(activity_with_enrollments.id, {enrollments[0].id: True})
+        db.session.commit()
+
+        changes = changes_since(cursor, overlap_seconds=0)
+
+        assert [e['attended'] for e in changes['enrollments']] == [True]
+
+    def test_deletions_are_tombstoned(self, db, activity_with_enrollments):
+        enrollment = activity_with_enrollments.enrollments[0]
+        enrollment_id = enrollment.id
+        cursor = datetime.utcnow()
+        delete_enrollment(enrollment)
+        db.session.commit()
+        db.session.delete(activity_with_enrollments)
+        db.session.commit()
+
+        deleted = changes_since(cursor, overlap_seconds=0)['deleted']
+
+        assert enrollment_id in deleted['enrollments']
+        assert deleted['activities'] == [activity_with_enrollments.id]
+
+    def test_filter_by_activity(self, db, open_activity, activity_with_enrollments):
+        cursor = datetime.utcnow()
+        create_enrollment(open_activity, user_name='Ana', email='ana@test.com')
+        db.session.commit()
+
+        changes = changes_since(cursor, activity_id=activity_with_enrollments.id, overlap_seconds=0)
+
+        assert changes['activities'] == [] and changes['enrollments'] == []
+
+    def test_too_many_changes_resets(self, db, activity_with_enrollments):
+        changes = changes_since(datetime.utcnow() - timedelta(hours=1), max_changes=2)
+
+        assert changes['reset'] is True
+        assert changes['enrollments'] == []
+
+    def test_cursor_older_than_tombstones_resets(self, db):
+        assert changes_since(datetime.utcnow() - timedelta(days=8), retention_days=7)['reset'] is True
+
+    def test_prune_tombstones(self, db, activity_with_enrollments):
+        delete_enrollment(activity_with_enrollments.enrollments[0])
+        db.session.commit()
+
+        assert prune_tombstones(7) == 0
+        assert prune_tombstones(7, now=datetime.utcnow() + timedelta(days=8)) == 1
+        assert Tombstone.query.count() == 0
@@ -0,0 +1,106 @@
+import pytest
+from datetime import date, datetime
+from app.models.activity import Activity
+from app.models.enrollment import Enrollment
+from app.models.trend import TrendBucket
+from app.services.enrollment_service import set_attendance, recount_activities
+from app.services.trends_service import bucket_start, bucket_starts, next_bucket, trend_series
+
+TODAY = date(2026, 6, 20)
+
+
+@pytest.fixture
+def history(db):
+    """Two typed activities in May 2026 and one in June, with marked attendance."""
+    activities = [
+        Activity(title='Taller mayo', type='taller', date=date(2026, 5, 6), max_slots=4, status='finalizada'),
+        Activity(title='Club mayo', type='club', date=date(2026, 5, 20), max_slots=10, status='finalizada'),
+        Activity(title='Taller junio', type='taller', date=date(2026, 6, 17), max_slots=5, status='abierta'),
+    ]
+    db.session.add_all(activities)
+    db.session.flush()
+    marks = [(0, True), (0, True), (0, False), (1, True), (2, None)]
+    for n, (index, attended) in enumerate(marks):
+        db.session.add(Enrollment(user_name=f'P{n}', email=f'p{n}@test.com', activity_id=activities[index].id,
+                                  attended=attended, enrollment_date=datetime(2026, 5, 2 + n, 10, 0)))
+    db.session.commit()
+    recount_activities()
+    db.session.commit()
+    return activities
+
+
+@pytest.mark.unit
+class TestBuckets:
+
+    def test_week_starts_on_monday(self):
+        assert bucket_start(date(2026, 6, 21), 'week') == date(2026, 6, 15)
+        assert next_bucket(date(2026, 6, 15), 'week') == date(2026, 6, 22)
+
+    def test_month_rolls_over_year(self):
+        assert next_bucket(date(2026, 12, 1), 'month') == date(2027, 1, 1)
+
+    def test_bucket_starts_end_with_current(self):
+        assert bucket_starts('month', 3, TODAY) == [date(2026, 4, 1), date(2026, 5, 1), date(2026, 6, 1)]
+
+
+@pytest.mark.unit
+class TestTrendSeries:
+
+    def test_monthly_metrics(self, db, history):
+        series = trend_series('month', 3, today=TODAY)
+
+        may = series['total'][1]
+        assert series['labels'][1] == '2026-05-01'
+        assert may['enrollments'] == 5
+        assert may['enrolled'] == 4
+        assert may['attendance_rate'] == 0.75
+        assert may['no_show_rate'] == 0.25
+        assert may['fill_ratio'] == round(4 / 14, 4)
+        assert series['by_type']['taller'][2]['fill_ratio'] == 0.2
+        assert series['total'][0]['attendance_rate'] is None
+
+    def test_weekly_buckets_by_activity_date(self, db, history):
+        series = trend_series('week', 8, today=TODAY)
+
+        week = series['labels'].index('2026-05-04')
+        assert series['by_type']['taller'][week]['enrolled'] == 3
+
+    def test_closed_periods_are_stored_once(self, db, history):
+        trend_series('month', 3, today=TODAY)
+        assert {row.bucket_start for row in TrendBucket.query} == {date(2026, 4, 1), date(2026, 5, 1)}
+
+        # A late change in a closed period is not recomputed...
+        set_attendance(history[1].enrollments[0], False)
+        # ...while the open period is
+        set_attendance(history[2].enrollments[0], True)
+        db.session.commit()
+
+        series = trend_series('month', 3, today=TODAY)
+        assert series['total'][1]['attendance_rate'] == 0.75
+        assert series['total'][2]['attendance_rate'] == 1.0
+
+    def test_concurrent_first_computation_is_idempotent(self, db, history, monkeypatch):
+        import app.services.trends_service as trends_service
+        aggregate = trends_service._aggregate
+
+        def other_request_stores_first(period, start, end):
+            # Another request computes and stores the same periods meanwhile
+            monkeypatch.setattr(trends_service, '_aggregate', aggregate)
+            trend_series('month', 3, today=TODAY)
+            return aggregate(period, start, end)
+
+        monkeypatch.setattr(trends_service, '_aggregate', other_request_stores_first)
+        series = trend_series('month', 3, today=TODAY)
+        db.session.commit()
+
+        assert series == trend_series('month', 3, today=TODAY)
+        assert TrendBucket.query.filter_by(activity_type='*').count() == 2
+
+    def test_recently_ended_period_stays_open(self, db, history):
+        trend_series('month', 3, today=date(2026, 6, 3), close_after_days=7)
+
+        assert {row.bucket_start for row in TrendBucket.query} == {date(2026, 4, 1)}
+
+    def test_invalid_period(self, db):
+        with pytest.raises(ValueError):
+            trend_series('year')
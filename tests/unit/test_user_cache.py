@@ -0,0 +1,88 @@
+import pytest
+from app.models.user import User
+from app.user_cache import UserCache
+
+
+@pytest.fixture
+def enabled_cache(app, monkeypatch):
+    shared_cache = app.extensions['user_cache']
+    monkeypatch.setattr(shared_cache, 'ttl', 300)
+    shared_cache.clear()
+    yield shared_cache
+    shared_cache.clear()
+
+
+@pytest.mark.unit
+class TestUserCache:
+
+    def test_hit_after_first_load(self, db, normal_user, enabled_cache):
+        calls = []
+
+        def loader(pk):
+            calls.append(pk)
+            return db.session.get(User, pk)
+
+        first = enabled_cache.get(normal_user.id, loader)
+        second = enabled_cache.get(normal_user.id, loader)
+
+        assert first is second
+        assert first.role == 'user' and first.name == 'Usuario Normal'
+        assert calls == [normal_user.id]
+        assert enabled_cache.stats()['hit_ratio'] == 0.5
+
+    def test_ttl_expiry(self, monkeypatch):
+        cache = UserCache(ttl=10)
+        now = [1000.0]
+        monkeypatch.setattr('app.user_cache.time.monotonic', lambda: now[0])
+        user = User(id=1, username='u', role='user')
+
+        cache.get(1, lambda pk: user)
+        now[0] += 11
+        cache.get(1, lambda pk: user)
+
+        assert cache.misses == 2
+
+    def test_committed_change_invalidates(self, db, normal_user, enabled_cache):
+        loader = lambda pk: db.session.get(User, pk)
+        enabled_cache.get(normal_user.id, loader)
+
+        normal_user.role = 'admin'
+        db.session.commit()
+
+        assert enabled_cache.get(normal_user.id, loader).role == 'admin'
+
+    def test_snapshot_loaded_before_invalidation_not_stored(self):
+        cache = UserCache(ttl=300)
+        admin = User(id=1, username='u', role='admin')
+
+        def load_then_demote(pk):
+            snapshot = User(id=pk, username='u', role=admin.role)
+            admin.role = 'user'
+            cache.invalidate(pk)  # the demotion commits while this request loads
+            return snapshot
+
+        assert cache.get(1, load_then_demote).role == 'admin'
+        assert cache.get(1, lambda pk: admin).role == 'user'
+        assert cache.misses == 2
+
+    def test_rolled_back_change_keeps_entry(self, db, normal_user, enabled_cache):
+        loader = lambda pk: db.session.get(User, pk)
+        enabled_cache.get(normal_user.id, loader)
+
+        normal_user.set_password('otra')
+        db.session.flush()
+        db.session.rollback()
+
+        assert enabled_cache.stats()['size'] == 1
+
+
+@pytest.mark.integration
+class TestUserLoaderCache:
+
+    def test_logged_in_requests_skip_user_query(self, auth_user, enabled_cache, count_queries):
+        auth_user.get('/activities/')
+
+        with count_queries() as statements:
+            auth_user.get('/activities/')
+
+        assert not any('FROM user' in statement for statement in statements)